@@ -0,0 +1,132 @@
+"""
+Autenticación JWT sin consulta de usuario por petición.
+
+JWTAuthentication de simplejwt hace un SELECT de User en cada llamada. Aquí
+el id sale del token y los campos que usan vistas y permisos (is_active,
+is_staff, flags de rol...) se leen de un cache con TTL. El usuario se
+construye con User.from_db: el resto de columnas (password, last_login,
+date_joined) quedan diferidas y se cargan solo si alguien las toca.
+
+El cache se invalida en accounts/signals.py al guardar o eliminar el usuario
+(cambio de contraseña, desactivación, cambio de rol, baja de la cuenta),
+también con QuerySet.delete(), que envía post_delete por fila. Limitaciones:
+
+- QuerySet.update() no envía señales: quien desactive usuarios con update()
+  debe llamar a invalidar_usuarios() con sus ids.
+- Con varios procesos (workers de daphne/gunicorn) el cache debe ser
+  compartido (DJANGO_CACHE=redis o archivo). Con "memoria" cada proceso
+  tiene su copia y la invalidación no llega a los demás: un usuario
+  desactivado o eliminado seguiría autenticándose hasta
+  JWT_USUARIO_CACHE_TIMEOUT segundos.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+CAMPOS_CACHEADOS = (
+    "id", "email", "first_name", "last_name", "is_active", "is_staff",
+    "is_superuser", "is_estudiante", "is_admin_interu", "acepta_politicas",
+)
+
+
+def clave_usuario(usuario_id):
+    return f"auth:usuario:{usuario_id}"
+
+
+def invalidar_usuario(usuario_id):
+    cache.delete(clave_usuario(usuario_id))
+
+
+def invalidar_usuarios(usuario_ids):
+    cache.delete_many([clave_usuario(usuario_id) for usuario_id in usuario_ids])
+
+
+def _timeout():
+    return getattr(settings, "JWT_USUARIO_CACHE_TIMEOUT", 300)
+
+
+def _consulta_usuario(usuario_id):
+    User = get_user_model()
+    return User.objects.using(DEFAULT_DB_ALIAS).filter(
+        **{api_settings.USER_ID_FIELD: usuario_id}
+    ).values(*CAMPOS_CACHEADOS)
+
+
+def _construir_usuario(datos):
+    User = get_user_model()
+    # from_db espera los valores en el orden de los campos del modelo
+    campos = [f.attname for f in User._meta.concrete_fields if f.attname in datos]
+    return User.from_db(DEFAULT_DB_ALIAS, campos, [datos[c] for c in campos])
+
+
+def usuario_desde_cache(usuario_id):
+    """ Usuario con los CAMPOS_CACHEADOS cargados, o None si no existe. """
+    datos = cache.get(clave_usuario(usuario_id))
+    if datos is None:
+        datos = _consulta_usuario(usuario_id).first()
+        if datos is None:
+            return None
+        cache.set(clave_usuario(usuario_id), datos, _timeout())
+    return _construir_usuario(datos)
+
+
+async def ausuario_desde_cache(usuario_id):
+    datos = await cache.aget(clave_usuario(usuario_id))
+    if datos is None:
+        datos = await _consulta_usuario(usuario_id).afirst()
+        if datos is None:
+            return None
+        await cache.aset(clave_usuario(usuario_id), datos, _timeout())
+    return _construir_usuario(datos)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def _usuario_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def _validar_usuario(self, user):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    def _validar_revocacion(self, validated_token, user):
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    def get_user(self, validated_token):
+        user = usuario_desde_cache(self._usuario_id(validated_token))
+        self._validar_usuario(user)
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Única vía que necesita la contraseña: se carga la columna diferida
+            self._validar_revocacion(validated_token, user)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() para las vistas nativas async (core/views_async.py):
+        mismo resultado y mismas excepciones, con el cache y el ORM async.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        user = await ausuario_desde_cache(self._usuario_id(validated_token))
+        self._validar_usuario(user)
+        if api_settings.CHECK_REVOKE_TOKEN:
+            await user.arefresh_from_db(fields=["password"])
+            self._validar_revocacion(validated_token, user)
+        return user, validated_token
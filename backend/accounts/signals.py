@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidar_usuario
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidar_cache_autenticacion(sender, instance, **kwargs):
+    # Contraseña, is_active, roles o baja: el siguiente request relee el usuario
+    invalidar_usuario(instance.pk)
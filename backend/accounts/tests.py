@@ -1,3 +1,77 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication, clave_usuario, invalidar_usuarios
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """ El cache del usuario autenticado no debe sobrevivir a cambios que lo invalidan. """
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(email="auth@duocuc.cl", password="clave-inicial-123")
+
+    def autenticar(self, usuario=None):
+        token = AccessToken.for_user(usuario or self.usuario)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return CachedJWTAuthentication().authenticate(request)
+
+    def test_segunda_peticion_sin_consulta(self):
+        self.autenticar()
+        with self.assertNumQueries(0):
+            user, _ = self.autenticar()
+        self.assertEqual(user.pk, self.usuario.pk)
+        self.assertTrue(user.is_active)
+
+    def test_desactivacion(self):
+        self.autenticar()
+        self.usuario.is_active = False
+        self.usuario.save()
+        with self.assertRaisesMessage(AuthenticationFailed, "User is inactive"):
+            self.autenticar()
+
+    def test_eliminacion(self):
+        self.autenticar()
+        User.objects.filter(pk=self.usuario.pk).delete()
+        with self.assertRaisesMessage(AuthenticationFailed, "User not found"):
+            self.autenticar(self.usuario)
+
+    def test_update_requiere_invalidacion_explicita(self):
+        self.autenticar()
+        User.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertIsNotNone(cache.get(clave_usuario(self.usuario.pk)))
+        invalidar_usuarios([self.usuario.pk])
+        with self.assertRaisesMessage(AuthenticationFailed, "User is inactive"):
+            self.autenticar()
+
+    def test_cambio_de_contrasena(self):
+        # override_settings reemplaza el api_settings de simplejwt, pero sus
+        # módulos conservan el objeto importado: se cambia el atributo
+        with mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            token = AccessToken.for_user(self.usuario)
+            request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+            CachedJWTAuthentication().authenticate(request)
+
+            self.usuario.set_password("clave-nueva-456")
+            self.usuario.save()
+            with self.assertRaisesMessage(AuthenticationFailed, "password has been changed"):
+                CachedJWTAuthentication().authenticate(request)
 
-# Create your tests here.
+    def test_desactivacion_async(self):
+        token = AccessToken.for_user(self.usuario)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        async_to_sync(CachedJWTAuthentication().aauthenticate)(request)
+        self.usuario.is_active = False
+        self.usuario.save()
+        with self.assertRaisesMessage(AuthenticationFailed, "User is inactive"):
+            async_to_sync(CachedJWTAuthentication().aauthenticate)(request)
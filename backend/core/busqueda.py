@@ -0,0 +1,94 @@
+"""
+Búsqueda de texto completo sobre Publicacion.titulo y descripcion.
+
+- SQLite: tabla virtual FTS5 `core_publicacion_fts` (rowid = id_publicacion),
+  mantenida fila a fila desde las señales de Publicacion.
+- PostgreSQL: índice GIN sobre la expresión tsvector; la base lo actualiza
+  sola en cada INSERT/UPDATE, así que las señales no hacen nada.
+
+La tabla y el índice los crea la migración 0006_publicacion_fts; PG_VECTOR
+debe ser la misma expresión del índice para que la consulta lo use.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+FTS_TABLA = "core_publicacion_fts"
+PG_CONFIG = "spanish"
+PG_VECTOR = (
+    f"(setweight(to_tsvector('{PG_CONFIG}', coalesce(titulo, '')), 'A') || "
+    f"setweight(to_tsvector('{PG_CONFIG}', coalesce(descripcion, '')), 'B'))"
+)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _sqlite_match(texto):
+    """ "apuntes SaaS" → '"apuntes"* "saas"*' (AND implícito con prefijos). """
+    tokens = _TOKEN.findall(texto.lower())
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+# ----------------------- MANTENIMIENTO INCREMENTAL -----------------------
+# `using` es el alias donde se guardó o eliminó la publicación (el de la señal)
+
+def indexar_texto(publicacion, using=DEFAULT_DB_ALIAS):
+    conexion = connections[using]
+    if conexion.vendor != "sqlite":
+        return
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLA} WHERE rowid = %s", [publicacion.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLA}(rowid, titulo, descripcion) VALUES (%s, %s, %s)",
+            [publicacion.pk, publicacion.titulo, publicacion.descripcion or ""],
+        )
+
+
+def desindexar_texto(publicacion_id, using=DEFAULT_DB_ALIAS):
+    conexion = connections[using]
+    if conexion.vendor != "sqlite":
+        return
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLA} WHERE rowid = %s", [publicacion_id])
+
+
+# ----------------------- CONSULTA -----------------------
+
+def buscar_texto(texto, limite=20, desplazamiento=0):
+    """
+    Devuelve [(id_publicacion, relevancia), ...] de publicaciones activas,
+    de mayor a menor relevancia. El título pesa más que la descripción.
+    """
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        consulta = _sqlite_match(texto)
+        if not consulta:
+            return []
+        # bm25 devuelve valores negativos: más bajo = más relevante
+        sql = (
+            f"SELECT f.rowid, -bm25({FTS_TABLA}, 10.0, 1.0) AS relevancia "
+            f"FROM {FTS_TABLA} f JOIN core_publicacion p ON p.id_publicacion = f.rowid "
+            f"WHERE {FTS_TABLA} MATCH %s AND p.estado "
+            "ORDER BY relevancia DESC, f.rowid DESC LIMIT %s OFFSET %s"
+        )
+        params = [consulta, limite, desplazamiento]
+    elif vendor == "postgresql":
+        sql = (
+            f"SELECT id_publicacion, ts_rank({PG_VECTOR}, q) AS relevancia "
+            f"FROM core_publicacion, websearch_to_tsquery('{PG_CONFIG}', %s) q "
+            f"WHERE {PG_VECTOR} @@ q AND estado "
+            "ORDER BY relevancia DESC, id_publicacion DESC LIMIT %s OFFSET %s"
+        )
+        params = [texto, limite, desplazamiento]
+    else:
+        from .models import Publicacion
+        ids = (
+            Publicacion.objects.filter(estado=True, titulo__icontains=texto)
+            .order_by("-id_publicacion")
+            .values_list("id_publicacion", flat=True)[desplazamiento:desplazamiento + limite]
+        )
+        return [(pk, 0.0) for pk in ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(pk, float(relevancia)) for pk, relevancia in cursor.fetchall()]
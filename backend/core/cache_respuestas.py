@@ -0,0 +1,129 @@
+"""
+Cache de respuestas serializadas para los endpoints públicos de lectura:
+
+    /publicaciones/              feed (una entrada por URL: cursor, page_size)
+    /publicaciones/<pk>/         detalle
+    /perfiles/usuario/<id>/      perfil público
+
+Se guarda `response.data` ya serializado en el cache por defecto de Django
+(locmem, archivo o Redis), con el ETag de la respuesta en la clave. Los
+validadores salen de la base (RespuestaCondicionalMixin.validadores), así
+que no hay invalidación:
+  - una alta, edición, baja o desactivación cambia el ETag y con él la
+    clave, en todos los procesos a la vez y solo después del commit;
+  - una lectura concurrente con una transacción sin confirmar guarda el
+    cuerpo bajo el ETag anterior, que ninguna petición posterior vuelve a
+    calcular;
+  - si la vista no tiene validadores (objeto inexistente o inactivo) la
+    respuesta no se cachea.
+Las entradas viejas se descartan al vencer RESPUESTAS_CACHE_TIMEOUT. Con
+DJANGO_CACHE=memoria cada proceso tiene su propia copia (más memoria y
+menos aciertos), pero ninguno sirve un cuerpo más viejo que la base.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+PREFIJO = "respuestas"
+ENDPOINTS = ("feed", "publicacion", "perfil")
+
+
+def _timeout():
+    return getattr(settings, "RESPUESTAS_CACHE_TIMEOUT", 300)
+
+
+def _hash_url(request):
+    return hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+
+
+def _version(etag):
+    return etag.strip('"')
+
+
+def clave_feed(request, etag):
+    return f"{PREFIJO}:feed:{_version(etag)}:{_hash_url(request)}"
+
+
+def clave_publicacion(pk, etag):
+    return f"{PREFIJO}:publicacion:{pk}:{_version(etag)}"
+
+
+def clave_perfil(usuario_id, etag):
+    return f"{PREFIJO}:perfil:{usuario_id}:{_version(etag)}"
+
+
+# ----------------------- métricas -----------------------
+def _registrar(endpoint, resultado):
+    clave = f"{PREFIJO}:metricas:{endpoint}:{resultado}"
+    if not cache.add(clave, 1, None):
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 1, None)
+
+
+def metricas():
+    valores = cache.get_many(
+        [f"{PREFIJO}:metricas:{e}:{r}" for e in ENDPOINTS for r in ("hit", "miss")]
+    )
+    resumen = {}
+    for endpoint in ENDPOINTS:
+        hits = valores.get(f"{PREFIJO}:metricas:{endpoint}:hit", 0)
+        misses = valores.get(f"{PREFIJO}:metricas:{endpoint}:miss", 0)
+        total = hits + misses
+        resumen[endpoint] = {
+            "hits": hits,
+            "misses": misses,
+            "ratio": round(hits / total, 4) if total else None,
+        }
+    return resumen
+
+
+# ----------------------- lectura / escritura -----------------------
+def obtener(endpoint, clave):
+    data = cache.get(clave)
+    _registrar(endpoint, "hit" if data is not None else "miss")
+    return data
+
+
+def guardar(clave, data):
+    cache.set(clave, data, _timeout())
+
+
+async def aobtener(endpoint, clave):
+    data = await cache.aget(clave)
+    await sync_to_async(_registrar)(endpoint, "hit" if data is not None else "miss")
+    return data
+
+
+async def aguardar(clave, data):
+    await cache.aset(clave, data, _timeout())
+
+
+class RespuestaCacheadaMixin:
+    """
+    Cachea la respuesta 200 de GET. Las vistas definen `cache_endpoint`
+    (nombre para métricas) y `clave_cache(request)`, que arma la clave con
+    el ETag de `validadores_respuesta` (RespuestaCondicionalMixin va antes
+    en el MRO) o devuelve None para no cachear.
+    """
+    cache_endpoint = None
+
+    def clave_cache(self, request):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        clave = self.clave_cache(request)
+        if clave is None:
+            return super().get(request, *args, **kwargs)
+        data = obtener(self.cache_endpoint, clave)
+        if data is not None:
+            return Response(data)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            guardar(clave, response.data)
+        return response
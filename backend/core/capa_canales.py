@@ -0,0 +1,244 @@
+"""
+Channel layer respaldado por la base de datos, para compartir grupos entre
+varios procesos daphne/gunicorn sin Redis.
+
+Funciona con PostgreSQL o con un único archivo SQLite en modo WAL compartido
+por los procesos del mismo host. Configuración:
+
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "core.capa_canales.DatabaseChannelLayer",
+            "CONFIG": {"expiry": 60, "group_expiry": 86400, "capacity": 100},
+        }
+    }
+
+Cada proceso tiene una sola tarea de sondeo por event loop que atiende a todos
+sus canales locales con una consulta `canal IN (...)`, en lugar de una consulta
+por socket abierto.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+import weakref
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class _EstadoLoop:
+    def __init__(self):
+        self.colas = {}       # canal -> asyncio.Queue con mensajes ya extraídos
+        self.esperando = {}   # canal -> receive() en curso
+        self.ultimo_uso = {}  # canal -> time.monotonic() del último receive()
+        self.tarea = None
+
+
+class DatabaseChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.02,
+        batch_size=500,
+        cleanup_interval=30,
+        database="default",
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.cleanup_interval = cleanup_interval
+        self.database = database
+        self._por_loop = weakref.WeakKeyDictionary()
+        self._ultima_limpieza = 0.0
+
+    # ----------------------- helpers -----------------------
+    def _modelos(self):
+        from .models import CanalGrupo, CanalMensaje
+        return CanalMensaje.objects.using(self.database), CanalGrupo.objects.using(self.database)
+
+    def _serializar(self, message):
+        return json.dumps(message, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+    def _estado(self):
+        loop = asyncio.get_running_loop()
+        estado = self._por_loop.get(loop)
+        if estado is None:
+            estado = self._por_loop[loop] = _EstadoLoop()
+        return estado
+
+    # ----------------------- canales -----------------------
+    async def new_channel(self, prefix="specific"):
+        return f"{prefix}.db!{uuid.uuid4().hex}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        await database_sync_to_async(self._insertar)([channel], message, True)
+
+    def _insertar(self, canales, message, estricto):
+        mensajes, _ = self._modelos()
+        ahora = timezone.now()
+        expira = ahora + timedelta(seconds=self.expiry)
+        contenido = self._serializar(message)
+
+        ocupados = dict(
+            mensajes.filter(canal__in=canales, expira__gt=ahora)
+            .values("canal")
+            .annotate(total=Count("id"))
+            .values_list("canal", "total")
+        )
+        destinos = []
+        for canal in canales:
+            if ocupados.get(canal, 0) >= self.get_capacity(canal):
+                if estricto:
+                    raise ChannelFull(canal)
+                continue  # group_send descarta en silencio si el canal está lleno
+            destinos.append(canal)
+
+        if destinos:
+            from .models import CanalMensaje
+            mensajes.bulk_create(
+                [CanalMensaje(canal=c, contenido=contenido, expira=expira) for c in destinos]
+            )
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        estado = self._estado()
+        cola = estado.colas.get(channel)
+        if cola is None:
+            cola = estado.colas[channel] = asyncio.Queue()
+        estado.esperando[channel] = estado.esperando.get(channel, 0) + 1
+        if estado.tarea is None or estado.tarea.done():
+            estado.tarea = asyncio.ensure_future(self._sondear(estado))
+        try:
+            return await cola.get()
+        finally:
+            estado.esperando[channel] -= 1
+            if not estado.esperando[channel]:
+                del estado.esperando[channel]
+            estado.ultimo_uso[channel] = time.monotonic()
+
+    async def _sondear(self, estado):
+        extraer = database_sync_to_async(self._extraer)
+        while estado.colas:
+            try:
+                entregados = await extraer(list(estado.colas))
+            except DatabaseError:
+                # p. ej. "database is locked" en SQLite: reintentar en el próximo ciclo
+                logger.warning("Error sondeando el channel layer", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+                continue
+            for canal, message in entregados:
+                cola = estado.colas.get(canal)
+                if cola is not None:
+                    cola.put_nowait(message)
+            self._podar(estado)
+            if len(entregados) < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def _podar(self, estado):
+        """ Deja de sondear canales cuyo consumidor ya no llama a receive(). """
+        limite = time.monotonic() - self.expiry
+        for canal in list(estado.colas):
+            if canal not in estado.esperando and estado.ultimo_uso.get(canal, 0) < limite:
+                del estado.colas[canal]
+                estado.ultimo_uso.pop(canal, None)
+
+    def _extraer(self, canales):
+        mensajes, _ = self._modelos()
+        ahora = timezone.now()
+        self._limpiar(ahora)
+        qs = mensajes.filter(canal__in=canales, expira__gt=ahora).order_by("id")
+
+        if connections[self.database].features.has_select_for_update_skip_locked:
+            with transaction.atomic(using=self.database):
+                filas = list(
+                    qs.select_for_update(skip_locked=True).values_list("id", "canal", "contenido")[:self.batch_size]
+                )
+                if filas:
+                    mensajes.filter(id__in=[f[0] for f in filas]).delete()
+        else:
+            # SQLite: un SELECT seguido de DELETE dentro de la misma transacción
+            # diferida se bloquea mutuamente entre procesos al escalar el lock.
+            # Los canales son exclusivos de este proceso, así que basta con
+            # leer y luego borrar en sentencias separadas.
+            filas = list(qs.values_list("id", "canal", "contenido")[:self.batch_size])
+            if filas:
+                mensajes.filter(id__in=[f[0] for f in filas]).delete()
+        return [(canal, json.loads(contenido)) for _, canal, contenido in filas]
+
+    def _limpiar(self, ahora):
+        if time.monotonic() - self._ultima_limpieza < self.cleanup_interval:
+            return
+        self._ultima_limpieza = time.monotonic()
+        mensajes, grupos = self._modelos()
+        mensajes.filter(expira__lte=ahora).delete()
+        grupos.filter(expira__lte=ahora).delete()
+
+    # ----------------------- grupos -----------------------
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await database_sync_to_async(self._agregar_grupo)(group, channel)
+
+    def _agregar_grupo(self, group, channel):
+        from .models import CanalGrupo
+        _, grupos = self._modelos()
+        # Un solo INSERT ... ON CONFLICT DO UPDATE: sin lectura previa que
+        # escale locks en SQLite.
+        grupos.bulk_create(
+            [CanalGrupo(grupo=group, canal=channel, expira=timezone.now() + timedelta(seconds=self.group_expiry))],
+            update_conflicts=True,
+            unique_fields=["grupo", "canal"],
+            update_fields=["expira"],
+        )
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await database_sync_to_async(self._descartar_grupo)(group, channel)
+
+    def _descartar_grupo(self, group, channel):
+        _, grupos = self._modelos()
+        grupos.filter(grupo=group, canal=channel).delete()
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_group_name(group)
+        await database_sync_to_async(self._enviar_grupo)(group, message)
+
+    def _enviar_grupo(self, group, message):
+        _, grupos = self._modelos()
+        canales = list(
+            grupos.filter(grupo=group, expira__gt=timezone.now()).values_list("canal", flat=True)
+        )
+        if canales:
+            self._insertar(canales, message, False)
+
+    # ----------------------- flush -----------------------
+    async def flush(self):
+        await database_sync_to_async(self._vaciar)()
+
+    def _vaciar(self):
+        mensajes, grupos = self._modelos()
+        mensajes.delete()
+        grupos.delete()
+
+    async def close(self):
+        pass
@@ -0,0 +1,58 @@
+"""
+GET condicional (ETag / Last-Modified) para vistas de lectura.
+
+La vista calcula validadores baratos (una consulta de agregados o de una
+sola fila) antes de tocar el serializer; si el cliente ya tiene esa versión
+se responde 304 sin cuerpo.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def calcular_etag(*partes):
+    texto = "|".join("" if p is None else str(p) for p in partes)
+    return quote_etag(hashlib.md5(texto.encode(), usedforsecurity=False).hexdigest())
+
+
+def no_modificado(request, etag, ultima):
+    """ Respuesta 304 si el cliente ya tiene esta versión; si no, None. """
+    last_modified = int(ultima.timestamp()) if ultima else None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def agregar_validadores(response, etag, ultima):
+    response["ETag"] = etag
+    if ultima is not None:
+        response["Last-Modified"] = http_date(int(ultima.timestamp()))
+    # El cliente puede guardar la respuesta pero debe revalidar
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class RespuestaCondicionalMixin:
+    """
+    Las vistas implementan `validadores(request)` y devuelven
+    (etag, ultima_modificacion) o None para responder sin validación
+    (p. ej. si el objeto no existe y la vista debe dar 404). Quedan en
+    `validadores_respuesta` para el resto de la petición.
+    """
+    validadores_respuesta = None
+
+    def validadores(self, request):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validadores = self.validadores_respuesta = self.validadores(request)
+        if validadores is None:
+            return super().get(request, *args, **kwargs)
+
+        respuesta = no_modificado(request, *validadores)
+        if respuesta is not None:
+            return respuesta
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            agregar_validadores(response, *validadores)
+        return response
@@ -1,16 +1,128 @@
-
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
-class ChatConsumer(AsyncWebsocketConsumer):
+from .models import Chat, ChatParticipante
+from .mensajeria import es_participante, evento_mensaje, marcar_leido, registrar_mensaje
+from .tiempo_real import grupo_chat, grupo_usuario
+
+
+class EnvioMensajesMixin:
+    """
+    Lógica compartida para recibir mensajes por WebSocket:
+      {"type": "message", "texto": "...", "client_id": "<id único del cliente>"}
+    Respuesta al emisor:
+      {"type": "ack", "client_id": ..., "id_mensaje": ..., "fecha": ..., "duplicado": bool}
+    Marca de lectura:
+      {"type": "leer", "hasta": <id_mensaje>}  ->  {"type": "leido", "hasta": ..., "no_leidos": ...}
+    """
+
+    async def chat_mensajes(self, event):
+        """ Lote de POST /mensajes/lote/: un group_send por chat, un frame "message" por mensaje. """
+        for mensaje in event["mensajes"]:
+            await self.chat_message(mensaje)
+
+    async def recibir_mensaje(self, chat_id, data, extra=None):
+        extra = extra or {}
+        client_id = data.get("client_id")
+        texto = data.get("texto")
+        if not client_id or not isinstance(client_id, str) or len(client_id) > 64:
+            return await self._error(client_id, "client_id es requerido (máx. 64 caracteres).", extra)
+        if not isinstance(texto, str) or not texto.strip():
+            return await self._error(client_id, "El texto es requerido.", extra)
+        texto = texto.strip()
+
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            return await self._error(client_id, "No autenticado.", extra)
+
+        resultado = await self._guardar(chat_id, user, texto, client_id)
+        if resultado is None:
+            return await self._error(client_id, "No eres participante de este chat.", extra)
+        evento, creado = resultado
+
+        await self.send(text_data=json.dumps({
+            **extra,
+            "type": "ack",
+            "client_id": client_id,
+            "id_mensaje": evento["id_mensaje"],
+            "fecha": evento["fecha"],
+            "duplicado": not creado,
+        }))
+        if creado:
+            await self.channel_layer.group_send(grupo_chat(chat_id), evento)
+
+    async def recibir_lectura(self, chat_id, data, extra=None):
+        extra = extra or {}
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            return await self._error(None, "No autenticado.", extra)
+        hasta = data.get("hasta")
+        if hasta is not None and (not isinstance(hasta, int) or isinstance(hasta, bool)):
+            return await self._error(None, "hasta debe ser un id de mensaje.", extra)
+        resultado = await database_sync_to_async(marcar_leido)(chat_id, user, hasta)
+        if resultado is None:
+            return await self._error(None, "No eres participante de este chat.", extra)
+        await self.send(text_data=json.dumps({
+            **extra,
+            "type": "leido",
+            "hasta": resultado["hasta"],
+            "no_leidos": resultado["no_leidos"],
+        }))
+
+    @database_sync_to_async
+    def _guardar(self, chat_id, user, texto, client_id):
+        if not es_participante(chat_id, user):
+            return None
+        chat = Chat.objects.get(pk=chat_id)
+        mensaje, creado = registrar_mensaje(chat, user, texto, client_id)
+        return evento_mensaje(mensaje), creado
+
+    async def _error(self, client_id, detalle, extra=None):
+        await self.send(text_data=json.dumps({
+            **(extra or {}),
+            "type": "error",
+            "client_id": client_id,
+            "detalle": detalle,
+        }))
+
+    @staticmethod
+    def _leer_frame(text_data):
+        try:
+            data = json.loads(text_data or "")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+class ChatConsumer(EnvioMensajesMixin, AsyncWebsocketConsumer):
     async def connect(self):
+        # El grupo recibe los mensajes completos y las marcas de lectura: solo participantes
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close(code=4401)
+            return
         self.chat_id = self.scope["url_route"]["kwargs"]["chat_id"]
-        self.group_name = f"chat_{self.chat_id}"
+        if not await database_sync_to_async(es_participante)(self.chat_id, user):
+            await self.close(code=4403)
+            return
+        self.group_name = grupo_chat(self.chat_id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        data = self._leer_frame(text_data)
+        if data is None:
+            return await self._error(None, "JSON inválido.")
+        if data.get("type") == "leer":
+            return await self.recibir_lectura(self.chat_id, data)
+        if data.get("type") != "message":
+            return await self._error(None, "Tipo de frame no soportado.")
+        await self.recibir_mensaje(self.chat_id, data)
 
     async def chat_message(self, event):
         # Enviar con el mismo shape que usa el serializer
@@ -21,5 +133,92 @@ class ChatConsumer(AsyncWebsocketConsumer):
             "fecha": event["fecha"],
             "estudiante": event["estudiante"],
             "autor_alias": event.get("autor_alias"),  # clave consistente
+            "client_id": event.get("client_id"),
+        }
+        await self.send(text_data=json.dumps(payload))
+
+    async def chat_leido(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "leido_por",
+            "estudiante": event["estudiante"],
+            "hasta": event["hasta"],
+        }))
+
+
+class UsuarioConsumer(EnvioMensajesMixin, AsyncWebsocketConsumer):
+    """
+    Un solo socket por usuario: se suscribe a todos sus chats y a su grupo
+    personal de notificaciones. Cada frame lleva "canal":
+      "chat:<id_chat>"   mensajes y acuses de lectura de ese chat
+      "notificaciones"   notificaciones nuevas
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.usuario_id = user.pk
+        self.grupos = {grupo_usuario(user.pk)}
+        self.grupos |= {grupo_chat(chat_id) for chat_id in await self._chats(user)}
+        for grupo in self.grupos:
+            await self.channel_layer.group_add(grupo, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for grupo in getattr(self, "grupos", ()):
+            await self.channel_layer.group_discard(grupo, self.channel_name)
+
+    @database_sync_to_async
+    def _chats(self, user):
+        return list(ChatParticipante.objects.filter(estudiante=user).values_list("chat_id", flat=True))
+
+    async def receive(self, text_data=None, bytes_data=None):
+        data = self._leer_frame(text_data)
+        if data is None:
+            return await self._error(None, "JSON inválido.")
+        canal = data.get("canal")
+        if data.get("type") not in ("message", "leer") or not isinstance(canal, str) or not canal.startswith("chat:"):
+            return await self._error(data.get("client_id"), "Frame no soportado.", {"canal": canal})
+        chat_id = canal.split(":", 1)[1]
+        if grupo_chat(chat_id) not in self.grupos:
+            return await self._error(data.get("client_id"), "No eres participante de este chat.", {"canal": canal})
+        if data["type"] == "leer":
+            return await self.recibir_lectura(chat_id, data, {"canal": canal})
+        await self.recibir_mensaje(chat_id, data, {"canal": canal})
+
+    async def chat_message(self, event):
+        payload = {
+            "canal": f"chat:{event['chat']}",
+            "type": "message",
+            "id_mensaje": event["id_mensaje"],
+            "texto": event["texto"],
+            "fecha": event["fecha"],
+            "estudiante": event["estudiante"],
+            "autor_alias": event.get("autor_alias"),
+            "client_id": event.get("client_id"),
         }
         await self.send(text_data=json.dumps(payload))
+
+    async def chat_leido(self, event):
+        await self.send(text_data=json.dumps({
+            "canal": f"chat:{event['chat']}",
+            "type": "leido_por",
+            "estudiante": event["estudiante"],
+            "hasta": event["hasta"],
+        }))
+
+    async def chat_unirse(self, event):
+        """ Se creó un chat en el que participa el usuario: suscribirse. """
+        grupo = grupo_chat(event["chat"])
+        if grupo not in self.grupos:
+            self.grupos.add(grupo)
+            await self.channel_layer.group_add(grupo, self.channel_name)
+        await self.send(text_data=json.dumps({"canal": "notificaciones", "type": "chat_nuevo", "chat": event["chat"]}))
+
+    async def notificacion_nueva(self, event):
+        await self.send(text_data=json.dumps({
+            "canal": "notificaciones",
+            "type": "notificacion",
+            "notificacion": event["notificacion"],
+        }))
@@ -0,0 +1,94 @@
+"""
+Contadores precalculados (counter cache) para los badges de la app.
+
+- ContadorUsuario.notificaciones_no_leidas: notificaciones sin leer por usuario.
+- ChatParticipante.no_leidos: mensajes sin leer por participante y chat,
+  derivable de la marca ChatParticipante.ultimo_mensaje_leido.
+
+Se actualizan con UPDATE ... SET x = x ± 1 en la misma transacción que el
+cambio que los origina, así que nunca se cuentan filas para leerlos.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ChatParticipante, ContadorUsuario, Mensaje, Notificacion
+
+
+def sumar_notificaciones(estudiante_ids):
+    ids = list(estudiante_ids)
+    if not ids:
+        return
+    ContadorUsuario.objects.bulk_create(
+        [ContadorUsuario(estudiante_id=i) for i in ids], ignore_conflicts=True
+    )
+    ContadorUsuario.objects.filter(estudiante_id__in=ids).update(
+        notificaciones_no_leidas=F("notificaciones_no_leidas") + 1
+    )
+
+
+def restar_notificacion(estudiante_id):
+    ContadorUsuario.objects.filter(estudiante_id=estudiante_id).update(
+        notificaciones_no_leidas=Greatest(F("notificaciones_no_leidas") - 1, 0)
+    )
+
+
+def reiniciar_notificaciones(estudiante_id):
+    ContadorUsuario.objects.filter(estudiante_id=estudiante_id).update(notificaciones_no_leidas=0)
+
+
+def sumar_mensaje(chat_id, remitente_id, cantidad=1):
+    ChatParticipante.objects.filter(chat_id=chat_id).exclude(estudiante_id=remitente_id).update(
+        no_leidos=F("no_leidos") + cantidad
+    )
+
+
+def marcar_leido(chat_id, estudiante_id, hasta=None):
+    """
+    Avanza la marca de lectura del participante hasta `hasta` (o el último
+    mensaje del chat) y recalcula no_leidos como el rango id_mensaje > marca.
+    Es un único UPDATE de una fila sin importar cuántos mensajes haya
+    pendientes; la marca nunca retrocede. Retorna (marca, no_leidos) o None
+    si el usuario no participa del chat.
+    """
+    ultimo = (
+        Mensaje.objects.filter(chat_id=chat_id).order_by("-id_mensaje").values_list("id_mensaje", flat=True).first()
+    ) or 0
+    hasta = ultimo if hasta is None else max(0, min(int(hasta), ultimo))
+
+    marca = Greatest(F("ultimo_mensaje_leido"), Value(hasta))
+    pendientes = (
+        Mensaje.objects.filter(chat_id=chat_id, id_mensaje__gt=Greatest(OuterRef("ultimo_mensaje_leido"), Value(hasta)))
+        .exclude(estudiante_id=estudiante_id)
+        .values("chat_id")
+        .annotate(total=Count("id_mensaje"))
+        .values("total")
+    )
+    participante = ChatParticipante.objects.filter(chat_id=chat_id, estudiante_id=estudiante_id)
+    if not participante.update(
+        ultimo_mensaje_leido=marca,
+        no_leidos=Coalesce(Subquery(pendientes, output_field=IntegerField()), 0),
+    ):
+        return None
+    return participante.values_list("ultimo_mensaje_leido", "no_leidos").first()
+
+
+def notificaciones_no_leidas(usuario):
+    """ Lee el contador; si el usuario aún no tiene fila, la crea contando una vez. """
+    valor = (
+        ContadorUsuario.objects.filter(estudiante=usuario)
+        .values_list("notificaciones_no_leidas", flat=True)
+        .first()
+    )
+    if valor is None:
+        valor = Notificacion.objects.filter(estudiante=usuario, leida=False).count()
+        ContadorUsuario.objects.get_or_create(
+            estudiante=usuario, defaults={"notificaciones_no_leidas": valor}
+        )
+    return valor
+
+
+def mensajes_no_leidos(usuario):
+    """ {id_chat: no_leidos} solo de los chats con mensajes pendientes. """
+    return dict(
+        ChatParticipante.objects.filter(estudiante=usuario, no_leidos__gt=0).values_list("chat_id", "no_leidos")
+    )
@@ -0,0 +1,80 @@
+import unicodedata
+
+from django.db.models import Count
+
+from .models import HabilidadPublicacion
+
+
+def normalizar_habilidad(valor):
+    """
+    Normaliza una habilidad para el índice: minúsculas, sin tildes
+    y con espacios colapsados ("  Diseño  Web" → "diseno web").
+    """
+    if not isinstance(valor, str):
+        return ""
+    texto = unicodedata.normalize("NFKD", valor)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())[:100]
+
+
+def normalizar_lista(valores):
+    if not isinstance(valores, (list, tuple)):
+        return set()
+    return {h for h in map(normalizar_habilidad, valores) if h}
+
+
+def pares_publicacion(publicacion):
+    """ Pares (habilidad, tipo) de las listas de la publicación. """
+    return {
+        (h, "ofrecida") for h in normalizar_lista(publicacion.habilidades_ofrecidas)
+    } | {
+        (h, "buscada") for h in normalizar_lista(publicacion.habilidades_buscadas)
+    }
+
+
+def indexar_publicacion(publicacion):
+    """
+    Sincroniza las filas del índice de una publicación, insertando y
+    borrando solo las habilidades que cambiaron. Devuelve los pares
+    (habilidad, tipo) que tenía antes o tiene ahora.
+    """
+    deseadas = pares_publicacion(publicacion)
+    actuales = set(
+        HabilidadPublicacion.objects.filter(publicacion=publicacion).values_list("habilidad", "tipo")
+    )
+
+    sobrantes = actuales - deseadas
+    if sobrantes:
+        for habilidad, tipo in sobrantes:
+            HabilidadPublicacion.objects.filter(
+                publicacion=publicacion, habilidad=habilidad, tipo=tipo
+            ).delete()
+
+    nuevas = deseadas - actuales
+    if nuevas:
+        HabilidadPublicacion.objects.bulk_create(
+            [HabilidadPublicacion(publicacion=publicacion, habilidad=h, tipo=t) for h, t in nuevas],
+            ignore_conflicts=True,
+        )
+    return actuales | deseadas
+
+
+def publicaciones_por_habilidades(habilidades, modo="or", tipo=None):
+    """
+    Devuelve un queryset de ids de publicación que contienen las habilidades
+    pedidas. En modo "and" deben estar todas; en modo "or", al menos una.
+    Solo toca las filas del índice de esas habilidades, nunca la tabla completa.
+    """
+    terminos = normalizar_lista(habilidades)
+    filas = HabilidadPublicacion.objects.filter(habilidad__in=terminos)
+    if tipo:
+        filas = filas.filter(tipo=tipo)
+
+    if modo == "and" and len(terminos) > 1:
+        return (
+            filas.values("publicacion_id")
+            .annotate(coincidencias=Count("habilidad", distinct=True))
+            .filter(coincidencias=len(terminos))
+            .values("publicacion_id")
+        )
+    return filas.values("publicacion_id")
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+GRUPO = "bench_capa_canales"
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def _receptor(settings_module, mensajes, poll_interval, listos, resultados):
+    """ Proceso hijo: se une al grupo y mide la latencia de cada mensaje. """
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    import django
+    django.setup()
+    from core.capa_canales import DatabaseChannelLayer
+
+    async def main():
+        capa = DatabaseChannelLayer(poll_interval=poll_interval, capacity=mensajes + 10)
+        canal = await capa.new_channel()
+        await capa.group_add(GRUPO, canal)
+        listos.put(os.getpid())
+        latencias = []
+        for _ in range(mensajes):
+            evento = await capa.receive(canal)
+            latencias.append(time.time() - evento["t"])
+        await capa.group_discard(GRUPO, canal)
+        return latencias
+
+    resultados.put(asyncio.run(main()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de fan-out de core.capa_canales.DatabaseChannelLayer "
+        "con N procesos receptores escuchando el mismo grupo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=4)
+        parser.add_argument("--mensajes", type=int, default=200)
+        parser.add_argument("--intervalo", type=float, default=0.005, help="Segundos entre group_send.")
+        parser.add_argument("--poll-interval", type=float, default=0.02)
+
+    def handle(self, *args, **opts):
+        nombre_db = str(settings.DATABASES["default"].get("NAME", ""))
+        if ":memory:" in nombre_db or "mode=memory" in nombre_db:
+            raise CommandError("La base de datos debe ser compartida entre procesos (no :memory:).")
+
+        from core.capa_canales import DatabaseChannelLayer
+
+        procesos, mensajes = opts["procesos"], opts["mensajes"]
+        ctx = multiprocessing.get_context("spawn")
+        listos, resultados = ctx.Queue(), ctx.Queue()
+        hijos = [
+            ctx.Process(
+                target=_receptor,
+                args=(os.environ["DJANGO_SETTINGS_MODULE"], mensajes, opts["poll_interval"], listos, resultados),
+            )
+            for _ in range(procesos)
+        ]
+        for hijo in hijos:
+            hijo.start()
+        for _ in hijos:
+            listos.get(timeout=60)
+
+        async def emitir():
+            capa = DatabaseChannelLayer()
+            inicio = time.perf_counter()
+            for i in range(mensajes):
+                await capa.group_send(GRUPO, {"type": "bench", "i": i, "t": time.time()})
+                await asyncio.sleep(opts["intervalo"])
+            return time.perf_counter() - inicio
+
+        duracion = asyncio.run(emitir())
+        latencias = []
+        for _ in hijos:
+            latencias.extend(resultados.get(timeout=120))
+        for hijo in hijos:
+            hijo.join()
+
+        ms = [l * 1000 for l in latencias]
+        self.stdout.write(
+            f"procesos={procesos} mensajes={mensajes} entregas={len(ms)} "
+            f"envío={mensajes / duracion:.0f} msg/s"
+        )
+        self.stdout.write(
+            "latencia ms: p50={:.1f} p95={:.1f} p99={:.1f} max={:.1f} media={:.1f}".format(
+                _percentil(ms, 50), _percentil(ms, 95), _percentil(ms, 99), max(ms), statistics.mean(ms)
+            )
+        )
@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_capa_canales import _percentil
+
+PREFIJO_EMAIL = "bench-escritor"
+
+
+def _escritor(settings_module, token, chat_id, mensajes, listo, inicio, resultados):
+    """
+    Proceso hijo: envía `mensajes` POST /mensajes/ a través del WSGIHandler
+    real (middleware, JWT, señales de request y cierre de conexiones según
+    CONN_MAX_AGE), como lo haría un worker de gunicorn.
+    """
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    import django
+    django.setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.client import RequestFactory
+
+    class _Entornos(RequestFactory):
+        def request(self, **peticion):
+            return self._base_environ(**peticion)
+
+    handler = WSGIHandler()
+    entornos = _Entornos()
+    estados = []
+
+    def start_response(status, headers, exc_info=None):
+        estados.append(int(status.split()[0]))
+
+    listo.put(os.getpid())
+    inicio.wait()
+    latencias, errores = [], 0
+    for i in range(mensajes):
+        environ = entornos.post(
+            "/mensajes/",
+            {"chat": chat_id, "texto": f"mensaje {i}"},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        t0 = time.perf_counter()
+        try:
+            respuesta = handler(environ, start_response)
+            b"".join(respuesta)
+            respuesta.close()
+            if estados[-1] != 201:
+                errores += 1
+        except Exception:
+            errores += 1
+        latencias.append(time.perf_counter() - t0)
+    resultados.put((latencias, errores))
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el throughput de escritura de POST /mensajes/ con N procesos "
+        "escritores en paralelo, cada uno en su propio chat, y verifica que "
+        "cada envío exitoso guarde una sola fila. Para comparar "
+        "configuraciones, ejecutar con otras variables DJANGO_DB_* / DJANGO_SQLITE_*."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--escritores", type=int, default=4)
+        parser.add_argument("--mensajes", type=int, default=200, help="Mensajes por escritor.")
+        parser.add_argument("--conservar", action="store_true", help="No borrar los usuarios y chats de prueba.")
+
+    def handle(self, *args, **opts):
+        db = settings.DATABASES["default"]
+        nombre_db = str(db.get("NAME", ""))
+        if db["ENGINE"].endswith("sqlite3") and (":memory:" in nombre_db or "mode=memory" in nombre_db):
+            raise CommandError("La base de datos debe ser compartida entre procesos (no :memory:).")
+
+        escritores, mensajes = opts["escritores"], opts["mensajes"]
+        preparados = self._preparar(escritores)
+
+        ctx = multiprocessing.get_context("spawn")
+        listo, resultados, inicio = ctx.Queue(), ctx.Queue(), ctx.Event()
+        hijos = [
+            ctx.Process(
+                target=_escritor,
+                args=(os.environ["DJANGO_SETTINGS_MODULE"], token, chat_id, mensajes, listo, inicio, resultados),
+            )
+            for token, chat_id in preparados
+        ]
+        try:
+            for hijo in hijos:
+                hijo.start()
+            for _ in hijos:
+                listo.get(timeout=60)
+            t0 = time.perf_counter()
+            inicio.set()
+            latencias, errores = [], 0
+            for _ in hijos:
+                parciales, fallidos = resultados.get(timeout=600)
+                latencias.extend(parciales)
+                errores += fallidos
+            duracion = time.perf_counter() - t0
+            for hijo in hijos:
+                hijo.join()
+            filas = self._contar_filas([chat_id for _, chat_id in preparados])
+        finally:
+            if not opts["conservar"]:
+                self._limpiar()
+
+        ms = [l * 1000 for l in latencias]
+        opciones = db.get("OPTIONS", {})
+        self.stdout.write(
+            f"motor={db['ENGINE'].rsplit('.', 1)[-1]} conn_max_age={db.get('CONN_MAX_AGE')} "
+            f"pool={'pool' in opciones} transaction_mode={opciones.get('transaction_mode')}"
+        )
+        self.stdout.write(
+            f"escritores={escritores} mensajes={len(ms)} errores={errores} "
+            f"duración={duracion:.2f}s throughput={(len(ms) - errores) / duracion:.0f} msg/s"
+        )
+        self.stdout.write(
+            "latencia ms: p50={:.1f} p95={:.1f} p99={:.1f} max={:.1f} media={:.1f}".format(
+                _percentil(ms, 50), _percentil(ms, 95), _percentil(ms, 99), max(ms), statistics.mean(ms)
+            )
+        )
+        # Cada POST exitoso debe dejar exactamente una fila
+        esperadas = len(ms) - errores
+        self.stdout.write(f"filas={filas} esperadas={esperadas}")
+        if filas != esperadas:
+            raise CommandError(f"Se esperaban {esperadas} mensajes guardados y hay {filas}.")
+
+    def _preparar(self, escritores):
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from core.models import Chat, ChatParticipante, Perfil, Publicacion
+
+        User = get_user_model()
+        self._limpiar()
+        preparados = []
+        for i in range(escritores):
+            autor = User.objects.create_user(email=f"{PREFIJO_EMAIL}-autor-{i}@bench.local", password=None)
+            escritor = User.objects.create_user(email=f"{PREFIJO_EMAIL}-{i}@bench.local", password=None)
+            for usuario in (autor, escritor):
+                Perfil.objects.create(estudiante=usuario, nombre="Bench", apellido="Bench", carrera="-", area="-")
+            publicacion = Publicacion.objects.create(titulo=f"bench {i}", estudiante=autor)
+            chat = Chat.objects.create(publicacion=publicacion, titulo=f"bench {i}")
+            ChatParticipante.objects.create(chat=chat, estudiante=autor, rol="autor")
+            ChatParticipante.objects.create(chat=chat, estudiante=escritor, rol="receptor")
+            preparados.append((str(AccessToken.for_user(escritor)), chat.pk))
+        return preparados
+
+    def _contar_filas(self, chats):
+        from core.models import Mensaje
+        return Mensaje.objects.filter(chat_id__in=chats).count()
+
+    def _limpiar(self):
+        from django.contrib.auth import get_user_model
+        get_user_model().objects.filter(email__startswith=PREFIJO_EMAIL, email__endswith="@bench.local").delete()
@@ -0,0 +1,106 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+PREFIJO_EMAIL = "bench-proyecciones"
+
+
+def _medir(funcion, repeticiones):
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos, resultado
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el listado con ModelSerializer + JSONRenderer contra las "
+        "proyecciones .values() + ORJSONRenderer (core/proyecciones.py) para "
+        "publicaciones, mensajes y notificaciones, con N filas por modelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=10000)
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--conservar", action="store_true", help="No borrar los datos de prueba.")
+
+    def handle(self, *args, **opts):
+        from core.models import Mensaje, Notificacion, Publicacion
+        from core.proyecciones import ProyeccionMensaje, ProyeccionNotificacion, ProyeccionPublicacion
+        from core.renderers import ORJSONRenderer
+        from core.serializers import MensajeSerializer, NotificacionSerializer, PublicacionSerializer
+
+        autor, chat = self._preparar(opts["filas"])
+        casos = [
+            ("publicaciones", PublicacionSerializer, ProyeccionPublicacion,
+             Publicacion.objects.filter(estudiante=autor).select_related("estudiante__perfil").order_by("-id_publicacion"),
+             ("id_publicacion", "titulo", "autor_alias")),
+            ("mensajes", MensajeSerializer, ProyeccionMensaje,
+             Mensaje.objects.filter(chat=chat).select_related("estudiante__perfil").order_by("id_mensaje"),
+             ("id_mensaje", "texto", "fecha")),
+            ("notificaciones", NotificacionSerializer, ProyeccionNotificacion,
+             Notificacion.objects.filter(estudiante=autor).order_by("-actualizada"),
+             ("id_notificacion", "mensaje", "leida")),
+        ]
+        try:
+            for nombre, serializer, proyeccion, queryset, parciales in casos:
+                def actual():
+                    return JSONRenderer().render(serializer(list(queryset.all()), many=True).data)
+
+                def proyectado(campos=proyeccion.campos()):
+                    return ORJSONRenderer().render(proyeccion.filas(proyeccion.consulta(queryset.all(), campos), campos))
+
+                base, esperado = _medir(actual, opts["repeticiones"])
+                rapido, obtenido = _medir(proyectado, opts["repeticiones"])
+                parcial, _ = _medir(lambda: proyectado(parciales), opts["repeticiones"])
+                if obtenido != esperado:
+                    raise CommandError(f"{nombre}: la proyección no coincide con {serializer.__name__}")
+
+                self._reportar(nombre, "serializer", base, base)
+                self._reportar(nombre, "proyeccion", rapido, base)
+                self._reportar(nombre, f"fields={','.join(parciales)}", parcial, base)
+        finally:
+            if not opts["conservar"]:
+                self._limpiar()
+
+    def _reportar(self, nombre, version, tiempos, base):
+        ms = statistics.median(tiempos) * 1000
+        self.stdout.write(
+            f"{nombre:<15} {version:<40} mediana={ms:>8.1f} ms  min={min(tiempos) * 1000:>8.1f} ms  "
+            f"x{statistics.median(base) * 1000 / ms:.1f}"
+        )
+
+    def _preparar(self, filas):
+        from django.contrib.auth import get_user_model
+
+        from core.models import Chat, ChatParticipante, Mensaje, Notificacion, Perfil, Publicacion
+
+        User = get_user_model()
+        self._limpiar()
+        autor = User.objects.create_user(email=f"{PREFIJO_EMAIL}-autor@bench.local", password=None)
+        otro = User.objects.create_user(email=f"{PREFIJO_EMAIL}-otro@bench.local", password=None)
+        Perfil.objects.create(estudiante=autor, alias="bench", nombre="Bench", apellido="Bench", carrera="-", area="-")
+        publicaciones = Publicacion.objects.bulk_create([
+            Publicacion(titulo=f"bench {i}", descripcion="descripción " * 10, estudiante=autor,
+                        habilidades_ofrecidas=["python", "django"], habilidades_buscadas=["react"])
+            for i in range(filas)
+        ], batch_size=1000)
+        chat = Chat.objects.create(publicacion=publicaciones[0], titulo="bench")
+        ChatParticipante.objects.create(chat=chat, estudiante=autor, rol="autor")
+        ChatParticipante.objects.create(chat=chat, estudiante=otro, rol="receptor")
+        Mensaje.objects.bulk_create([
+            Mensaje(chat=chat, estudiante=autor if i % 2 else otro, texto=f"mensaje {i}") for i in range(filas)
+        ], batch_size=1000)
+        Notificacion.objects.bulk_create([
+            Notificacion(estudiante=autor, publicacion=publicacion, tipo="nuevo_chat", mensaje=f"bench {i}", leida=bool(i % 3))
+            for i, publicacion in enumerate(publicaciones)
+        ], batch_size=1000)
+        return autor, chat
+
+    def _limpiar(self):
+        from django.contrib.auth import get_user_model
+        get_user_model().objects.filter(email__startswith=PREFIJO_EMAIL, email__endswith="@bench.local").delete()
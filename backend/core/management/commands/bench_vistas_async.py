@@ -0,0 +1,146 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from .bench_capa_canales import _percentil
+
+PREFIJO_EMAIL = "bench-async"
+
+
+async def _peticion(app, ruta, token):
+    """ Una petición GET a la aplicación ASGI, como la entregaría daphne. """
+    path, _, query = ruta.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    enviado = False
+    desconexion = asyncio.Event()
+    estado = None
+
+    async def receive():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await desconexion.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensaje):
+        nonlocal estado
+        if mensaje["type"] == "http.response.start":
+            estado = mensaje["status"]
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        desconexion.set()
+    return estado
+
+
+async def _medir(app, ruta, token, peticiones, concurrencia):
+    """ `concurrencia` conexiones abiertas a la vez hasta completar `peticiones`. """
+    pendientes = iter(range(peticiones))
+    latencias, errores = [], 0
+
+    async def conexion():
+        nonlocal errores
+        for _ in pendientes:
+            t0 = time.perf_counter()
+            try:
+                if await _peticion(app, ruta, token) != 200:
+                    errores += 1
+            except Exception:
+                errores += 1
+            latencias.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(conexion() for _ in range(concurrencia)))
+    return latencias, errores, time.perf_counter() - t0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara peticiones/s y latencias de las vistas DRF síncronas con sus "
+        "versiones async nativas (core/views_async.py) sobre la aplicación "
+        "ASGI del proyecto, con N conexiones concurrentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrencia", type=int, default=200)
+        parser.add_argument("--peticiones", type=int, default=1000, help="Peticiones por endpoint y versión.")
+        parser.add_argument("--conservar", action="store_true", help="No borrar los datos de prueba.")
+
+    def handle(self, *args, **opts):
+        from django.core.asgi import get_asgi_application
+
+        token, chat_id = self._preparar()
+        rutas = [
+            ("feed", "/publicaciones/"),
+            ("bandeja", "/chats/bandeja/"),
+            ("historial", f"/chats/{chat_id}/mensajes/"),
+            ("notificaciones", "/notificaciones/"),
+        ]
+        app = get_asgi_application()
+        try:
+            for nombre, ruta in rutas:
+                for version, prefijo in (("sync", ""), ("async", "/async")):
+                    # Calentamiento: cache de respuestas, usuario autenticado, conexiones
+                    asyncio.run(_medir(app, prefijo + ruta, token, 20, 5))
+                    latencias, errores, duracion = asyncio.run(
+                        _medir(app, prefijo + ruta, token, opts["peticiones"], opts["concurrencia"])
+                    )
+                    self._reportar(nombre, version, latencias, errores, duracion)
+        finally:
+            if not opts["conservar"]:
+                self._limpiar()
+
+    def _reportar(self, nombre, version, latencias, errores, duracion):
+        ms = [l * 1000 for l in latencias]
+        self.stdout.write(
+            f"{nombre:<15} {version:<5} req/s={(len(ms) - errores) / duracion:>7.0f} errores={errores} "
+            "p50={:.1f} p99={:.1f} max={:.1f} media={:.1f} ms".format(
+                _percentil(ms, 50), _percentil(ms, 99), max(ms), statistics.mean(ms)
+            )
+        )
+
+    def _preparar(self):
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from core.models import Chat, ChatParticipante, Mensaje, Notificacion, Perfil, Publicacion
+
+        User = get_user_model()
+        self._limpiar()
+        autor = User.objects.create_user(email=f"{PREFIJO_EMAIL}-autor@bench.local", password=None)
+        lector = User.objects.create_user(email=f"{PREFIJO_EMAIL}-lector@bench.local", password=None)
+        for usuario in (autor, lector):
+            Perfil.objects.create(estudiante=usuario, nombre="Bench", apellido="Bench", carrera="-", area="-")
+        publicaciones = Publicacion.objects.bulk_create(
+            [Publicacion(titulo=f"bench {i}", estudiante=autor) for i in range(50)]
+        )
+        for i, publicacion in enumerate(publicaciones[:10]):
+            chat = Chat.objects.create(publicacion=publicacion, titulo=f"bench {i}")
+            ChatParticipante.objects.create(chat=chat, estudiante=autor, rol="autor")
+            ChatParticipante.objects.create(chat=chat, estudiante=lector, rol="receptor")
+            Notificacion.objects.create(estudiante=lector, chat=chat, mensaje=f"bench {i}")
+        Mensaje.objects.bulk_create(
+            [Mensaje(chat=chat, estudiante=autor if i % 2 else lector, texto=f"mensaje {i}") for i in range(200)]
+        )
+        return str(AccessToken.for_user(lector)), chat.pk
+
+    def _limpiar(self):
+        from django.contrib.auth import get_user_model
+        get_user_model().objects.filter(email__startswith=PREFIJO_EMAIL, email__endswith="@bench.local").delete()
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from interu_backend.routers import REPLICA, replica_configurada
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia la base primaria SQLite sobre el archivo de la réplica "
+        "(DJANGO_DB_REPLICA_NAME) para probar el router de réplica en local. "
+        "En PostgreSQL la réplica se mantiene con replicación nativa."
+    )
+
+    def handle(self, *args, **opts):
+        if not replica_configurada():
+            raise CommandError("No hay réplica configurada (DJANGO_DB_REPLICA_NAME).")
+        primaria, replica = connections["default"], connections[REPLICA]
+        if primaria.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Solo disponible con SQLite en ambas bases.")
+        destino_nombre = str(replica.settings_dict["NAME"])
+        if destino_nombre == str(primaria.settings_dict["NAME"]):
+            raise CommandError("La réplica apunta al mismo archivo que la primaria.")
+
+        replica.close()
+        primaria.ensure_connection()
+        destino = sqlite3.connect(destino_nombre)
+        try:
+            # API de backup en línea: copia consistente aunque haya escritores
+            primaria.connection.backup(destino)
+        finally:
+            destino.close()
+        self.stdout.write(self.style.SUCCESS(f"Réplica sincronizada en {destino_nombre}"))
@@ -0,0 +1,151 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from . import contadores, sincronizacion
+from .models import Chat, ChatParticipante, Mensaje
+from .notificaciones import notificar
+from .tiempo_real import enviar_a_grupo, grupo_chat
+
+
+def es_participante(chat_id, usuario):
+    return ChatParticipante.objects.filter(chat_id=chat_id, estudiante=usuario).exists()
+
+
+def alias_de(usuario):
+    perfil = getattr(usuario, "perfil", None)
+    return perfil.alias if perfil and perfil.alias else usuario.username
+
+
+def evento_mensaje(mensaje):
+    """ Payload que recibe ChatConsumer.chat_message para el group_send. """
+    return {
+        "type": "chat_message",
+        "chat": mensaje.chat_id,
+        "id_mensaje": mensaje.id_mensaje,
+        "texto": mensaje.texto,
+        "fecha": mensaje.fecha.isoformat(),
+        "estudiante": mensaje.estudiante_id,
+        "autor_alias": alias_de(mensaje.estudiante),
+        "client_id": mensaje.client_id,
+    }
+
+
+def registrar_mensaje(chat, remitente, texto, client_id=None):
+    """
+    Inserta un mensaje y notifica a los demás participantes.
+    Si `client_id` ya fue usado por el remitente, devuelve el mensaje existente
+    sin volver a insertarlo. Retorna (mensaje, creado).
+    """
+    if client_id:
+        existente = Mensaje.objects.filter(estudiante=remitente, client_id=client_id).first()
+        if existente:
+            return existente, False
+
+    try:
+        with transaction.atomic():
+            mensaje = Mensaje.objects.create(
+                chat=chat, estudiante=remitente, texto=texto, client_id=client_id or None
+            )
+            contadores.sumar_mensaje(chat.pk, remitente.pk)
+            notificar("nuevo_mensaje", chat=chat, excluir=remitente)
+    except IntegrityError:
+        # Otro envío con el mismo client_id ganó la carrera
+        if not client_id:
+            raise
+        return Mensaje.objects.get(estudiante=remitente, client_id=client_id), False
+    return mensaje, True
+
+
+def registrar_lote(remitente, items):
+    """
+    Inserta los mensajes `items` ([{"chat", "texto", "client_id"}]) que el
+    remitente encoló sin conexión, con un costo fijo por lote y por chat:
+      - una consulta de participación para todos los chats del lote;
+      - los client_id ya guardados (o repetidos en el lote) no se reinsertan;
+      - un bulk_create, y por chat un UPDATE de contadores, una notificación
+        agrupada y un solo evento de WebSocket ("chat_mensajes") tras el commit.
+    Retorna un resultado por item, en el mismo orden.
+    """
+    permitidos = set(
+        ChatParticipante.objects.filter(
+            estudiante=remitente, chat_id__in={item["chat"] for item in items}
+        ).values_list("chat_id", flat=True)
+    )
+    client_ids = [item["client_id"] for item in items]
+
+    for intento in range(2):
+        try:
+            with transaction.atomic():
+                existentes = {
+                    m.client_id: m
+                    for m in Mensaje.objects.filter(estudiante=remitente, client_id__in=client_ids)
+                }
+                nuevos = {}
+                for item in items:
+                    cid = item["client_id"]
+                    if item["chat"] in permitidos and cid not in existentes and cid not in nuevos:
+                        nuevos[cid] = Mensaje(
+                            chat_id=item["chat"], estudiante=remitente, texto=item["texto"], client_id=cid
+                        )
+                creados = Mensaje.objects.bulk_create(list(nuevos.values()))
+                sincronizacion.registrar(creados, nuevos=True)
+                _contabilizar_lote(remitente, creados)
+            break
+        except IntegrityError:
+            # Otro envío con alguno de estos client_id ganó la carrera
+            if intento:
+                raise
+
+    resultados = []
+    for item in items:
+        cid = item["client_id"]
+        if item["chat"] not in permitidos:
+            resultados.append({"client_id": cid, "chat": item["chat"], "error": "No eres participante de este chat."})
+            continue
+        mensaje = existentes.get(cid) or nuevos[cid]
+        resultados.append({
+            "client_id": cid,
+            "chat": mensaje.chat_id,
+            "id_mensaje": mensaje.id_mensaje,
+            "fecha": mensaje.fecha,
+            "duplicado": cid in existentes,
+        })
+        # Un client_id repetido dentro del lote apunta al primero
+        existentes.setdefault(cid, mensaje)
+    return resultados
+
+
+def _contabilizar_lote(remitente, mensajes):
+    por_chat = defaultdict(list)
+    for mensaje in mensajes:
+        por_chat[mensaje.chat_id].append(mensaje)
+    if not por_chat:
+        return
+    for chat in Chat.objects.filter(pk__in=por_chat).only("id_chat", "titulo"):
+        del_chat = por_chat[chat.pk]
+        contadores.sumar_mensaje(chat.pk, remitente.pk, len(del_chat))
+        notificar("nuevo_mensaje", chat=chat, excluir=remitente, cantidad=len(del_chat))
+        enviar_a_grupo(grupo_chat(chat.pk), {
+            "type": "chat_mensajes",
+            "mensajes": [evento_mensaje(m) for m in del_chat],
+        })
+
+
+def marcar_leido(chat_id, usuario, hasta=None):
+    """
+    Marca el chat como leído hasta `hasta` y avisa al grupo del chat para
+    que los demás participantes vean el acuse de lectura.
+    Retorna {"chat", "hasta", "no_leidos"} o None si no participa.
+    """
+    resultado = contadores.marcar_leido(chat_id, usuario.pk, hasta)
+    if resultado is None:
+        return None
+    marca, no_leidos = resultado
+    enviar_a_grupo(grupo_chat(chat_id), {
+        "type": "chat_leido",
+        "chat": int(chat_id),
+        "estudiante": usuario.pk,
+        "hasta": marca,
+    })
+    return {"chat": int(chat_id), "hasta": marca, "no_leidos": no_leidos}
@@ -1,10 +1,100 @@
 # core/middleware.py
+from urllib.parse import parse_qs
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from rest_framework.permissions import SAFE_METHODS
+
+from interu_backend.routers import marcar_escritura, replica_configurada
+
+
+class _MiddlewareSyncAsync:
+    """
+    Base para middlewares que sirven tanto a WSGI como a ASGI: con una cadena
+    async (vistas de core/views_async.py bajo daphne) no fuerzan el salto a
+    un hilo que haría Django con un middleware solo síncrono.
+    """
+    sync_capable = True
+    async_capable = True
 
-class SecurityHeadersMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.procesar(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return await self.aprocesar(request, await self.get_response(request))
+
+    def procesar(self, request, response):
+        return response
+
+    async def aprocesar(self, request, response):
+        return self.procesar(request, response)
+
+
+class SecurityHeadersMiddleware(_MiddlewareSyncAsync):
+    def procesar(self, request, response):
         response['X-Content-Type-Options'] = 'nosniff'
         return response
+
+
+class PrimariaTrasEscrituraMiddleware(_MiddlewareSyncAsync):
+    """
+    Tras una escritura exitosa, las lecturas del usuario van a la base
+    primaria durante REPLICA_VENTANA_PRIMARIA segundos (ver
+    interu_backend/routers.py). DRF deja el usuario autenticado por JWT en
+    request.user, así que aquí ya está disponible al volver de la vista.
+    """
+    def _escribio(self, request, response):
+        return (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and replica_configurada()
+            and getattr(request, "user", None) is not None
+            and request.user.is_authenticated
+        )
+
+    def procesar(self, request, response):
+        if self._escribio(request, response):
+            marcar_escritura(request.user.pk)
+        return response
+
+    async def aprocesar(self, request, response):
+        # Las lecturas (el caso frecuente) no tocan el cache
+        if self._escribio(request, response):
+            await sync_to_async(marcar_escritura)(request.user.pk)
+        return response
+
+
+@database_sync_to_async
+def _usuario_desde_token(token):
+    from accounts.authentication import CachedJWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+    auth = CachedJWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Autentica WebSockets con el access token JWT enviado como ?token=<jwt>
+    (los navegadores y React Native no permiten cabeceras en el handshake).
+    Si no hay token se conserva el usuario de la sesión.
+    """
+    async def __call__(self, scope, receive, send):
+        params = parse_qs(scope.get("query_string", b"").decode())
+        token = params.get("token", [None])[0]
+        if token:
+            user = await _usuario_desde_token(token)
+            if user is not None:
+                scope = dict(scope, user=user)
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_chat_titulo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(fields=['estado', '-fecha_creacion', '-id_publicacion'], name='pub_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:16
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalizar_habilidad(valor):
+    # Copia congelada de core.habilidades.normalizar_habilidad: la migración
+    # no debe cambiar si el código de la app cambia después.
+    if not isinstance(valor, str):
+        return ''
+    texto = unicodedata.normalize('NFKD', valor)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())[:100]
+
+
+def poblar_indice(apps, schema_editor):
+    Publicacion = apps.get_model('core', 'Publicacion')
+    HabilidadPublicacion = apps.get_model('core', 'HabilidadPublicacion')
+    filas = []
+    for pub in Publicacion.objects.only('id_publicacion', 'habilidades_ofrecidas', 'habilidades_buscadas').iterator():
+        for tipo, valores in (('ofrecida', pub.habilidades_ofrecidas), ('buscada', pub.habilidades_buscadas)):
+            if not isinstance(valores, list):
+                continue
+            for habilidad in {normalizar_habilidad(v) for v in valores} - {''}:
+                filas.append(HabilidadPublicacion(publicacion_id=pub.id_publicacion, habilidad=habilidad, tipo=tipo))
+    HabilidadPublicacion.objects.bulk_create(filas, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_publicacion_feed_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabilidadPublicacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('habilidad', models.CharField(max_length=100)),
+                ('tipo', models.CharField(choices=[('ofrecida', 'Ofrecida'), ('buscada', 'Buscada')], max_length=10)),
+                ('publicacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indice_habilidades', to='core.publicacion')),
+            ],
+            options={
+                'unique_together': {('habilidad', 'tipo', 'publicacion')},
+            },
+        ),
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
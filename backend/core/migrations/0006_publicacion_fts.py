@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Copia congelada del esquema de core.busqueda: la migración no debe
+# cambiar si el módulo de búsqueda cambia después.
+FTS_TABLA = 'core_publicacion_fts'
+PG_VECTOR = (
+    "(setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B'))"
+)
+
+
+def crear(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLA} USING fts5('
+            "titulo, descripcion, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLA}(rowid, titulo, descripcion) '
+            "SELECT id_publicacion, titulo, coalesce(descripcion, '') FROM core_publicacion"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS pub_fts_gin ON core_publicacion USING GIN ({PG_VECTOR})'
+        )
+
+
+def eliminar(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLA}')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS pub_fts_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_habilidadpublicacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, eliminar),
+    ]
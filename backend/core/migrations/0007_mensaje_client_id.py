@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_publicacion_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mensaje',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='mensaje',
+            constraint=models.UniqueConstraint(fields=('estudiante', 'client_id'), name='mensaje_client_id_unico'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_mensaje_client_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanalGrupo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grupo', models.CharField(max_length=255)),
+                ('canal', models.CharField(max_length=255)),
+                ('expira', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('grupo', 'canal')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CanalMensaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(max_length=255)),
+                ('contenido', models.TextField()),
+                ('expira', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['canal', 'id'], name='canal_msg_cola_idx')],
+            },
+        ),
+    ]
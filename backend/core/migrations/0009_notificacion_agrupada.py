@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:33
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max
+
+
+def agrupar_existentes(apps, schema_editor):
+    Notificacion = apps.get_model('core', 'Notificacion')
+    Notificacion.objects.update(actualizada=F('fecha'))
+
+    pendientes = Notificacion.objects.filter(tipo='nuevo_mensaje', leida=False)
+    grupos = (
+        pendientes.values('estudiante_id', 'chat_id')
+        .annotate(total=Count('id_notificacion'), ultima=Max('id_notificacion'), fecha_max=Max('fecha'))
+        .filter(total__gt=1)
+    )
+    for grupo in grupos:
+        filas = pendientes.filter(estudiante_id=grupo['estudiante_id'], chat_id=grupo['chat_id'])
+        filas.exclude(id_notificacion=grupo['ultima']).delete()
+        Notificacion.objects.filter(id_notificacion=grupo['ultima']).update(
+            contador=grupo['total'], actualizada=grupo['fecha_max']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_capa_canales'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='actualizada',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='contador',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(agrupar_existentes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificacion',
+            constraint=models.UniqueConstraint(condition=models.Q(('leida', False), ('tipo', 'nuevo_mensaje')), fields=('estudiante', 'chat'), name='notif_mensaje_no_leida_unica'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def poblar_contadores(apps, schema_editor):
+    ChatParticipante = apps.get_model('core', 'ChatParticipante')
+    Mensaje = apps.get_model('core', 'Mensaje')
+    Notificacion = apps.get_model('core', 'Notificacion')
+    ContadorUsuario = apps.get_model('core', 'ContadorUsuario')
+
+    no_leidos = (
+        Mensaje.objects.filter(chat_id=OuterRef('chat_id'), leido=False)
+        .exclude(estudiante_id=OuterRef('estudiante_id'))
+        .values('chat_id')
+        .annotate(total=Count('id_mensaje'))
+        .values('total')
+    )
+    ChatParticipante.objects.update(
+        no_leidos=Coalesce(Subquery(no_leidos, output_field=models.IntegerField()), 0)
+    )
+
+    ContadorUsuario.objects.bulk_create(
+        [
+            ContadorUsuario(estudiante_id=fila['estudiante_id'], notificaciones_no_leidas=fila['total'])
+            for fila in Notificacion.objects.filter(leida=False)
+            .values('estudiante_id')
+            .annotate(total=Count('id_notificacion'))
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('core', '0009_notificacion_agrupada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorUsuario',
+            fields=[
+                ('estudiante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('notificaciones_no_leidas', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='chatparticipante',
+            name='no_leidos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
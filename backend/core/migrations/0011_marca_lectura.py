@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def poblar_marcas(apps, schema_editor):
+    """
+    La marca queda justo antes del primer mensaje ajeno sin leer (o en el
+    último mensaje del chat si no hay pendientes), y no_leidos se recalcula
+    como el rango id_mensaje > marca.
+    """
+    ChatParticipante = apps.get_model('core', 'ChatParticipante')
+    Mensaje = apps.get_model('core', 'Mensaje')
+
+    ajenos = Mensaje.objects.filter(chat_id=OuterRef('chat_id')).exclude(estudiante_id=OuterRef('estudiante_id'))
+    primer_pendiente = ajenos.filter(leido=False).values('chat_id').annotate(m=Min('id_mensaje')).values('m')
+    ultimo = Mensaje.objects.filter(chat_id=OuterRef('chat_id')).values('chat_id').annotate(m=Max('id_mensaje')).values('m')
+    ChatParticipante.objects.update(
+        ultimo_mensaje_leido=Coalesce(
+            Subquery(primer_pendiente, output_field=models.IntegerField()) - 1,
+            Subquery(ultimo, output_field=models.IntegerField()),
+            Value(0),
+        )
+    )
+    pendientes = (
+        ajenos.filter(id_mensaje__gt=OuterRef('ultimo_mensaje_leido'))
+        .values('chat_id').annotate(total=Count('id_mensaje')).values('total')
+    )
+    ChatParticipante.objects.update(
+        no_leidos=Coalesce(Subquery(pendientes, output_field=models.IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_contadores'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatparticipante',
+            name='ultimo_mensaje_leido',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['chat', 'id_mensaje'], name='mensaje_chat_id_idx'),
+        ),
+        migrations.RunPython(poblar_marcas, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='mensaje',
+            name='leido',
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+
+def poblar_reputacion(apps, schema_editor):
+    CalificacionChat = apps.get_model('core', 'CalificacionChat')
+    ChatParticipante = apps.get_model('core', 'ChatParticipante')
+    Reputacion = apps.get_model('core', 'Reputacion')
+
+    otro = (
+        ChatParticipante.objects.filter(chat_id=OuterRef('chat_id'))
+        .exclude(estudiante_id=OuterRef('evaluador_id'))
+        .values('estudiante_id')[:1]
+    )
+    CalificacionChat.objects.update(evaluado_id=Subquery(otro))
+
+    filas = (
+        CalificacionChat.objects.filter(evaluado__isnull=False)
+        .values('evaluado_id')
+        .annotate(
+            total=Count('id_calificacion'),
+            suma=Sum('puntaje'),
+            **{f'estrellas_{i}': Count('id_calificacion', filter=Q(puntaje=i)) for i in range(1, 6)},
+        )
+    )
+    Reputacion.objects.bulk_create(
+        [
+            Reputacion(estudiante_id=fila.pop('evaluado_id'), promedio=fila['suma'] / fila['total'], **fila)
+            for fila in filas
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('core', '0011_marca_lectura'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reputacion',
+            fields=[
+                ('estudiante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reputacion', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('suma', models.PositiveIntegerField(default=0)),
+                ('promedio', models.FloatField(default=0)),
+                ('estrellas_1', models.PositiveIntegerField(default=0)),
+                ('estrellas_2', models.PositiveIntegerField(default=0)),
+                ('estrellas_3', models.PositiveIntegerField(default=0)),
+                ('estrellas_4', models.PositiveIntegerField(default=0)),
+                ('estrellas_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='calificacionchat',
+            name='evaluado',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calificaciones_recibidas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='calificacionchat',
+            index=models.Index(fields=['evaluado', '-fecha', '-id_calificacion'], name='calif_evaluado_idx'),
+        ),
+        migrations.RunPython(poblar_reputacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_fecha_actualizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='publicacion',
+            name='pub_feed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='chatparticipante',
+            index=models.Index(fields=['estudiante', 'chat'], name='participante_estudiante_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['chat', 'fecha'], name='mensaje_chat_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['estudiante', '-actualizada'], name='notif_estudiante_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leida', False)), fields=['estudiante', '-fecha'], name='notif_no_leidas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['-fecha_creacion', '-id_publicacion'], name='pub_feed_activas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['estudiante'], name='pub_autor_activas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['-fecha_actualizacion'], name='pub_activas_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(fields=['estado', '-fecha'], name='reporte_estado_fecha_idx'),
+        ),
+    ]
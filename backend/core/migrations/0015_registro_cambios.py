@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:06
+
+from itertools import islice
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def poblar_registro(apps, schema_editor):
+    """ Una fila por objeto visible existente, para que since=0 devuelva el estado completo. """
+    RegistroCambio = apps.get_model('core', 'RegistroCambio')
+    fuentes = [
+        ('publicacion', apps.get_model('core', 'Publicacion').objects.filter(estado=True), lambda o: {}),
+        ('chat', apps.get_model('core', 'Chat').objects.all(), lambda o: {'id_chat': o['pk']}),
+        ('calificacion', apps.get_model('core', 'CalificacionChat').objects.all(), lambda o: {'id_chat': o['chat_id']}),
+        ('mensaje', apps.get_model('core', 'Mensaje').objects.all(), lambda o: {'id_chat': o['chat_id']}),
+        ('notificacion', apps.get_model('core', 'Notificacion').objects.all(), lambda o: {'id_estudiante': o['estudiante_id']}),
+    ]
+    for modelo, queryset, alcance in fuentes:
+        campos = ['pk'] + [f for f in ('chat_id', 'estudiante_id') if f in {c.attname for c in queryset.model._meta.concrete_fields}]
+        filas = (
+            RegistroCambio(modelo=modelo, objeto_id=o['pk'], **alcance(o))
+            for o in queryset.order_by('pk').values(*campos).iterator()
+        )
+        while lote := list(islice(filas, 1000)):
+            RegistroCambio.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroCambio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('publicacion', 'Publicación'), ('chat', 'Chat'), ('mensaje', 'Mensaje'), ('notificacion', 'Notificación'), ('calificacion', 'Calificación')], max_length=20)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('eliminado', models.BooleanField(default=False)),
+                ('id_chat', models.PositiveIntegerField(blank=True, null=True)),
+                ('id_estudiante', models.PositiveIntegerField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['modelo', 'objeto_id'], name='cambio_objeto_idx'), models.Index(fields=['modelo', 'id'], name='cambio_publico_idx'), models.Index(fields=['id_chat', 'id'], name='cambio_chat_idx'), models.Index(fields=['id_estudiante', 'id'], name='cambio_estudiante_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_registro, migrations.RunPython.noop),
+    ]
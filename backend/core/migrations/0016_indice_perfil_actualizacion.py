@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_registro_cambios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='perfil',
+            index=models.Index(fields=['-fecha_actualizacion'], name='perfil_act_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 import uuid
 import secrets
 
@@ -18,6 +19,14 @@ class Perfil(models.Model):
     foto = models.URLField(blank=True, null=True)
     #Lista JSON
     habilidades_ofrecidas = models.JSONField(default=list, blank=True) 
+    # Validador para respuestas condicionales (ETag / Last-Modified)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Último cambio de perfil (alias en el feed) para el ETag del feed
+            models.Index(fields=['-fecha_actualizacion'], name='perfil_act_idx'),
+        ]
 
     def __str__(self):
         return self.alias or f"{self.nombre} {self.apellido or ''}"
@@ -34,12 +43,44 @@ class Publicacion(models.Model):
     habilidades_buscadas = models.JSONField(default=list, blank=True)   
 
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     estado = models.BooleanField(default=True)
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Feed público: orden keyset (fecha, id) sobre las activas. Parcial
+            # porque estado=True se compila como predicado booleano, no como
+            # igualdad, y no sirve como prefijo de un índice compuesto.
+            models.Index(
+                fields=['-fecha_creacion', '-id_publicacion'], name='pub_feed_activas_idx', condition=models.Q(estado=True)
+            ),
+            # Publicaciones activas de un autor (recomendaciones, invalidación de cache)
+            models.Index(fields=['estudiante'], name='pub_autor_activas_idx', condition=models.Q(estado=True)),
+            # MAX(fecha_actualizacion) de las activas para el ETag del feed
+            models.Index(fields=['-fecha_actualizacion'], name='pub_activas_act_idx', condition=models.Q(estado=True)),
+        ]
+
     def __str__(self):
         return self.titulo
 
+
+class HabilidadPublicacion(models.Model):
+    """
+    Índice invertido habilidad → publicación. Se mantiene sincronizado
+    desde las señales de Publicacion (ver core/signals.py).
+    """
+    TIPO_CHOICES = (('ofrecida', 'Ofrecida'), ('buscada', 'Buscada'))
+    habilidad = models.CharField(max_length=100)  # normalizada
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    publicacion = models.ForeignKey(Publicacion, on_delete=models.CASCADE, related_name='indice_habilidades')
+
+    class Meta:
+        unique_together = ('habilidad', 'tipo', 'publicacion')
+
+    def __str__(self):
+        return f"{self.habilidad} ({self.tipo}) → {self.publicacion_id}"
+
 # ----------------------- CHAT ----------------
 
 class Chat(models.Model):
@@ -59,9 +100,19 @@ class ChatParticipante(models.Model):
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='participaciones')
     rol = models.CharField(max_length=20, choices=ROL_CHOICES, default='receptor')
     calificado = models.BooleanField(default=False)
+    # Contador de mensajes sin leer de este participante (counter cache)
+    no_leidos = models.PositiveIntegerField(default=0)
+    # Marca de lectura: id_mensaje más alto leído por este participante.
+    # Sin leer = mensajes de otros con id_mensaje > esta marca.
+    ultimo_mensaje_leido = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('chat', 'estudiante')
+        indexes = [
+            # Chats de un usuario (bandeja, suscripción del socket); el
+            # unique_together solo sirve a búsquedas que empiezan por chat
+            models.Index(fields=['estudiante', 'chat'], name='participante_estudiante_idx'),
+        ]
 
 
 class Mensaje(models.Model):
@@ -70,7 +121,19 @@ class Mensaje(models.Model):
     fecha = models.DateTimeField(auto_now_add=True)
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='mensajes')
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mensajes')
-    leido = models.BooleanField(default=False)
+    # Id generado por el cliente para reintentos idempotentes (WebSocket / offline)
+    client_id = models.CharField(max_length=64, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['estudiante', 'client_id'], name='mensaje_client_id_unico'),
+        ]
+        indexes = [
+            # Rangos "id_mensaje > marca" dentro de un chat (no leídos, historial)
+            models.Index(fields=['chat', 'id_mensaje'], name='mensaje_chat_id_idx'),
+            # Listado /mensajes/?chat=<id> ordenado por fecha
+            models.Index(fields=['chat', 'fecha'], name='mensaje_chat_fecha_idx'),
+        ]
 
 # ----------------------- CALIFICACION ----------------
 
@@ -78,12 +141,17 @@ class CalificacionChat(models.Model):
     id_calificacion = models.AutoField(primary_key=True)
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='calificaciones')
     evaluador = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='calificaciones_dadas')
+    # Participante calificado (el otro del chat); evita reconstruirlo por chat al listar
+    evaluado = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='calificaciones_recibidas')
     puntaje = models.IntegerField()
     comentario = models.TextField(blank=True, null=True)
     fecha = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('chat', 'evaluador')
+        indexes = [
+            models.Index(fields=['evaluado', '-fecha', '-id_calificacion'], name='calif_evaluado_idx'),
+        ]
 
 # ----------------------- NOTIFICACIONES -----------------
 
@@ -104,6 +172,51 @@ class Notificacion(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, null=True, blank=True, related_name='notificaciones')
     publicacion = models.ForeignKey('core.Publicacion', on_delete=models.CASCADE, null=True, blank=True, related_name='notificaciones')
     calificacion = models.ForeignKey('core.CalificacionChat', on_delete=models.CASCADE, null=True, blank=True, related_name='notificaciones')
+    # Las notificaciones 'nuevo_mensaje' no leídas se agrupan en una sola fila
+    # por (estudiante, chat): contador de mensajes y fecha de la última.
+    contador = models.PositiveIntegerField(default=1)
+    actualizada = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['estudiante', 'chat'],
+                condition=models.Q(tipo='nuevo_mensaje', leida=False),
+                name='notif_mensaje_no_leida_unica',
+            ),
+        ]
+        indexes = [
+            # Bandeja de notificaciones ordenada por última actividad
+            models.Index(fields=['estudiante', '-actualizada'], name='notif_estudiante_act_idx'),
+            # Pendientes de un usuario (marcar todas, recuento de respaldo)
+            models.Index(fields=['estudiante', '-fecha'], name='notif_no_leidas_idx', condition=models.Q(leida=False)),
+        ]
+
+
+class ContadorUsuario(models.Model):
+    """ Contadores precalculados para los badges de la app (ver /contadores/). """
+    estudiante = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='contador')
+    notificaciones_no_leidas = models.PositiveIntegerField(default=0)
+
+
+class Reputacion(models.Model):
+    """
+    Agregado de las calificaciones recibidas por un usuario. Se mantiene de
+    forma incremental (ver core/reputacion.py) para no agregar en cada
+    visita al perfil.
+    """
+    estudiante = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='reputacion')
+    total = models.PositiveIntegerField(default=0)
+    suma = models.PositiveIntegerField(default=0)
+    promedio = models.FloatField(default=0)
+    estrellas_1 = models.PositiveIntegerField(default=0)
+    estrellas_2 = models.PositiveIntegerField(default=0)
+    estrellas_3 = models.PositiveIntegerField(default=0)
+    estrellas_4 = models.PositiveIntegerField(default=0)
+    estrellas_5 = models.PositiveIntegerField(default=0)
+
+    def histograma(self):
+        return {str(i): getattr(self, f'estrellas_{i}') for i in range(1, 6)}
 
 
 # ----------------------- REPORTES -----------------
@@ -116,6 +229,12 @@ class Reporte(models.Model):
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reportes')
     publicacion = models.ForeignKey(Publicacion, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Cola de moderación: pendientes primero, más recientes arriba
+            models.Index(fields=['estado', '-fecha'], name='reporte_estado_fecha_idx'),
+        ]
+
 User = get_user_model()
 
 class Consentimiento(models.Model):
@@ -124,4 +243,66 @@ class Consentimiento(models.Model):
     fecha_aceptacion = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Consentimiento de {self.estudiante.email} - {'Aceptado' if self.aceptado else 'No aceptado'}"
\ No newline at end of file
+        return f"Consentimiento de {self.estudiante.email} - {'Aceptado' if self.aceptado else 'No aceptado'}"
+
+
+# ----------------------- SINCRONIZACIÓN (core/sincronizacion.py) -----------------
+
+class RegistroCambio(models.Model):
+    """
+    Último cambio de cada objeto sincronizable. El id es la secuencia que
+    usa /sync/?since=<token>: cada alta, edición o baja reemplaza la fila del
+    objeto por una nueva con un id mayor, así que hay una fila por objeto.
+    """
+    MODELO_CHOICES = (
+        ('publicacion', 'Publicación'),
+        ('chat', 'Chat'),
+        ('mensaje', 'Mensaje'),
+        ('notificacion', 'Notificación'),
+        ('calificacion', 'Calificación'),
+    )
+    modelo = models.CharField(max_length=20, choices=MODELO_CHOICES)
+    objeto_id = models.PositiveIntegerField()
+    # Lápida: el objeto se eliminó o dejó de ser visible (publicación con estado=False)
+    eliminado = models.BooleanField(default=False)
+    # Quién ve el cambio: los participantes del chat (chats, mensajes,
+    # calificaciones), un estudiante (notificaciones, bajas de chats) o
+    # todos si no hay ninguno (publicaciones). Sin FK para que las lápidas
+    # sobrevivan al objeto.
+    id_chat = models.PositiveIntegerField(null=True, blank=True)
+    id_estudiante = models.PositiveIntegerField(null=True, blank=True)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Reemplazo de la fila anterior del objeto
+            models.Index(fields=['modelo', 'objeto_id'], name='cambio_objeto_idx'),
+            # Cambios posteriores al token, por alcance
+            models.Index(fields=['modelo', 'id'], name='cambio_publico_idx'),
+            models.Index(fields=['id_chat', 'id'], name='cambio_chat_idx'),
+            models.Index(fields=['id_estudiante', 'id'], name='cambio_estudiante_idx'),
+        ]
+
+
+# ----------------------- CHANNEL LAYER (core/capa_canales.py) -----------------
+
+class CanalMensaje(models.Model):
+    """ Mensaje en cola para un canal de Channels, compartido entre procesos. """
+    canal = models.CharField(max_length=255)
+    contenido = models.TextField()
+    expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['canal', 'id'], name='canal_msg_cola_idx'),
+        ]
+
+
+class CanalGrupo(models.Model):
+    """ Pertenencia de un canal a un grupo, con expiración. """
+    grupo = models.CharField(max_length=255)
+    canal = models.CharField(max_length=255)
+    expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('grupo', 'canal')
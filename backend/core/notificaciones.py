@@ -0,0 +1,190 @@
+"""
+Despacho de notificaciones.
+
+Las vistas solo encolan lo que hay que notificar; la inserción ocurre
+después del commit (transaction.on_commit) con un único bulk_create para
+todos los destinatarios. Con NOTIFICACIONES_EN_SEGUNDO_PLANO (activo por
+defecto) el trabajo se entrega a un hilo local y la respuesta HTTP no espera
+por él.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from . import contadores, sincronizacion
+from .models import ChatParticipante, Notificacion, Perfil
+from .tiempo_real import enviar_a_usuario
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notificaciones")
+    return _executor
+
+
+def construir_mensaje(tipo, titulo_chat, alias_actor):
+    if tipo == "nuevo_mensaje":
+        return f"Nuevo mensaje en el chat '{titulo_chat}'"
+    if tipo == "intercambio_completado":
+        return f"El autor ha marcado el chat '{titulo_chat}' como completado"
+    if tipo == "calificacion_chat":
+        return f"{alias_actor} calificó el chat '{titulo_chat}'"
+    if tipo == "nuevo_chat":
+        return f"Se ha iniciado un nuevo chat: '{titulo_chat}'"
+    return f"{alias_actor} realizó una acción en el chat '{titulo_chat}'"
+
+
+def notificar(tipo, destinatarios=None, chat=None, excluir=None, actor=None,
+              publicacion=None, calificacion=None, mensaje=None, cantidad=1):
+    """
+    Encola una notificación de `tipo` para `destinatarios` (usuarios o ids).
+    Si se pasa `chat` sin destinatarios, se notifica a sus participantes
+    excepto `excluir`. `cantidad` es el número de mensajes que agrupa una
+    notificación 'nuevo_mensaje' (lotes). No ejecuta consultas en el camino
+    de la petición.
+    """
+    trabajo = {
+        "tipo": tipo,
+        "destinatarios": [getattr(u, "pk", u) for u in destinatarios] if destinatarios is not None else None,
+        "chat_id": chat.pk if chat else None,
+        "titulo_chat": (chat.titulo or f"chat {chat.pk}") if chat else "un chat",
+        "excluir_id": getattr(excluir, "pk", excluir),
+        "actor_id": getattr(actor, "pk", actor),
+        "publicacion_id": getattr(publicacion, "pk", publicacion),
+        "calificacion_id": getattr(calificacion, "pk", calificacion),
+        "mensaje": mensaje,
+        "cantidad": cantidad,
+    }
+    transaction.on_commit(lambda: _despachar(trabajo))
+
+
+def _despachar(trabajo):
+    if getattr(settings, "NOTIFICACIONES_EN_SEGUNDO_PLANO", True):
+        _get_executor().submit(_ejecutar_en_hilo, trabajo)
+    else:
+        procesar(trabajo)
+
+
+def _ejecutar_en_hilo(trabajo):
+    close_old_connections()
+    try:
+        procesar(trabajo)
+    except Exception:
+        logger.exception("Error despachando notificaciones %s", trabajo.get("tipo"))
+    finally:
+        close_old_connections()
+
+
+def _alias(usuario_id):
+    if not usuario_id:
+        return None
+    alias = Perfil.objects.filter(estudiante_id=usuario_id).values_list("alias", flat=True).first()
+    return alias or f"Usuario {usuario_id}"
+
+
+def procesar(trabajo):
+    destinatarios = trabajo["destinatarios"]
+    if destinatarios is None:
+        qs = ChatParticipante.objects.filter(chat_id=trabajo["chat_id"])
+        if trabajo["excluir_id"]:
+            qs = qs.exclude(estudiante_id=trabajo["excluir_id"])
+        destinatarios = list(qs.values_list("estudiante_id", flat=True))
+    if not destinatarios:
+        return []
+
+    texto = trabajo["mensaje"]
+    if texto is None:
+        alias = _alias(trabajo["actor_id"]) if trabajo["tipo"] not in ("nuevo_mensaje", "nuevo_chat") else None
+        texto = construir_mensaje(trabajo["tipo"], trabajo["titulo_chat"], alias)
+
+    if trabajo["tipo"] == "nuevo_mensaje" and trabajo["chat_id"]:
+        return _agrupar_mensajes(trabajo, destinatarios, texto)
+
+    with transaction.atomic():
+        creadas = Notificacion.objects.bulk_create([
+            Notificacion(
+                estudiante_id=estudiante_id,
+                tipo=trabajo["tipo"],
+                mensaje=texto,
+                chat_id=trabajo["chat_id"],
+                publicacion_id=trabajo["publicacion_id"],
+                calificacion_id=trabajo["calificacion_id"],
+            )
+            for estudiante_id in destinatarios
+        ])
+        contadores.sumar_notificaciones(destinatarios)
+        sincronizacion.registrar(creadas, nuevos=True)
+    _publicar(creadas)
+    return creadas
+
+
+def _agrupar_mensajes(trabajo, destinatarios, texto):
+    """
+    Upsert de 'nuevo_mensaje': si el destinatario ya tiene una notificación
+    no leída de este chat se incrementa su contador; si no, se crea una.
+    La restricción parcial notif_mensaje_no_leida_unica garantiza una sola
+    fila pendiente por (estudiante, chat).
+    """
+    chat_id = trabajo["chat_id"]
+    cantidad = trabajo.get("cantidad", 1)
+    if cantidad > 1:
+        texto = f"{cantidad} mensajes nuevos en el chat '{trabajo['titulo_chat']}'"
+    for intento in range(2):
+        try:
+            with transaction.atomic():
+                pendientes = Notificacion.objects.filter(
+                    tipo="nuevo_mensaje", leida=False, chat_id=chat_id, estudiante_id__in=destinatarios
+                )
+                existentes = set(pendientes.values_list("estudiante_id", flat=True))
+                if existentes:
+                    pendientes.update(
+                        contador=F("contador") + cantidad,
+                        actualizada=timezone.now(),
+                        mensaje=Concat(
+                            Cast(F("contador") + cantidad, output_field=CharField()),
+                            Value(f" mensajes nuevos en el chat '{trabajo['titulo_chat']}'"),
+                        ),
+                    )
+                nuevos = [i for i in destinatarios if i not in existentes]
+                Notificacion.objects.bulk_create([
+                    Notificacion(
+                        estudiante_id=estudiante_id, tipo="nuevo_mensaje", mensaje=texto,
+                        chat_id=chat_id, contador=cantidad,
+                    )
+                    for estudiante_id in nuevos
+                ])
+                # Solo las filas nuevas suman al badge; las agrupadas ya contaban.
+                contadores.sumar_notificaciones(nuevos)
+            break
+        except IntegrityError:
+            # Otro proceso creó la fila pendiente entre la lectura y el insert
+            if intento:
+                raise
+
+    afectadas = list(
+        Notificacion.objects.filter(
+            tipo="nuevo_mensaje", leida=False, chat_id=chat_id, estudiante_id__in=destinatarios
+        )
+    )
+    sincronizacion.registrar(afectadas)
+    _publicar(afectadas)
+    return afectadas
+
+
+def _publicar(notificaciones):
+    from .serializers import NotificacionSerializer
+    for notificacion in notificaciones:
+        enviar_a_usuario(
+            notificacion.estudiante_id,
+            {"type": "notificacion_nueva", "notificacion": NotificacionSerializer(notificacion).data},
+        )
@@ -0,0 +1,278 @@
+import base64
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre una tupla de columnas ordenadas.
+
+    A diferencia de OFFSET, cada página se obtiene con un filtro
+    "(a, b) < (cursor_a, cursor_b)" sobre un índice, por lo que el costo
+    no depende de cuántas filas hay antes de la página pedida.
+    Todas las columnas de `ordering` deben ir en la misma dirección.
+    """
+    ordering = ('-id',)
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    # ----------------------- cursor -----------------------
+    def encode_cursor(self, valores, reverse=False):
+        data = {'v': [self._serializar(v) for v in valores]}
+        if reverse:
+            data['r'] = 1
+        raw = json.dumps(data, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, modelo):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(data, dict) or not isinstance(data.get('v'), list):
+                raise ValueError
+            if len(data['v']) != len(self.ordering):
+                raise ValueError
+            valores = [self._deserializar(modelo, campo, v) for campo, v in zip(self._campos(), data['v'])]
+            return valores, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _serializar(self, valor):
+        return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+    def _deserializar(self, modelo, campo, valor):
+        # Cada valor debe tener el tipo de su columna: fecha ISO 8601 o entero
+        if isinstance(modelo._meta.get_field(campo), models.DateTimeField):
+            fecha = parse_datetime(valor) if isinstance(valor, str) else None
+            if fecha is None:
+                raise ValueError
+            return fecha
+        if not isinstance(valor, int) or isinstance(valor, bool) or not -2**63 <= valor < 2**63:
+            raise ValueError
+        return valor
+
+    def _campos(self):
+        return [campo.lstrip('-') for campo in self.ordering]
+
+    def campos_cursor(self):
+        """ Columnas que el cursor lee de cada fila (core/proyecciones.py las agrega a .values()). """
+        return self._campos()
+
+    def _descendente(self):
+        return self.ordering[0].startswith('-')
+
+    # ----------------------- filtros -----------------------
+    def _filtro_despues(self, valores, hacia_adelante):
+        """
+        Construye la condición de tupla "(c1, c2, ...) > / < (v1, v2, ...)"
+        expandida en OR de prefijos iguales, que el planificador resuelve
+        con un rango sobre el índice compuesto.
+        """
+        descendente = self._descendente()
+        menor = descendente == hacia_adelante
+        lookup = 'lt' if menor else 'gt'
+        campos = self._campos()
+        condicion = Q()
+        for i, campo in enumerate(campos):
+            parcial = Q(**{f'{campo}__{lookup}': valores[i]})
+            for previo, valor in zip(campos[:i], valores[:i]):
+                parcial &= Q(**{previo: valor})
+            condicion |= parcial
+        return condicion
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                valor = int(request.query_params[self.page_size_query_param])
+                if valor > 0:
+                    return min(valor, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def _consulta(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self._cursor = request.query_params.get(self.cursor_query_param)
+
+        self._invertido = False
+        if self._cursor:
+            valores, self._invertido = self.decode_cursor(self._cursor, queryset.model)
+            queryset = queryset.filter(self._filtro_despues(valores, hacia_adelante=not self._invertido))
+
+        orden = list(self.ordering)
+        if self._invertido:
+            orden = [c[1:] if c.startswith('-') else f'-{c}' for c in orden]
+
+        # Pedimos una fila extra para saber si existe otra página sin un COUNT.
+        return queryset.order_by(*orden)[:self.page_size + 1]
+
+    def _pagina(self, filas):
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if self._invertido:
+            filas.reverse()
+
+        self.page = filas
+        self.has_next = hay_mas if not self._invertido else bool(self._cursor)
+        self.has_previous = bool(self._cursor) if not self._invertido else hay_mas
+        return filas
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._pagina(list(self._consulta(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """ Igual que paginate_queryset, con el ORM async (core/views_async.py). """
+        return self._pagina([fila async for fila in self._consulta(queryset, request)])
+
+    # ----------------------- links -----------------------
+    def _valores(self, obj):
+        # Instancias del modelo o filas de .values()
+        if isinstance(obj, dict):
+            return [obj[campo] for campo in self._campos()]
+        return [getattr(obj, campo) for campo in self._campos()]
+
+    def _url(self, cursor):
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = cursor
+        base = self.request.build_absolute_uri(self.request.path)
+        return f'{base}?{urlencode(params, doseq=True)}'
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._url(self.encode_cursor(self._valores(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._url(self.encode_cursor(self._valores(self.page[0]), reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PublicacionCursorPagination(KeysetCursorPagination):
+    ordering = ('-fecha_creacion', '-id_publicacion')
+    page_size = getattr(settings, 'PUBLICACIONES_PAGE_SIZE', 20)
+    max_page_size = getattr(settings, 'PUBLICACIONES_MAX_PAGE_SIZE', 100)
+
+
+class CalificacionCursorPagination(KeysetCursorPagination):
+    ordering = ('-fecha', '-id_calificacion')
+
+
+class MensajeKeysetPagination(BasePagination):
+    """
+    Historial de mensajes por id_mensaje.
+    - sin parámetros: los últimos `page_size` mensajes
+    - ?before=<id>: los `page_size` anteriores a ese id
+    - ?after=<id>: los `page_size` posteriores a ese id
+    Los resultados siempre van en orden cronológico.
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+
+    def _entero(self, request, nombre):
+        valor = request.query_params.get(nombre)
+        if valor in (None, ''):
+            return None
+        try:
+            return int(valor)
+        except ValueError:
+            raise NotFound(f'Parámetro {nombre} inválido.')
+
+    def campos_cursor(self):
+        return ['id_mensaje']
+
+    def _id(self, obj):
+        return obj['id_mensaje'] if isinstance(obj, dict) else obj.id_mensaje
+
+    def get_page_size(self, request):
+        try:
+            valor = int(request.query_params[self.page_size_query_param])
+            if valor > 0:
+                return min(valor, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def _consulta(self, queryset, request):
+        self.request = request
+        self._tamano = self.get_page_size(request)
+        self._antes = self._entero(request, 'before')
+        self._despues = self._entero(request, 'after')
+
+        if self._despues is not None:
+            return queryset.filter(id_mensaje__gt=self._despues).order_by('id_mensaje')[:self._tamano + 1]
+        if self._antes is not None:
+            queryset = queryset.filter(id_mensaje__lt=self._antes)
+        return queryset.order_by('-id_mensaje')[:self._tamano + 1]
+
+    def _pagina(self, filas):
+        tamano = self._tamano
+        if self._despues is not None:
+            self.hay_siguientes = len(filas) > tamano
+            self.hay_anteriores = True
+            filas = filas[:tamano]
+        else:
+            self.hay_anteriores = len(filas) > tamano
+            self.hay_siguientes = self._antes is not None
+            filas = filas[:tamano]
+            filas.reverse()
+
+        self.page = filas
+        return filas
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._pagina(list(self._consulta(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self._pagina([fila async for fila in self._consulta(queryset, request)])
+
+    def _url(self, **cursor):
+        params = self.request.query_params.copy()
+        params.pop('before', None)
+        params.pop('after', None)
+        params.update(cursor)
+        base = self.request.build_absolute_uri(self.request.path)
+        return f'{base}?{params.urlencode()}'
+
+    def get_paginated_response(self, data):
+        anterior = siguiente = None
+        if self.page and self.hay_anteriores:
+            anterior = self._url(before=self._id(self.page[0]))
+        if self.page and self.hay_siguientes:
+            siguiente = self._url(after=self._id(self.page[-1]))
+        return Response({
+            'next': siguiente,
+            'previous': anterior,
+            'results': data,
+        })
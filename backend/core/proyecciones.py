@@ -0,0 +1,116 @@
+"""
+Listados rápidos: filas armadas con .values() en vez de instancias de modelo
+pasadas por un ModelSerializer.
+
+Cada Proyeccion reproduce la salida de su serializer (mismos campos, mismo
+orden, mismos valores); los campos calculados, como `autor_alias`, salen
+de la misma consulta con un JOIN en vez de leerse fila por fila. Las fechas
+quedan como datetime y las codifica el renderer (core/renderers.py).
+
+?fields=id_publicacion,titulo,autor_alias pide solo esos campos (la
+consulta trae solo esas columnas, más las del cursor de paginación).
+"""
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Cast, Concat, NullIf
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .serializers import MensajeSerializer, NotificacionSerializer, PublicacionSerializer
+
+
+class Proyeccion:
+    serializer_class = None
+    # nombre -> expresión para los campos que no son columnas del modelo
+    calculados = {}
+    fechas = ()
+    parametro = "fields"
+
+    _campos = None
+
+    @classmethod
+    def campos(cls):
+        # El orden de la respuesta es el del serializer
+        if cls._campos is None:
+            cls._campos = tuple(cls.serializer_class().fields)
+        return cls._campos
+
+    @classmethod
+    def campos_pedidos(cls, request):
+        """ Campos de ?fields= (todos si no viene), en el orden del serializer. """
+        valor = request.query_params.get(cls.parametro)
+        if not valor:
+            return cls.campos()
+        pedidos = {c.strip() for c in valor.split(",") if c.strip()}
+        invalidos = pedidos - set(cls.campos())
+        if invalidos:
+            raise ValidationError({cls.parametro: [f"Campos no válidos: {', '.join(sorted(invalidos))}."]})
+        return tuple(c for c in cls.campos() if c in pedidos)
+
+    @classmethod
+    def consulta(cls, queryset, campos, extras=()):
+        """ queryset.values() con `campos` y las columnas `extras` (p. ej. del cursor). """
+        columnas = [c for c in campos if c not in cls.calculados]
+        columnas += [c for c in extras if c not in campos]
+        return queryset.values(*columnas, **{c: cls.calculados[c] for c in campos if c in cls.calculados})
+
+    @classmethod
+    def filas(cls, valores, campos):
+        fechas = [c for c in cls.fechas if c in campos]
+        filas = [{c: fila[c] for c in campos} for fila in valores]
+        if fechas and timezone.get_current_timezone_name() != "UTC":
+            # Como DateTimeField del serializer: en la zona horaria activa
+            for fila in filas:
+                for campo in fechas:
+                    if fila[campo] is not None:
+                        fila[campo] = timezone.localtime(fila[campo])
+        return filas
+
+
+class ProyeccionPublicacion(Proyeccion):
+    serializer_class = PublicacionSerializer
+    calculados = {
+        # PublicacionSerializer.get_autor_alias: alias del perfil o "Usuario <id>" si no tiene perfil
+        "autor_alias": Case(
+            When(
+                estudiante__perfil__isnull=True,
+                then=Concat(Value("Usuario "), Cast("estudiante_id", CharField()), output_field=CharField()),
+            ),
+            default=F("estudiante__perfil__alias"),
+            output_field=CharField(),
+        ),
+    }
+    fechas = ("fecha_creacion", "fecha_actualizacion")
+
+
+class ProyeccionMensaje(Proyeccion):
+    serializer_class = MensajeSerializer
+    calculados = {
+        # MensajeSerializer.get_autor_alias: alias del perfil o username (None en este modelo de usuario)
+        "autor_alias": NullIf("estudiante__perfil__alias", Value("")),
+    }
+    fechas = ("fecha",)
+
+
+class ProyeccionNotificacion(Proyeccion):
+    serializer_class = NotificacionSerializer
+    fechas = ("fecha", "actualizada")
+
+
+class ListaProyectadaMixin:
+    """
+    list() de las vistas genéricas con filas de `proyeccion` en vez del
+    serializer. El resto de la vista (get_queryset, paginación, cache,
+    ETag) no cambia.
+    """
+    proyeccion = None
+
+    def list(self, request, *args, **kwargs):
+        campos = self.proyeccion.campos_pedidos(request)
+        extras = self.paginator.campos_cursor() if self.paginator is not None else ()
+        valores = self.proyeccion.consulta(self.filter_queryset(self.get_queryset()), campos, extras)
+
+        pagina = self.paginate_queryset(valores)
+        if pagina is not None:
+            return self.get_paginated_response(self.proyeccion.filas(pagina, campos))
+        return Response(self.proyeccion.filas(valores, campos))
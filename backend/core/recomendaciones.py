@@ -0,0 +1,109 @@
+"""
+Motor de recomendaciones por habilidades complementarias.
+
+El puntaje de una publicación p para un usuario u es:
+
+    |ofrecidas(u) ∩ buscadas(p)| + |buscadas(u) ∩ ofrecidas(p)|
+
+donde ofrecidas(u) son las habilidades del perfil y buscadas(u) las que el
+usuario pide en sus publicaciones activas. Equivale al producto de la matriz
+dispersa publicación×habilidad (HabilidadPublicacion) por el vector del
+usuario, y se resuelve con un único GROUP BY que solo recorre las filas del
+índice de las habilidades del usuario.
+
+Cada lista se cachea por usuario con una clave que incluye sus habilidades
+y la versión de cada par (tipo, habilidad) del que depende: ("buscada", h)
+para cada h que ofrece y ("ofrecida", h) para cada h que busca.
+  - Los cambios del propio usuario cambian sus habilidades y con ellas la clave.
+  - Al crear, editar, desactivar o eliminar una publicación se incrementan,
+    después del commit, solo las versiones de los pares de su índice
+    (core/signals.py): se recalculan las listas de los usuarios con alguna
+    habilidad en común con ella, no las de todos.
+Las versiones viven en el cache por defecto: con varios workers debe ser
+compartido (DJANGO_CACHE=redis o archivo), o en los demás procesos el cambio
+aparece al vencer RECOMENDACIONES_CACHE_TIMEOUT.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .habilidades import normalizar_lista
+from .models import HabilidadPublicacion, Perfil, Publicacion
+
+LIMITE_MAXIMO = 100
+
+
+def _timeout():
+    return getattr(settings, "RECOMENDACIONES_CACHE_TIMEOUT", 300)
+
+
+def _hash(texto):
+    return hashlib.md5(texto.encode(), usedforsecurity=False).hexdigest()
+
+
+def _clave_habilidad(tipo, habilidad):
+    # Las habilidades pueden tener espacios, que no son válidos en una clave
+    return f"recomendaciones:version:{tipo}:{_hash(habilidad)}"
+
+
+def _versiones(claves):
+    versiones = cache.get_many(claves)
+    for clave in set(claves) - set(versiones):
+        # Una versión nueva también si la anterior se descartó del cache
+        cache.add(clave, uuid.uuid4().hex, None)
+        versiones[clave] = cache.get(clave)
+    return [versiones[clave] for clave in claves]
+
+
+def invalidar_habilidades(pares):
+    """ Tras el commit, nueva versión para cada par (habilidad, tipo) del índice. """
+    claves = [_clave_habilidad(tipo, habilidad) for habilidad, tipo in pares]
+    if claves:
+        transaction.on_commit(lambda: cache.set_many({clave: uuid.uuid4().hex for clave in claves}, None))
+
+
+def habilidades_usuario(usuario):
+    perfil = Perfil.objects.filter(estudiante=usuario).values_list("habilidades_ofrecidas", flat=True).first()
+    ofrecidas = normalizar_lista(perfil or [])
+    buscadas = set()
+    for lista in Publicacion.objects.filter(estudiante=usuario, estado=True).values_list(
+        "habilidades_buscadas", flat=True
+    ):
+        buscadas |= normalizar_lista(lista)
+    return ofrecidas, buscadas
+
+
+def puntuar(usuario, limite=LIMITE_MAXIMO, habilidades=None):
+    """ Devuelve [(id_publicacion, puntaje), ...] ordenado por puntaje. """
+    ofrecidas, buscadas = habilidades or habilidades_usuario(usuario)
+    if not ofrecidas and not buscadas:
+        return []
+
+    filas = (
+        HabilidadPublicacion.objects.filter(
+            Q(tipo="buscada", habilidad__in=ofrecidas) | Q(tipo="ofrecida", habilidad__in=buscadas),
+            publicacion__estado=True,
+        )
+        .exclude(publicacion__estudiante=usuario)
+        .values("publicacion_id")
+        .annotate(puntaje=Count("id"))
+        .order_by("-puntaje", "-publicacion_id")[:limite]
+    )
+    return [(f["publicacion_id"], f["puntaje"]) for f in filas]
+
+
+def recomendaciones(usuario, limite=20):
+    """ Igual que puntuar(), pero cacheado por usuario, habilidades y versiones. """
+    ofrecidas, buscadas = habilidades_usuario(usuario)
+    pares = sorted([("buscada", h) for h in ofrecidas] + [("ofrecida", h) for h in buscadas])
+    versiones = _versiones([_clave_habilidad(tipo, h) for tipo, h in pares])
+    clave = "recomendaciones:{}:{}".format(usuario.pk, _hash(repr((pares, versiones))))
+    ranking = cache.get(clave)
+    if ranking is None:
+        ranking = puntuar(usuario, habilidades=(ofrecidas, buscadas))
+        cache.set(clave, ranking, _timeout())
+    return ranking[:limite]
@@ -0,0 +1,38 @@
+"""
+JSONRenderer con orjson: mismos bytes que el JSONRenderer de DRF (compacto,
+UTF-8, fechas ISO 8601 con "Z") pero codificado en C, sin pasar cada valor
+por json.JSONEncoder.default.
+
+Si orjson no está instalado, o el cliente pide JSON indentado, se usa el
+JSONRenderer de DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_OPCIONES = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+_encoder = JSONEncoder()
+
+
+def _default(valor):
+    # Lo que orjson no conoce (Decimal, UUID con formato de DRF, textos lazy, ...)
+    return _encoder.default(valor)
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=_OPCIONES)
+        # Como JSONRenderer: U+2028 y U+2029 escapados para poder incrustar el JSON en <script>
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,32 @@
+"""
+Vistas de solo lectura servidas desde la réplica (ver interu_backend/routers.py).
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+from interu_backend.routers import activar_replica, desactivar_replica, en_ventana_primaria, replica_configurada
+
+
+class LecturaReplicaMixin:
+    """
+    Las peticiones GET/HEAD de la vista leen de la réplica, salvo que el
+    usuario haya escrito hace poco. La decisión se toma después de autenticar
+    (la autenticación lee el usuario en la primaria) y se revierte al
+    terminar la respuesta.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and replica_configurada()
+            and not en_ventana_primaria(getattr(request.user, "pk", None))
+        ):
+            self._token_replica = activar_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        token = getattr(self, "_token_replica", None)
+        if token is not None:
+            desactivar_replica(token)
+            self._token_replica = None
+        return response
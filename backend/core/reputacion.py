@@ -0,0 +1,38 @@
+"""
+Reputación por usuario: total, suma, promedio e histograma 1-5 de las
+calificaciones recibidas, actualizados con un UPDATE incremental dentro de la
+misma transacción que crea (o borra) la calificación.
+"""
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+from .models import Reputacion
+
+
+def _aplicar(estudiante_id, puntaje, signo):
+    total = F("total") + signo
+    suma = F("suma") + signo * puntaje
+    Reputacion.objects.filter(estudiante_id=estudiante_id).update(
+        total=total,
+        suma=suma,
+        # El lado derecho usa los valores previos a este UPDATE
+        promedio=Case(
+            When(Q(total__gt=-signo), then=Cast(suma, FloatField()) / Cast(total, FloatField())),
+            default=Value(0.0),
+        ),
+        **{f"estrellas_{puntaje}": F(f"estrellas_{puntaje}") + signo},
+    )
+
+
+def registrar_calificacion(calificacion):
+    """ Suma la calificación a la reputación de su evaluado. """
+    if not calificacion.evaluado_id:
+        return
+    Reputacion.objects.get_or_create(estudiante_id=calificacion.evaluado_id)
+    _aplicar(calificacion.evaluado_id, calificacion.puntaje, 1)
+
+
+def descontar_calificacion(calificacion):
+    if calificacion.evaluado_id:
+        _aplicar(calificacion.evaluado_id, calificacion.puntaje, -1)
+
@@ -1,40 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import (
     CalificacionChat, Publicacion, Chat, ChatParticipante,
-    Mensaje, Reporte, Perfil, Notificacion
+    Mensaje, Reporte, Perfil, Notificacion, Reputacion
 )
 
 
-def crear_notificacion(usuario, tipo="info", mensaje=None, chat=None, publicacion=None, calificacion=None):
-    alias = getattr(usuario.perfil, "alias", None) or usuario.email
-    titulo_chat = chat.titulo if chat and hasattr(chat, "titulo") else f"chat {chat.id_chat}" if chat else "un chat"
-
-    # Si no se pasa mensaje, construirlo según el tipo
-    if mensaje is None:
-        if tipo == "nuevo_mensaje":
-            mensaje = f"Nuevo mensaje en el chat '{titulo_chat}'"
-        elif tipo == "intercambio_completado":
-            mensaje = f"El autor ha marcado el chat '{titulo_chat}' como completado"
-        elif tipo == "calificacion_chat":
-            mensaje = f"{alias} calificó el chat '{titulo_chat}'"
-        elif tipo == "nuevo_chat":
-            mensaje = f"Se ha iniciado un nuevo chat: '{titulo_chat}'"
-        else:
-            mensaje = f"{alias} realizó una acción en el chat '{titulo_chat}'"
-
-    return Notificacion.objects.create(
-        estudiante=usuario,
-        tipo=tipo,
-        mensaje=mensaje,
-        chat=chat,
-        publicacion=publicacion,
-        calificacion=calificacion
-    )
-
-
-
-
-
 # ----------------------- PERFIL SERIALIZERS
 class PerfilCompletoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -54,6 +25,29 @@ class PerfilCompletoSerializer(serializers.ModelSerializer):
         read_only_fields = ['id_perfil', 'estudiante'] 
 
 
+class ReputacionSerializer(serializers.ModelSerializer):
+    histograma = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Reputacion
+        fields = ['total', 'promedio', 'histograma']
+
+    def get_histograma(self, obj):
+        return obj.histograma()
+
+
+class PerfilPublicoSerializer(PerfilCompletoSerializer):
+    """ Perfil visible para otros usuarios, con su reputación precalculada. """
+    reputacion = serializers.SerializerMethodField()
+
+    class Meta(PerfilCompletoSerializer.Meta):
+        fields = PerfilCompletoSerializer.Meta.fields + ['reputacion']
+
+    def get_reputacion(self, obj):
+        reputacion = getattr(obj.estudiante, 'reputacion', None) or Reputacion(estudiante=obj.estudiante)
+        return ReputacionSerializer(reputacion).data
+
+
 class ConfirmarEliminarCuentaSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
@@ -111,21 +105,32 @@ class MensajeSerializer(serializers.ModelSerializer):
             "estudiante",
             "texto",
             "fecha",
-            "leido",
             "autor_alias",
         ]
-        read_only_fields = ["id_mensaje", "fecha", "leido", "autor_alias"]
+        read_only_fields = ["id_mensaje", "fecha", "autor_alias"]
 
     def get_autor_alias(self, obj):
         perfil = getattr(obj.estudiante, "perfil", None)
         return perfil.alias if perfil and perfil.alias else obj.estudiante.username
 
 
+class MensajeLoteItemSerializer(serializers.Serializer):
+    chat = serializers.IntegerField(min_value=1)
+    texto = serializers.CharField()
+    client_id = serializers.CharField(max_length=64)
+
+
+class MensajeLoteSerializer(serializers.Serializer):
+    mensajes = MensajeLoteItemSerializer(
+        many=True, allow_empty=False, max_length=getattr(settings, 'MENSAJES_LOTE_MAX', 100)
+    )
+
+
 class CalificacionChatSerializer(serializers.ModelSerializer):
     class Meta:
         model = CalificacionChat
         fields = '__all__'
-        read_only_fields = ['id_calificacion', 'fecha', 'evaluador']  # evaluador se setea en backend
+        read_only_fields = ['id_calificacion', 'fecha', 'evaluador', 'evaluado']  # se setean en backend
 
     def validate_puntaje(self, value):
         # Asegurar que value sea int (por si llega como string)
@@ -147,14 +152,43 @@ class CalificacionChatSerializer(serializers.ModelSerializer):
 
 
 class ChatSerializer(serializers.ModelSerializer):
+    """
+    Resumen del chat, sin mensajes. El historial se pide paginado en
+    /chats/<pk>/mensajes/.
+    """
     participantes = ChatParticipanteSerializer(many=True, read_only=True)
-    mensajes = MensajeSerializer(many=True, read_only=True)
 
     class Meta:
         model = Chat
         fields = '__all__'
 
 
+class BandejaChatSerializer(serializers.ModelSerializer):
+    """
+    Fila de la bandeja de chats. Todos los campos extra vienen anotados
+    en el queryset de BandejaChatsView, sin consultas por fila.
+    """
+    autor_alias = serializers.CharField(source='otro_alias', read_only=True, allow_null=True)
+    otro_estudiante = serializers.IntegerField(read_only=True, allow_null=True)
+    ultimo_mensaje = serializers.CharField(read_only=True, allow_null=True)
+    actualizado_en = serializers.DateTimeField(read_only=True)
+    no_leidos = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Chat
+        fields = [
+            'id_chat',
+            'titulo',
+            'estado_intercambio',
+            'publicacion',
+            'autor_alias',
+            'otro_estudiante',
+            'ultimo_mensaje',
+            'actualizado_en',
+            'no_leidos',
+        ]
+
+
 class NotificacionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notificacion
@@ -0,0 +1,84 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import recomendaciones, sincronizacion
+from .busqueda import desindexar_texto, indexar_texto
+from .habilidades import indexar_publicacion, pares_publicacion
+from .models import CalificacionChat, Chat, ChatParticipante, Mensaje, Notificacion, Publicacion
+from .reputacion import descontar_calificacion
+from .tiempo_real import enviar_a_usuario
+
+CAMPOS_HABILIDADES = {"habilidades_ofrecidas", "habilidades_buscadas"}
+CAMPOS_TEXTO = {"titulo", "descripcion"}
+
+
+@receiver(post_save, sender=Publicacion)
+def sincronizar_indice_habilidades(sender, instance, created, update_fields=None, **kwargs):
+    # Las filas del índice se borran en cascada al eliminar la publicación.
+    if update_fields is not None and not (CAMPOS_HABILIDADES | {"estado"}) & set(update_fields):
+        return
+    # Cambia el ranking de quienes tienen alguna habilidad en común, también
+    # si solo cambió el estado (ver core/recomendaciones.py)
+    recomendaciones.invalidar_habilidades(indexar_publicacion(instance))
+
+
+@receiver(post_save, sender=Publicacion)
+def sincronizar_indice_texto(sender, instance, created, using, update_fields=None, **kwargs):
+    if update_fields is not None and not CAMPOS_TEXTO & set(update_fields):
+        return
+    indexar_texto(instance, using)
+
+
+@receiver(post_delete, sender=Publicacion)
+def eliminar_indice_texto(sender, instance, using, **kwargs):
+    desindexar_texto(instance.pk, using)
+
+
+@receiver(post_delete, sender=Publicacion)
+def invalidar_recomendaciones_publicacion(sender, instance, **kwargs):
+    recomendaciones.invalidar_habilidades(pares_publicacion(instance))
+
+
+@receiver(post_save, sender=ChatParticipante)
+def suscribir_chat_nuevo(sender, instance, created, **kwargs):
+    if created:
+        enviar_a_usuario(instance.estudiante_id, {"type": "chat_unirse", "chat": instance.chat_id})
+
+
+@receiver(post_delete, sender=CalificacionChat)
+def descontar_reputacion(sender, instance, **kwargs):
+    # Altas: CalificacionChatCreateView suma en su propia transacción.
+    descontar_calificacion(instance)
+
+
+# ----------------------- registro de cambios (/sync/) -----------------------
+@receiver(post_save, sender=Publicacion)
+@receiver(post_save, sender=Chat)
+@receiver(post_save, sender=Mensaje)
+@receiver(post_save, sender=Notificacion)
+@receiver(post_save, sender=CalificacionChat)
+def registrar_cambio(sender, instance, created, **kwargs):
+    # Una publicación desactivada se sincroniza como lápida
+    eliminado = sender is Publicacion and not instance.estado
+    sincronizacion.registrar([instance], eliminado=eliminado, nuevos=created)
+
+
+@receiver(post_save, sender=ChatParticipante)
+def registrar_cambio_participantes(sender, instance, created, **kwargs):
+    # Los participantes van dentro del chat serializado
+    if created:
+        sincronizacion.registrar([instance.chat])
+
+
+@receiver(post_delete, sender=Publicacion)
+@receiver(post_delete, sender=Notificacion)
+@receiver(post_delete, sender=CalificacionChat)
+def registrar_baja(sender, instance, **kwargs):
+    sincronizacion.registrar([instance], eliminado=True)
+
+
+@receiver(pre_delete, sender=Chat)
+def registrar_baja_chat(sender, instance, **kwargs):
+    # Antes de que la cascada borre a los participantes
+    participantes = ChatParticipante.objects.filter(chat=instance).values_list("estudiante_id", flat=True)
+    sincronizacion.registrar_baja_chat(instance.pk, list(participantes))
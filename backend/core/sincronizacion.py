@@ -0,0 +1,159 @@
+"""
+Sincronización incremental para la app móvil: /sync/?since=<token>.
+
+Cada alta, edición o baja de publicaciones, chats, mensajes, notificaciones
+y calificaciones deja en RegistroCambio una fila con id creciente (la fila
+anterior del mismo objeto se borra). El token es ese id: el cliente pide
+los cambios posteriores y recibe los objetos vigentes más las lápidas
+(bajas y publicaciones con estado=False).
+
+Las altas y ediciones individuales se registran desde core/signals.py; los
+caminos con bulk_create / update() (lotes de mensajes, notificaciones)
+llaman a `registrar` directamente.
+
+Una lápida de chat implica sus mensajes y calificaciones: no se registran
+lápidas por cada uno.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CalificacionChat, Chat, ChatParticipante, Mensaje, Notificacion, Publicacion, RegistroCambio
+
+# modelo -> (nombre en RegistroCambio y en la respuesta, alcance de la fila)
+MODELOS = {
+    Publicacion: ("publicacion", lambda o: {}),
+    Chat: ("chat", lambda o: {"id_chat": o.pk}),
+    Mensaje: ("mensaje", lambda o: {"id_chat": o.chat_id}),
+    CalificacionChat: ("calificacion", lambda o: {"id_chat": o.chat_id}),
+    Notificacion: ("notificacion", lambda o: {"id_estudiante": o.estudiante_id}),
+}
+CLAVES = {
+    "publicacion": "publicaciones",
+    "chat": "chats",
+    "mensaje": "mensajes",
+    "notificacion": "notificaciones",
+    "calificacion": "calificaciones",
+}
+
+
+def _guardar(filas, nuevos):
+    with transaction.atomic():
+        if not nuevos:
+            por_modelo = defaultdict(set)
+            for fila in filas:
+                por_modelo[fila.modelo].add(fila.objeto_id)
+            for modelo, ids in por_modelo.items():
+                RegistroCambio.objects.filter(modelo=modelo, objeto_id__in=ids).delete()
+        RegistroCambio.objects.bulk_create(filas)
+
+
+def registrar(instancias, eliminado=False, nuevos=False):
+    """
+    Registra el cambio de `instancias` (de un mismo modelo o no). Con
+    `nuevos=True` (objetos recién creados) no se busca una fila anterior.
+    """
+    filas = []
+    for instancia in instancias:
+        modelo, alcance = MODELOS[type(instancia)]
+        filas.append(RegistroCambio(modelo=modelo, objeto_id=instancia.pk, eliminado=eliminado, **alcance(instancia)))
+    if filas:
+        _guardar(filas, nuevos)
+
+
+def registrar_baja_chat(chat_id, participantes):
+    """
+    Lápida de un chat eliminado, una por participante: tras la baja ya no
+    hay ChatParticipante que asocie el chat a cada usuario.
+    """
+    with transaction.atomic():
+        # Las filas del chat y de sus mensajes ya no las ve nadie
+        RegistroCambio.objects.filter(id_chat=chat_id).delete()
+        _guardar([
+            RegistroCambio(modelo="chat", objeto_id=chat_id, eliminado=True, id_estudiante=estudiante_id)
+            for estudiante_id in participantes
+        ], nuevos=False)
+
+
+# ----------------------- lectura -----------------------
+def consultas_desde(usuario, since):
+    """ Cambios visibles para `usuario` posteriores a `since`, uno por alcance. """
+    mis_chats = ChatParticipante.objects.filter(estudiante=usuario).values("chat_id")
+    return [
+        RegistroCambio.objects.filter(modelo="publicacion", id__gt=since),
+        RegistroCambio.objects.filter(id_chat__in=mis_chats, id__gt=since),
+        RegistroCambio.objects.filter(id_estudiante=usuario.pk, id__gt=since),
+    ]
+
+
+def _siguiente_token(filas, since, hay_mas):
+    """
+    El token avanza hasta la última fila anterior al margen: una transacción
+    que tomó un id menor pero confirmó después sigue quedando por encima del
+    token. Las filas más recientes se vuelven a enviar en la próxima llamada
+    (el cliente aplica los cambios como upsert).
+    """
+    corte = timezone.now() - timedelta(seconds=getattr(settings, "SYNC_MARGEN_SEGUNDOS", 5))
+    token = since
+    for fila in filas:
+        if fila.fecha > corte:
+            break
+        token = fila.id
+    if hay_mas and token == since:
+        # Página completa dentro del margen: avanzar igual para no repetirla
+        token = filas[-1].id
+    return token
+
+
+def _vigentes(usuario, modelo, ids):
+    from .serializers import (
+        CalificacionChatSerializer, ChatSerializer, MensajeSerializer, NotificacionSerializer, PublicacionSerializer,
+    )
+    if modelo == "publicacion":
+        qs = Publicacion.objects.filter(pk__in=ids, estado=True).select_related("estudiante__perfil")
+        return qs, PublicacionSerializer
+    if modelo == "chat":
+        qs = Chat.objects.filter(pk__in=ids, participantes__estudiante=usuario).prefetch_related("participantes")
+        return qs, ChatSerializer
+    if modelo == "mensaje":
+        return Mensaje.objects.filter(pk__in=ids).select_related("estudiante__perfil").order_by("id_mensaje"), MensajeSerializer
+    if modelo == "notificacion":
+        return Notificacion.objects.filter(pk__in=ids, estudiante=usuario), NotificacionSerializer
+    return CalificacionChat.objects.filter(pk__in=ids), CalificacionChatSerializer
+
+
+def cambios_desde(usuario, since, limite):
+    """
+    {"token", "hay_mas", "<modelo>": [objetos], "eliminados": {"<modelo>": [ids]}}
+    con a lo más `limite` cambios; si hay_mas, el cliente vuelve a pedir con
+    el token recibido.
+    """
+    filas = sorted(
+        (fila for qs in consultas_desde(usuario, since) for fila in qs.order_by("id")[:limite + 1]),
+        key=lambda fila: fila.id,
+    )
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    vivos, eliminados = defaultdict(set), defaultdict(set)
+    for fila in filas:
+        (eliminados if fila.eliminado else vivos)[fila.modelo].add(fila.objeto_id)
+
+    respuesta = {
+        "token": str(_siguiente_token(filas, since, hay_mas)),
+        "hay_mas": hay_mas,
+        "eliminados": {},
+    }
+    for modelo, clave in CLAVES.items():
+        objetos = []
+        if vivos[modelo]:
+            queryset, serializer = _vigentes(usuario, modelo, vivos[modelo])
+            objetos = list(queryset)
+            # Registrados como cambio pero ya no visibles: lápida
+            eliminados[modelo] |= vivos[modelo] - {o.pk for o in objetos}
+        respuesta[clave] = serializer(objetos, many=True).data if objetos else []
+        respuesta["eliminados"][clave] = sorted(eliminados[modelo])
+    return respuesta
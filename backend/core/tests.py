@@ -1,3 +1,938 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import re
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from channels.db import database_sync_to_async
+from channels.exceptions import ChannelFull
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from interu_backend import basedatos
+from interu_backend.routers import REPLICA, leyendo_replica
+
+from .models import (
+    CalificacionChat, CanalGrupo, CanalMensaje, Chat, ChatParticipante, Mensaje, Notificacion, Perfil, Publicacion, RegistroCambio, Reputacion,
+)
+from .capa_canales import DatabaseChannelLayer
+from .mensajeria import registrar_lote
+from .pagination import PublicacionCursorPagination
+from .proyecciones import ProyeccionPublicacion
+from .reputacion import registrar_calificacion
+from .sincronizacion import cambios_desde, consultas_desde
+from .views import (
+    BandejaChatsView, CalificacionesRecibidasPorUsuarioView, ListarReportesView,
+    MensajeListCreateView, MensajesChatView, MisChatsView, MisPublicacionesView,
+    NotificacionListView, PublicacionListCreateView, consultas_feed,
+)
+
+User = get_user_model()
+
+
+class PlanesDeConsultaTests(TestCase):
+    """
+    Regresión de planes: cada consulta caliente debe resolverse con un índice
+    y no con un recorrido completo de la tabla.
+
+    En SQLite se comprueba además el índice esperado. En PostgreSQL, con
+    tablas de prueba casi vacías el planificador prefiere Seq Scan, así que
+    se desactiva (enable_seqscan=off) y se verifica que exista un índice
+    utilizable.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(email="plan@duocuc.cl", password="x")
+        cls.otro = User.objects.create_user(email="otro@duocuc.cl", password="x")
+        cls.publicacion = Publicacion.objects.create(titulo="p", estudiante=cls.otro)
+        cls.chat = Chat.objects.create(publicacion=cls.publicacion, titulo="c")
+        ChatParticipante.objects.create(chat=cls.chat, estudiante=cls.usuario)
+        ChatParticipante.objects.create(chat=cls.chat, estudiante=cls.otro, rol="autor")
+        Mensaje.objects.create(chat=cls.chat, estudiante=cls.otro, texto="hola")
+        Notificacion.objects.create(estudiante=cls.usuario, mensaje="n", chat=cls.chat)
+
+    # ----------------------- helpers -----------------------
+    def queryset_de(self, vista, params=None, **kwargs):
+        request = Request(APIRequestFactory().get("/", params or {}))
+        request.user = self.usuario
+        view = vista()
+        view.request, view.kwargs, view.format_kwarg = request, kwargs, None
+        return view.get_queryset()
+
+    def plan(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsaIndice(self, queryset, tabla, indice=None, sin_ordenar=False):
+        plan = self.plan(queryset)
+        if connection.vendor == "sqlite":
+            self.assertIsNone(
+                re.search(rf"\bSCAN {tabla}\b(?! USING)", plan), f"Recorrido completo de {tabla}:\n{plan}"
+            )
+            if indice:
+                self.assertIn(indice, plan, plan)
+            if sin_ordenar:
+                self.assertNotIn("TEMP B-TREE", plan, plan)
+        elif connection.vendor == "postgresql":
+            self.assertNotIn(f"Seq Scan on {tabla}", plan, plan)
+
+    # ----------------------- publicaciones -----------------------
+    def test_feed_primera_pagina(self):
+        paginador = PublicacionCursorPagination()
+        qs = PublicacionListCreateView.queryset.order_by(*paginador.ordering)[:paginador.page_size + 1]
+        self.assertUsaIndice(qs, "core_publicacion", "pub_feed_activas_idx", sin_ordenar=True)
+
+    def test_feed_con_cursor(self):
+        paginador = PublicacionCursorPagination()
+        valores = [self.publicacion.fecha_creacion, self.publicacion.pk]
+        qs = (
+            PublicacionListCreateView.queryset.filter(paginador._filtro_despues(valores, hacia_adelante=True))
+            .order_by(*paginador.ordering)[:paginador.page_size + 1]
+        )
+        self.assertUsaIndice(qs, "core_publicacion", "pub_feed_activas_idx", sin_ordenar=True)
+
+    def test_feed_proyectado(self):
+        # La proyección agrega el JOIN del alias; el orden sigue saliendo del índice
+        paginador = PublicacionCursorPagination()
+        valores = ProyeccionPublicacion.consulta(
+            PublicacionListCreateView.queryset, ProyeccionPublicacion.campos(), paginador.campos_cursor()
+        )
+        qs = valores.order_by(*paginador.ordering)[:paginador.page_size + 1]
+        self.assertUsaIndice(qs, "core_publicacion", "pub_feed_activas_idx", sin_ordenar=True)
+
+    def test_feed_validadores(self):
+        # Las mismas consultas (con el LIMIT 1 de first()) que calcula el ETag del feed
+        publicaciones, perfiles, cambios = consultas_feed()
+        self.assertUsaIndice(publicaciones[:1], "core_publicacion", "pub_activas_act_idx", sin_ordenar=True)
+        self.assertUsaIndice(perfiles[:1], "core_perfil", "perfil_act_idx", sin_ordenar=True)
+        self.assertUsaIndice(cambios[:1], "core_registrocambio", "cambio_publico_idx", sin_ordenar=True)
+
+    def test_mis_publicaciones(self):
+        self.assertUsaIndice(self.queryset_de(MisPublicacionesView), "core_publicacion")
+
+    def test_publicaciones_activas_de_autor(self):
+        qs = Publicacion.objects.filter(estudiante=self.otro, estado=True).values_list("pk", flat=True)
+        self.assertUsaIndice(qs, "core_publicacion", "pub_autor_activas_idx")
+
+    # ----------------------- chats y mensajes -----------------------
+    def test_mis_chats(self):
+        self.assertUsaIndice(self.queryset_de(MisChatsView), "core_chatparticipante", "participante_estudiante_idx")
+
+    def test_bandeja_chats(self):
+        self.assertUsaIndice(self.queryset_de(BandejaChatsView), "core_chatparticipante", "participante_estudiante_idx")
+
+    def test_mensajes_por_chat_ordenados_por_fecha(self):
+        qs = self.queryset_de(MensajeListCreateView, {"chat": self.chat.pk})
+        self.assertUsaIndice(qs, "core_mensaje", "mensaje_chat_fecha_idx", sin_ordenar=True)
+
+    def test_historial_keyset(self):
+        qs = self.queryset_de(MensajesChatView, pk=self.chat.pk).filter(id_mensaje__lt=1000).order_by("-id_mensaje")[:51]
+        self.assertUsaIndice(qs, "core_mensaje", "mensaje_chat_id_idx", sin_ordenar=True)
+
+    # ----------------------- notificaciones -----------------------
+    def test_notificaciones_del_usuario(self):
+        qs = self.queryset_de(NotificacionListView)
+        self.assertUsaIndice(qs, "core_notificacion", "notif_estudiante_act_idx", sin_ordenar=True)
+
+    def test_notificaciones_no_leidas(self):
+        qs = Notificacion.objects.filter(estudiante=self.usuario, leida=False).values_list("pk", flat=True)
+        self.assertUsaIndice(qs, "core_notificacion", "notif_no_leidas_idx")
+
+    def test_agrupacion_nuevo_mensaje(self):
+        qs = Notificacion.objects.filter(
+            Q(tipo="nuevo_mensaje", leida=False), chat=self.chat, estudiante_id__in=[self.usuario.pk]
+        )
+        self.assertUsaIndice(qs, "core_notificacion")
+
+    # ----------------------- calificaciones y reportes -----------------------
+    def test_calificaciones_recibidas(self):
+        qs = self.queryset_de(CalificacionesRecibidasPorUsuarioView, pk=self.otro.pk).order_by("-fecha", "-id_calificacion")
+        self.assertUsaIndice(qs, "core_calificacionchat", "calif_evaluado_idx", sin_ordenar=True)
+
+    def test_cola_de_moderacion(self):
+        self.assertUsaIndice(
+            self.queryset_de(ListarReportesView, {"estado": "0"}), "core_reporte", "reporte_estado_fecha_idx", sin_ordenar=True
+        )
+
+    # ----------------------- sincronización -----------------------
+    def test_sincronizacion_desde_token(self):
+        publico, chats, propios = (qs.order_by("id")[:501] for qs in consultas_desde(self.usuario, 0))
+        self.assertUsaIndice(publico, "core_registrocambio", "cambio_publico_idx", sin_ordenar=True)
+        self.assertUsaIndice(chats, "core_registrocambio", "cambio_chat_idx")
+        self.assertUsaIndice(propios, "core_registrocambio", "cambio_estudiante_idx", sin_ordenar=True)
+
+
+class FeedCondicionalTests(TestCase):
+    """ El ETag y la clave de cache del feed salen de la base, no de un contador por proceso. """
+
+    def setUp(self):
+        cache.clear()
+        self.autor = User.objects.create_user(email="feed@duocuc.cl", password=None)
+        self.publicacion = Publicacion.objects.create(titulo="p", estudiante=self.autor)
+        Publicacion.objects.create(titulo="q", estudiante=self.autor)
+
+    def ids(self, respuesta):
+        return [p["id_publicacion"] for p in respuesta.json()["results"]]
+
+    def assertCambiaTras(self, url, cambio):
+        client = APIClient()
+        antes = client.get(url)
+        self.assertIn(self.publicacion.pk, self.ids(antes))
+        cambio()
+        # Nada invalida el cache: la clave cambia con el ETag
+        despues = client.get(url, HTTP_IF_NONE_MATCH=antes["ETag"])
+        self.assertEqual(despues.status_code, 200)
+        self.assertNotEqual(despues["ETag"], antes["ETag"])
+        self.assertNotIn(self.publicacion.pk, self.ids(despues))
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=despues["ETag"]).status_code, 304)
+
+    def desactivar(self):
+        self.publicacion.estado = False
+        self.publicacion.save()
+
+    def test_desactivacion(self):
+        self.assertCambiaTras("/publicaciones/", self.desactivar)
+
+    def test_baja(self):
+        self.assertCambiaTras("/publicaciones/", self.publicacion.delete)
+
+    def test_vista_async(self):
+        self.assertCambiaTras("/async/publicaciones/", self.desactivar)
+
+
+class CacheRespuestasTests(TestCase):
+    """ GET, cambio y GET: el cache de respuestas públicas nunca devuelve el cuerpo anterior. """
+
+    def setUp(self):
+        cache.clear()
+        self.autor = User.objects.create_user(email="cache@duocuc.cl", password=None)
+        self.perfil = Perfil.objects.create(
+            estudiante=self.autor, alias="antes", nombre="N", apellido="A", carrera="-", area="-"
+        )
+        self.publicacion = Publicacion.objects.create(titulo="antes", estudiante=self.autor)
+        self.client = APIClient()
+        self.detalle = f"/publicaciones/{self.publicacion.pk}/"
+        self.perfil_publico = f"/perfiles/usuario/{self.autor.pk}/"
+
+    def dos_veces(self, url):
+        # La segunda respuesta sale del cache
+        primera = self.client.get(url)
+        self.assertEqual(self.client.get(url).json(), primera.json())
+        return primera.json()
+
+    def titulos_feed(self):
+        return [p["titulo"] for p in self.client.get("/publicaciones/").json()["results"]]
+
+    def test_edicion_de_publicacion(self):
+        self.dos_veces("/publicaciones/")
+        self.dos_veces(self.detalle)
+        self.publicacion.titulo = "despues"
+        self.publicacion.save()
+        self.assertEqual(self.titulos_feed(), ["despues"])
+        self.assertEqual(self.client.get(self.detalle).json()["titulo"], "despues")
+
+    def test_desactivacion_de_publicacion(self):
+        self.dos_veces("/publicaciones/")
+        self.dos_veces(self.detalle)
+        self.publicacion.estado = False
+        self.publicacion.save()
+        self.assertEqual(self.titulos_feed(), [])
+        self.assertEqual(self.client.get(self.detalle).status_code, 404)
+
+    def test_baja_de_publicacion(self):
+        self.dos_veces("/publicaciones/")
+        self.dos_veces(self.detalle)
+        self.publicacion.delete()
+        self.assertEqual(self.titulos_feed(), [])
+        self.assertEqual(self.client.get(self.detalle).status_code, 404)
+
+    def test_edicion_de_perfil(self):
+        self.assertEqual(self.dos_veces(self.perfil_publico)["alias"], "antes")
+        self.assertEqual(self.dos_veces(self.detalle)["autor_alias"], "antes")
+        self.dos_veces("/publicaciones/")
+        self.perfil.alias = "despues"
+        self.perfil.save()
+        self.assertEqual(self.client.get(self.perfil_publico).json()["alias"], "despues")
+        self.assertEqual(self.client.get(self.detalle).json()["autor_alias"], "despues")
+        self.assertEqual(self.client.get("/publicaciones/").json()["results"][0]["autor_alias"], "despues")
+
+    def test_baja_de_perfil(self):
+        self.dos_veces(self.perfil_publico)
+        self.dos_veces(self.detalle)
+        self.perfil.delete()
+        self.assertEqual(self.client.get(self.perfil_publico).status_code, 404)
+        self.assertEqual(self.client.get(self.detalle).json()["autor_alias"], f"Usuario {self.autor.pk}")
+
+    def test_reputacion_en_perfil(self):
+        self.assertEqual(self.dos_veces(self.perfil_publico)["reputacion"]["total"], 0)
+        evaluador = User.objects.create_user(email="evaluador@duocuc.cl", password=None)
+        chat = Chat.objects.create(publicacion=self.publicacion, titulo="c")
+        registrar_calificacion(CalificacionChat.objects.create(chat=chat, evaluador=evaluador, evaluado=self.autor, puntaje=4))
+        reputacion = self.client.get(self.perfil_publico).json()["reputacion"]
+        self.assertEqual((reputacion["total"], reputacion["promedio"]), (1, 4.0))
+
+    def test_transaccion_sin_confirmar(self):
+        # Una lectura dentro de la transacción que edita guarda el cuerpo bajo
+        # el ETag nuevo; si la transacción se revierte, nadie vuelve a pedir esa clave
+        self.dos_veces(self.detalle)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Publicacion.objects.filter(pk=self.publicacion.pk).update(titulo="revertido", fecha_actualizacion=timezone.now())
+            self.assertEqual(self.client.get(self.detalle).json()["titulo"], "revertido")
+            raise RuntimeError
+        self.assertEqual(self.client.get(self.detalle).json()["titulo"], "antes")
+
+    def test_metricas(self):
+        admin = User.objects.create_user(email="admin@duocuc.cl", password=None, is_staff=True)
+        self.dos_veces(self.detalle)
+        self.dos_veces(self.perfil_publico)
+        self.client.get(self.perfil_publico)
+        self.client.get("/publicaciones/999999/")  # sin validadores: no pasa por el cache
+        self.client.force_authenticate(admin)
+        metricas = self.client.get("/metricas/cache/").json()
+        self.assertEqual(metricas["publicacion"], {"hits": 1, "misses": 1, "ratio": 0.5})
+        self.assertEqual(metricas["perfil"], {"hits": 2, "misses": 1, "ratio": 0.6667})
+        self.assertEqual(metricas["feed"], {"hits": 0, "misses": 0, "ratio": None})
+        self.client.force_authenticate(self.autor)
+        self.assertEqual(self.client.get("/metricas/cache/").status_code, 403)
+
+
+class RecomendacionesTests(TestCase):
+    """ El ranking cacheado de un usuario cambia cuando otra publicación cambia sus habilidades. """
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(email="reco@duocuc.cl", password=None)
+        Perfil.objects.create(
+            estudiante=self.usuario, nombre="N", apellido="A", carrera="-", area="-", habilidades_ofrecidas=["Python"]
+        )
+        self.otro = User.objects.create_user(email="reco-otro@duocuc.cl", password=None)
+        self.publicacion = self.publicar(["django"])
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def publicar(self, buscadas, estudiante=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Publicacion.objects.create(
+                titulo="p", estudiante=estudiante or self.otro, habilidades_buscadas=buscadas
+            )
+
+    def guardar(self, publicacion, **campos):
+        for campo, valor in campos.items():
+            setattr(publicacion, campo, valor)
+        with self.captureOnCommitCallbacks(execute=True):
+            publicacion.save()
+
+    def recomendadas(self):
+        return [p["id_publicacion"] for p in self.client.get("/publicaciones/recomendadas/").json()]
+
+    def test_edicion_de_habilidades_de_otro_usuario(self):
+        self.assertEqual(self.recomendadas(), [])
+        self.guardar(self.publicacion, habilidades_buscadas=["  PYTHON "])
+        self.assertEqual(self.recomendadas(), [self.publicacion.pk])
+        self.guardar(self.publicacion, habilidades_buscadas=["react"])
+        self.assertEqual(self.recomendadas(), [])
+
+    def test_publicacion_nueva_y_baja(self):
+        self.assertEqual(self.recomendadas(), [])
+        nueva = self.publicar(["python"])
+        self.assertEqual(self.recomendadas(), [nueva.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            nueva.delete()
+        self.assertEqual(self.recomendadas(), [])
+
+    def test_reactivacion(self):
+        publicacion = self.publicar(["python"])
+        self.guardar(publicacion, estado=False)
+        self.assertEqual(self.recomendadas(), [])
+        self.guardar(publicacion, estado=True)
+        self.assertEqual(self.recomendadas(), [publicacion.pk])
+
+    def test_otras_habilidades_no_invalidan(self):
+        self.recomendadas()
+        self.publicar(["cobol"])
+        with mock.patch("core.recomendaciones.puntuar") as puntuar:
+            self.recomendadas()
+        puntuar.assert_not_called()
+
+    def test_cambio_del_propio_perfil(self):
+        self.assertEqual(self.recomendadas(), [])
+        perfil = self.usuario.perfil
+        perfil.habilidades_ofrecidas = ["Django"]
+        perfil.save()
+        self.assertEqual(self.recomendadas(), [self.publicacion.pk])
+
+    def test_version_solo_despues_del_commit(self):
+        self.recomendadas()
+        # El callback se descarta si la transacción se revierte
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Publicacion.objects.create(titulo="p", estudiante=self.otro, habilidades_buscadas=["python"])
+        self.assertEqual(len(callbacks), 1)
+        with mock.patch("core.recomendaciones.puntuar") as puntuar:
+            self.recomendadas()
+        puntuar.assert_not_called()
+
+
+@override_settings(DATABASE_ROUTERS=["interu_backend.routers.ReplicaRouter"], REPLICA_VENTANA_PRIMARIA=1)
+class ReplicaTests(TransactionTestCase):
+    """
+    Router de réplica con DJANGO_DB_REPLICA_NAME definido. La réplica es una
+    segunda conexión a la base de prueba (TEST MIRROR), así que ve lo
+    confirmado: por eso TransactionTestCase.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Se agrega después de setUpClass: el runner no conoce el alias al armar las bases de prueba
+        nombre = connections["default"].settings_dict["NAME"]
+        variables = {"DJANGO_DB_REPLICA_NAME": nombre, "DJANGO_DB_NAME": nombre}
+        configuracion = basedatos.configuracion_replica(
+            lambda clave, defecto=None: variables.get(clave, defecto), settings.BASE_DIR
+        )
+        # settings.DATABASES es el mismo diccionario que usa `connections`
+        settings.DATABASES[REPLICA] = connections.configure_settings({**settings.DATABASES, REPLICA: configuracion})[REPLICA]
+        # Espejo de "default" (TEST MIRROR): no se vacía por separado entre tests
+        cls.databases = cls.databases | {REPLICA}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del settings.DATABASES[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(email="replica@duocuc.cl", password=None)
+        Perfil.objects.create(estudiante=self.usuario, nombre="N", apellido="A", carrera="-", area="-")
+        self.publicacion = Publicacion.objects.create(titulo="p", estudiante=self.usuario)
+        self.client = APIClient()
+        # JWT real: las vistas async autentican desde la cabecera
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.usuario)}")
+        # La autenticación lee el usuario en la primaria; después sale del cache
+        self.client.get("/publicaciones/mias/")
+
+    def alias_de(self, url):
+        """ Alias que atendieron las consultas de la vista. """
+        with CaptureQueriesContext(connections["default"]) as primaria, CaptureQueriesContext(connections[REPLICA]) as replica:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertFalse(leyendo_replica())  # el ContextVar se restaura al terminar
+        return {alias for alias, consultas in (("default", primaria), (REPLICA, replica)) if consultas}
+
+    def test_lecturas_en_la_replica(self):
+        self.assertEqual(self.alias_de(f"/publicaciones/{self.publicacion.pk}/"), {REPLICA})
+        self.assertEqual(self.alias_de("/async/publicaciones/"), {REPLICA})
+        # Sin LecturaReplicaMixin todo va a la primaria
+        self.assertEqual(self.alias_de("/publicaciones/mias/"), {"default"})
+
+    def test_primaria_tras_escribir(self):
+        url = f"/publicaciones/{self.publicacion.pk}/"
+        self.assertEqual(self.client.patch("/perfil/", {"alias": "nuevo"}, format="json").status_code, 200)
+        self.assertEqual(self.alias_de(url), {"default"})
+        self.assertEqual(self.alias_de("/async/publicaciones/"), {"default"})
+        # Otro usuario sigue leyendo de la réplica
+        self.assertEqual(APIClient().get(url).status_code, 200)
+        with CaptureQueriesContext(connections["default"]) as primaria:
+            APIClient().get(url)
+        self.assertEqual(len(primaria), 0)
+        # Vencida la ventana, el que escribió vuelve a la réplica
+        time.sleep(1.1)
+        self.assertEqual(self.alias_de(url), {REPLICA})
+
+    def test_indice_de_texto_en_el_alias_de_la_escritura(self):
+        with CaptureQueriesContext(connections["default"]) as primaria, CaptureQueriesContext(connections[REPLICA]) as replica:
+            publicacion = Publicacion(titulo="texto", estudiante=self.usuario)
+            publicacion.save(using=REPLICA)
+            # El registro de /sync/ escribe en "default", la misma base en memoria
+            # que tiene bloqueada la transacción del DELETE en la réplica
+            with mock.patch("core.signals.sincronizacion"):
+                publicacion.delete(using=REPLICA)
+        fts = [q["sql"] for q in replica.captured_queries if "core_publicacion_fts" in q["sql"]]
+        self.assertEqual(len(fts), 3)  # DELETE + INSERT al guardar, DELETE al eliminar
+        self.assertFalse([q for q in primaria.captured_queries if "core_publicacion_fts" in q["sql"]])
+
+    def test_lectura_fallida_no_marca_escritura(self):
+        self.assertEqual(self.client.patch("/perfil/", {"foto": "no es url"}, format="json").status_code, 400)
+        self.assertEqual(self.alias_de(f"/publicaciones/{self.publicacion.pk}/"), {REPLICA})
+
+
+@override_settings(TIEMPO_REAL_EN_SEGUNDO_PLANO=False, NOTIFICACIONES_EN_SEGUNDO_PLANO=False)
+class NotificacionesAgrupadasTests(TestCase):
+    """ 'nuevo_mensaje': una fila no leída por (estudiante, chat) con su contador. """
+
+    def setUp(self):
+        self.remitente = User.objects.create_user(email="notif-remitente@duocuc.cl", password=None)
+        self.receptor = User.objects.create_user(email="notif-receptor@duocuc.cl", password=None)
+        self.chat = Chat.objects.create(
+            publicacion=Publicacion.objects.create(titulo="p", estudiante=self.receptor), titulo="c"
+        )
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.remitente)
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.receptor, rol="autor")
+        self.client = APIClient()
+
+    def enviar(self, cantidad):
+        self.client.force_authenticate(self.remitente)
+        for i in range(cantidad):
+            with self.captureOnCommitCallbacks(execute=True):
+                respuesta = self.client.post("/mensajes/", {"chat": self.chat.pk, "texto": f"m{i}"}, format="json")
+            self.assertEqual(respuesta.status_code, 201)
+
+    def pendientes(self):
+        return list(Notificacion.objects.filter(estudiante=self.receptor, tipo="nuevo_mensaje").order_by("pk"))
+
+    def badge(self):
+        self.client.force_authenticate(self.receptor)
+        return self.client.get("/contadores/").json()["notificaciones"]
+
+    def test_mensajes_agrupados(self):
+        self.enviar(3)
+        notificacion, = self.pendientes()
+        self.assertEqual((notificacion.contador, notificacion.leida), (3, False))
+        self.assertEqual(notificacion.mensaje, "3 mensajes nuevos en el chat 'c'")
+        # La fila agrupada cuenta una sola vez en el badge
+        self.assertEqual(self.badge(), 1)
+        self.assertFalse(Notificacion.objects.filter(estudiante=self.remitente).exists())
+
+    def test_leida_y_mensaje_nuevo(self):
+        self.enviar(2)
+        leida, = self.pendientes()
+        self.client.force_authenticate(self.receptor)
+        self.assertEqual(self.client.patch(f"/notificaciones/{leida.pk}/marcar-leida/").status_code, 200)
+        self.enviar(1)
+        anterior, nueva = self.pendientes()
+        self.assertEqual((anterior.pk, anterior.leida, anterior.contador), (leida.pk, True, 2))
+        self.assertEqual((nueva.leida, nueva.contador), (False, 1))
+        self.assertEqual(nueva.mensaje, "Nuevo mensaje en el chat 'c'")
+        self.assertEqual(self.badge(), 1)
+
+    def test_reintento_tras_integrity_error(self):
+        self.enviar(1)
+        # Otro proceso creó la fila pendiente entre la lectura y el INSERT:
+        # la primera búsqueda no la ve y el INSERT choca con la restricción parcial
+        filtro_original = Notificacion.objects.filter
+        ocultado = []
+
+        def filtro(*args, **kwargs):
+            if kwargs.get("tipo") == "nuevo_mensaje" and not ocultado:
+                ocultado.append(True)
+                return Notificacion.objects.none()
+            return filtro_original(*args, **kwargs)
+
+        with mock.patch.object(Notificacion.objects, "filter", side_effect=filtro):
+            self.enviar(1)
+        self.assertTrue(ocultado)
+        notificacion, = self.pendientes()
+        self.assertEqual(notificacion.contador, 2)
+        self.assertEqual(self.badge(), 1)
+
+
+@override_settings(TIEMPO_REAL_EN_SEGUNDO_PLANO=False)
+class MarcarChatLeidoTests(TestCase):
+    """ POST /chats/<pk>/marcar-leido/: marca de lectura y no_leidos recalculado. """
+
+    def setUp(self):
+        self.lector = User.objects.create_user(email="lector@duocuc.cl", password=None)
+        self.otro = User.objects.create_user(email="escritor@duocuc.cl", password=None)
+        self.chat = Chat.objects.create(
+            publicacion=Publicacion.objects.create(titulo="p", estudiante=self.otro), titulo="c"
+        )
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.lector)
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.otro, rol="autor")
+        self.mensajes = []
+        for i, autor in enumerate([self.otro, self.otro, self.lector, self.otro, self.otro]):
+            self.mensajes.append(Mensaje.objects.create(chat=self.chat, estudiante=autor, texto=f"m{i}").pk)
+        # Los mensajes propios no cuentan como pendientes
+        ChatParticipante.objects.filter(chat=self.chat, estudiante=self.lector).update(no_leidos=4)
+        self.client = APIClient()
+        self.client.force_authenticate(self.lector)
+
+    def marcar(self, **datos):
+        return self.client.post(f"/chats/{self.chat.pk}/marcar-leido/", datos, format="json")
+
+    def estado(self):
+        return ChatParticipante.objects.filter(chat=self.chat, estudiante=self.lector).values_list(
+            "ultimo_mensaje_leido", "no_leidos"
+        ).get()
+
+    def test_hasta_un_mensaje(self):
+        respuesta = self.marcar(hasta=self.mensajes[2])
+        self.assertEqual(respuesta.json(), {"chat": self.chat.pk, "hasta": self.mensajes[2], "no_leidos": 2})
+        self.assertEqual(self.estado(), (self.mensajes[2], 2))
+
+    def test_sin_hasta_marca_el_ultimo(self):
+        self.assertEqual(self.marcar().json()["hasta"], self.mensajes[-1])
+        self.assertEqual(self.estado(), (self.mensajes[-1], 0))
+
+    def test_hasta_mayor_que_el_ultimo(self):
+        self.assertEqual(self.marcar(hasta=self.mensajes[-1] + 1000).json()["hasta"], self.mensajes[-1])
+        self.assertEqual(self.estado(), (self.mensajes[-1], 0))
+
+    def test_la_marca_no_retrocede(self):
+        self.marcar(hasta=self.mensajes[3])
+        respuesta = self.marcar(hasta=self.mensajes[0])
+        self.assertEqual((respuesta.json()["hasta"], respuesta.json()["no_leidos"]), (self.mensajes[3], 1))
+        self.assertEqual(self.estado(), (self.mensajes[3], 1))
+        # Un mensaje nuevo vuelve a quedar pendiente por encima de la marca
+        Mensaje.objects.create(chat=self.chat, estudiante=self.otro, texto="nuevo")
+        self.assertEqual(self.marcar(hasta=self.mensajes[3]).json()["no_leidos"], 2)
+
+    def test_no_participante(self):
+        self.client.force_authenticate(User.objects.create_user(email="intruso@duocuc.cl", password=None))
+        self.assertEqual(self.marcar().status_code, 403)
+        self.assertEqual(self.estado(), (0, 4))
+
+    def test_hasta_invalido(self):
+        self.assertEqual(self.marcar(hasta="x").status_code, 400)
+        self.assertEqual(self.estado(), (0, 4))
+
+
+class ReputacionTests(TestCase):
+    """ Reputacion incremental contra el agregado calculado desde cero. """
+
+    def setUp(self):
+        self.evaluado = User.objects.create_user(email="evaluado@duocuc.cl", password=None)
+        self.chat = Chat.objects.create(
+            publicacion=Publicacion.objects.create(titulo="p", estudiante=self.evaluado), titulo="c"
+        )
+        self.evaluadores = 0
+
+    def calificar(self, puntaje, chat=None):
+        self.evaluadores += 1
+        evaluador = User.objects.create_user(email=f"evaluador{self.evaluadores}@duocuc.cl", password=None)
+        calificacion = CalificacionChat.objects.create(
+            chat=chat or self.chat, evaluador=evaluador, evaluado=self.evaluado, puntaje=puntaje
+        )
+        registrar_calificacion(calificacion)
+        return calificacion
+
+    def assertCoincideConAgregado(self):
+        calificaciones = CalificacionChat.objects.filter(evaluado=self.evaluado)
+        esperado = calificaciones.aggregate(total=Count("pk"), suma=Coalesce(Sum("puntaje"), 0), promedio=Avg("puntaje"))
+        esperado["promedio"] = esperado["promedio"] or 0.0
+        for n in range(1, 6):
+            esperado[f"estrellas_{n}"] = calificaciones.filter(puntaje=n).count()
+        reputacion = Reputacion.objects.get(estudiante=self.evaluado)
+        obtenido = {campo: getattr(reputacion, campo) for campo in esperado}
+        self.assertAlmostEqual(obtenido.pop("promedio"), esperado.pop("promedio"))
+        self.assertEqual(obtenido, esperado)
+
+    def test_altas(self):
+        for puntaje in (5, 3, 4, 4, 1):
+            self.calificar(puntaje)
+            self.assertCoincideConAgregado()
+
+    def test_bajas_hasta_cero(self):
+        calificaciones = [self.calificar(p) for p in (2, 5, 5)]
+        for calificacion in calificaciones:
+            calificacion.delete()
+            self.assertCoincideConAgregado()
+        # Sin calificaciones el promedio vuelve a 0 (sin dividir por cero)
+        reputacion = Reputacion.objects.get(estudiante=self.evaluado)
+        self.assertEqual((reputacion.total, reputacion.suma, reputacion.promedio), (0, 0, 0.0))
+        self.calificar(3)
+        self.assertCoincideConAgregado()
+
+    def test_baja_en_cascada(self):
+        otro_chat = Chat.objects.create(publicacion=self.chat.publicacion, titulo="otro")
+        for puntaje in (1, 4):
+            self.calificar(puntaje)
+        for puntaje in (5, 5, 2):
+            self.calificar(puntaje, chat=otro_chat)
+        # La cascada del chat envía post_delete por cada calificación
+        otro_chat.delete()
+        self.assertCoincideConAgregado()
+
+
+class CapaCanalesTests(TransactionTestCase):
+    """
+    DatabaseChannelLayer con dos instancias sobre la misma base, como dos
+    procesos. TransactionTestCase: database_sync_to_async cierra las
+    conexiones que quedan dentro de una transacción.
+    """
+
+    def capa(self, **config):
+        return DatabaseChannelLayer(poll_interval=0.01, cleanup_interval=0, **config)
+
+    async def recibir(self, capa, canal, espera=1):
+        return await asyncio.wait_for(capa.receive(canal), espera)
+
+    @database_sync_to_async
+    def vencer(self, modelo):
+        modelo.objects.update(expira=timezone.now() - timedelta(seconds=1))
+
+    async def test_grupo_entre_instancias(self):
+        emisor, receptor = self.capa(), self.capa()
+        canal = await receptor.new_channel()
+        await receptor.group_add("chat_1", canal)
+        await emisor.group_send("chat_1", {"type": "chat.mensaje", "texto": "hola"})
+        self.assertEqual(await self.recibir(receptor, canal), {"type": "chat.mensaje", "texto": "hola"})
+        await receptor.group_discard("chat_1", canal)
+        await emisor.group_send("chat_1", {"type": "chat.mensaje", "texto": "otro"})
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.recibir(receptor, canal, 0.2)
+
+    async def test_send_entre_instancias_en_orden(self):
+        emisor, receptor = self.capa(), self.capa()
+        canal = await receptor.new_channel()
+        for i in range(3):
+            await emisor.send(canal, {"type": "x", "i": i})
+        self.assertEqual([(await self.recibir(receptor, canal))["i"] for _ in range(3)], [0, 1, 2])
+
+    async def test_expiry(self):
+        emisor, receptor = self.capa(), self.capa()
+        canal = await receptor.new_channel()
+        await emisor.send(canal, {"type": "x"})
+        await self.vencer(CanalMensaje)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.recibir(receptor, canal, 0.2)
+        # La limpieza borra los vencidos
+        self.assertFalse(await CanalMensaje.objects.aexists())
+
+    async def test_group_expiry(self):
+        emisor, receptor = self.capa(), self.capa()
+        canal = await receptor.new_channel()
+        await receptor.group_add("chat_1", canal)
+        await self.vencer(CanalGrupo)
+        await emisor.group_send("chat_1", {"type": "x"})
+        self.assertFalse(await CanalMensaje.objects.aexists())
+
+    async def test_capacity(self):
+        emisor, receptor = self.capa(capacity=2), self.capa(capacity=2)
+        canal = await receptor.new_channel()
+        await emisor.send(canal, {"type": "x", "i": 0})
+        await emisor.send(canal, {"type": "x", "i": 1})
+        with self.assertRaises(ChannelFull):
+            await emisor.send(canal, {"type": "x", "i": 2})
+        # group_send descarta en silencio para un canal lleno
+        await receptor.group_add("chat_1", canal)
+        await emisor.group_send("chat_1", {"type": "x", "i": 3})
+        self.assertEqual(await CanalMensaje.objects.acount(), 2)
+        # Al consumir vuelve a haber lugar
+        self.assertEqual((await self.recibir(receptor, canal))["i"], 0)
+        await emisor.send(canal, {"type": "x", "i": 4})
+        self.assertEqual([(await self.recibir(receptor, canal))["i"] for _ in range(2)], [1, 4])
+
+
+class CursorInvalidoTests(TestCase):
+    """ Un cursor manipulado responde 404 "Cursor inválido." y nunca 500. """
+
+    def test_cursores_malformados(self):
+        Publicacion.objects.create(titulo="p", estudiante=User.objects.create_user(email="c@duocuc.cl", password="x"))
+        cursores = [
+            {"v": [[1], {}], "r": 1},
+            {"v": [{"a": 1}, 2], "r": 1},
+            {"v": ["2024-01-01T00:00:00Z", 1, 3]},
+            {"v": [5, 1]},
+            {"v": ["2024-01-01T00:00:00Z", "1"]},
+            {"v": ["2024-01-01T00:00:00Z", 10**30]},
+            [1, 2],
+        ]
+        for datos in cursores:
+            cursor = base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+            with self.subTest(datos=datos):
+                response = self.client.get("/publicaciones/", {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Cursor inválido."})
+
+
+@override_settings(SYNC_MARGEN_SEGUNDOS=0)
+class SincronizacionTests(TestCase):
+    """ cambios_desde(): lápidas, compactación, paginado, margen del token y alcance por usuario. """
+
+    def setUp(self):
+        self.autor = User.objects.create_user(email="autor@duocuc.cl", password=None)
+        self.otro = User.objects.create_user(email="otro-sync@duocuc.cl", password=None)
+        self.ajeno = User.objects.create_user(email="ajeno@duocuc.cl", password=None)
+        self.publicacion = Publicacion.objects.create(titulo="p", estudiante=self.autor)
+        self.chat = Chat.objects.create(publicacion=self.publicacion, titulo="c")
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.autor, rol="autor")
+        ChatParticipante.objects.create(chat=self.chat, estudiante=self.otro)
+        self.mensaje = Mensaje.objects.create(chat=self.chat, estudiante=self.otro, texto="hola")
+
+    def ids(self, respuesta, clave, campo):
+        return [objeto[campo] for objeto in respuesta[clave]]
+
+    def test_lapida_publicacion_desactivada(self):
+        token = cambios_desde(self.otro, 0, 500)["token"]
+        self.publicacion.estado = False
+        self.publicacion.save()
+        respuesta = cambios_desde(self.otro, int(token), 500)
+        self.assertEqual(respuesta["publicaciones"], [])
+        self.assertEqual(respuesta["eliminados"]["publicaciones"], [self.publicacion.pk])
+
+    def test_lapida_chat_eliminado(self):
+        token = int(cambios_desde(self.otro, 0, 500)["token"])
+        chat_id = self.chat.pk
+        self.chat.delete()
+        for usuario in (self.autor, self.otro):
+            respuesta = cambios_desde(usuario, token, 500)
+            self.assertEqual(respuesta["eliminados"]["chats"], [chat_id])
+            self.assertEqual(respuesta["mensajes"], [])
+        self.assertEqual(cambios_desde(self.ajeno, token, 500)["eliminados"]["chats"], [])
+
+    def test_compactacion(self):
+        token = int(cambios_desde(self.otro, 0, 500)["token"])
+        for titulo in ("uno", "dos"):
+            self.publicacion.titulo = titulo
+            self.publicacion.save()
+        self.assertEqual(RegistroCambio.objects.filter(modelo="publicacion", objeto_id=self.publicacion.pk).count(), 1)
+        respuesta = cambios_desde(self.otro, token, 500)
+        self.assertEqual(self.ids(respuesta, "publicaciones", "id_publicacion"), [self.publicacion.pk])
+        self.assertEqual(respuesta["publicaciones"][0]["titulo"], "dos")
+
+    def test_paginado(self):
+        for i in range(4):
+            Mensaje.objects.create(chat=self.chat, estudiante=self.autor, texto=f"m{i}")
+        vistos, token, paginas = [], 0, 0
+        while True:
+            respuesta = cambios_desde(self.otro, token, 2)
+            paginas += 1
+            self.assertLessEqual(sum(len(respuesta[c]) for c in ("publicaciones", "chats", "mensajes")), 2)
+            vistos += self.ids(respuesta, "mensajes", "id_mensaje")
+            self.assertGreater(int(respuesta["token"]), token)
+            token = int(respuesta["token"])
+            if not respuesta["hay_mas"]:
+                break
+        self.assertEqual(sorted(vistos), list(Mensaje.objects.values_list("pk", flat=True).order_by("pk")))
+        self.assertGreater(paginas, 1)
+
+    def test_margen_del_token(self):
+        with override_settings(SYNC_MARGEN_SEGUNDOS=60):
+            # Todo es más reciente que el margen: se entrega pero el token no avanza
+            respuesta = cambios_desde(self.otro, 0, 500)
+            self.assertEqual(respuesta["token"], "0")
+            self.assertEqual(self.ids(respuesta, "mensajes", "id_mensaje"), [self.mensaje.pk])
+            # Salvo con una página completa, para no repetirla
+            self.assertNotEqual(cambios_desde(self.otro, 0, 1)["token"], "0")
+        self.assertEqual(
+            cambios_desde(self.otro, 0, 500)["token"], str(RegistroCambio.objects.order_by("-id").first().id)
+        )
+
+    def test_alcance(self):
+        respuesta = cambios_desde(self.ajeno, 0, 500)
+        self.assertEqual(respuesta["mensajes"], [])
+        self.assertEqual(respuesta["chats"], [])
+        self.assertEqual(self.ids(respuesta, "publicaciones", "id_publicacion"), [self.publicacion.pk])
+        self.assertEqual(self.ids(cambios_desde(self.otro, 0, 500), "mensajes", "id_mensaje"), [self.mensaje.pk])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.otro)
+        self.assertEqual(client.get("/sync/", {"since": "x"}).status_code, 400)
+        respuesta = client.get("/sync/", {"since": 0}).json()
+        self.assertEqual(self.ids(respuesta, "mensajes", "id_mensaje"), [self.mensaje.pk])
+
+
+@override_settings(TIEMPO_REAL_EN_SEGUNDO_PLANO=False, NOTIFICACIONES_EN_SEGUNDO_PLANO=False)
+class LoteMensajesTests(TestCase):
+    """ registrar_lote(): errores por item, deduplicación, reintento y totales por chat. """
+
+    def setUp(self):
+        self.remitente = User.objects.create_user(email="lote@duocuc.cl", password=None)
+        self.receptor = User.objects.create_user(email="receptor@duocuc.cl", password=None)
+        publicacion = Publicacion.objects.create(titulo="p", estudiante=self.receptor)
+        self.chats = []
+        for titulo in ("a", "b"):
+            chat = Chat.objects.create(publicacion=publicacion, titulo=titulo)
+            ChatParticipante.objects.create(chat=chat, estudiante=self.remitente)
+            ChatParticipante.objects.create(chat=chat, estudiante=self.receptor, rol="autor")
+            self.chats.append(chat)
+        self.ajeno = Chat.objects.create(publicacion=publicacion, titulo="ajeno")
+
+    def item(self, chat, client_id, texto="hola"):
+        return {"chat": chat.pk, "texto": texto, "client_id": client_id}
+
+    def registrar(self, items):
+        with self.captureOnCommitCallbacks(execute=True), mock.patch("core.mensajeria.enviar_a_grupo") as enviar:
+            resultados = registrar_lote(self.remitente, items)
+        return resultados, enviar
+
+    def test_error_por_item(self):
+        resultados, _ = self.registrar([
+            self.item(self.chats[0], "c1"), self.item(self.ajeno, "c2"), self.item(self.chats[1], "c3"),
+        ])
+        self.assertEqual([r["client_id"] for r in resultados], ["c1", "c2", "c3"])
+        self.assertEqual(resultados[1]["error"], "No eres participante de este chat.")
+        self.assertNotIn("error", resultados[0])
+        self.assertFalse(Mensaje.objects.filter(chat=self.ajeno).exists())
+        self.assertEqual(Mensaje.objects.count(), 2)
+
+    def test_duplicados_en_lote_y_en_base(self):
+        guardado = Mensaje.objects.create(chat=self.chats[0], estudiante=self.remitente, texto="x", client_id="c1")
+        resultados, _ = self.registrar([
+            self.item(self.chats[0], "c1"), self.item(self.chats[0], "c2"), self.item(self.chats[0], "c2"),
+        ])
+        self.assertEqual((resultados[0]["id_mensaje"], resultados[0]["duplicado"]), (guardado.pk, True))
+        self.assertFalse(resultados[1]["duplicado"])
+        self.assertEqual((resultados[2]["id_mensaje"], resultados[2]["duplicado"]), (resultados[1]["id_mensaje"], True))
+        self.assertEqual(Mensaje.objects.filter(client_id="c2").count(), 1)
+        # Reenviar el lote completo no inserta nada
+        resultados, enviar = self.registrar([self.item(self.chats[0], "c1"), self.item(self.chats[0], "c2")])
+        self.assertTrue(all(r["duplicado"] for r in resultados))
+        self.assertEqual(Mensaje.objects.count(), 2)
+        enviar.assert_not_called()
+
+    def test_reintento_tras_integrity_error(self):
+        # Otro envío guardó "c1" entre la búsqueda de duplicados y el INSERT
+        ganador = Mensaje.objects.create(chat=self.chats[0], estudiante=self.remitente, texto="x", client_id="c1")
+        filtro_original = Mensaje.objects.filter
+        ocultado = []
+
+        def filtro(*args, **kwargs):
+            if "client_id__in" in kwargs and not ocultado:
+                ocultado.append(True)
+                return Mensaje.objects.none()
+            return filtro_original(*args, **kwargs)
+
+        with mock.patch.object(Mensaje.objects, "filter", side_effect=filtro):
+            resultados, _ = self.registrar([self.item(self.chats[0], "c1"), self.item(self.chats[0], "c2")])
+        self.assertTrue(ocultado)
+        self.assertEqual((resultados[0]["id_mensaje"], resultados[0]["duplicado"]), (ganador.pk, True))
+        self.assertFalse(resultados[1]["duplicado"])
+        self.assertEqual(Mensaje.objects.filter(client_id__in=["c1", "c2"]).count(), 2)
+        # El intento fallido no dejó contadores ni notificaciones de más
+        receptor = ChatParticipante.objects.get(chat=self.chats[0], estudiante=self.receptor)
+        self.assertEqual(receptor.no_leidos, 1)
+        self.assertEqual(Notificacion.objects.get(estudiante=self.receptor, chat=self.chats[0]).contador, 1)
+
+    def test_totales_por_chat(self):
+        items = [self.item(self.chats[0], f"a{i}") for i in range(3)] + [self.item(self.chats[1], f"b{i}") for i in range(2)]
+        _, enviar = self.registrar(items)
+        for chat, cantidad in zip(self.chats, (3, 2)):
+            with self.subTest(chat=chat.titulo):
+                participantes = {p.estudiante_id: p.no_leidos for p in ChatParticipante.objects.filter(chat=chat)}
+                self.assertEqual(participantes, {self.remitente.pk: 0, self.receptor.pk: cantidad})
+                notificacion = Notificacion.objects.get(estudiante=self.receptor, chat=chat, tipo="nuevo_mensaje")
+                self.assertEqual(notificacion.contador, cantidad)
+                self.assertFalse(Notificacion.objects.filter(estudiante=self.remitente, chat=chat).exists())
+        # Un solo evento de WebSocket por chat, con todos sus mensajes
+        eventos = {args[0]: args[1] for args, _ in enviar.call_args_list}
+        self.assertEqual(len(enviar.call_args_list), 2)
+        self.assertEqual(len(eventos[f"chat_{self.chats[0].pk}"]["mensajes"]), 3)
+        self.assertEqual(len(eventos[f"chat_{self.chats[1].pk}"]["mensajes"]), 2)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.remitente)
+        self.assertEqual(client.post("/mensajes/lote/", {"mensajes": []}, format="json").status_code, 400)
+        demasiados = [self.item(self.chats[0], f"c{i}") for i in range(101)]
+        with self.settings(MENSAJES_LOTE_MAX=100):
+            self.assertEqual(client.post("/mensajes/lote/", {"mensajes": demasiados}, format="json").status_code, 400)
+        respuesta = client.post("/mensajes/lote/", {"mensajes": demasiados[:2]}, format="json")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([r["client_id"] for r in respuesta.json()["mensajes"]], ["c0", "c1"])
@@ -0,0 +1,66 @@
+"""
+Envíos al channel layer desde código síncrono (vistas, señales).
+
+El envío ocurre después del commit, nunca con la transacción abierta. Con
+TIEMPO_REAL_EN_SEGUNDO_PLANO=True (por defecto) lo hace un hilo local con un
+solo worker, así que la respuesta HTTP no espera el round trip al channel
+layer y los eventos salen en el mismo orden en que se confirmaron.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tiempo_real")
+    return _executor
+
+
+def grupo_chat(chat_id):
+    return f"chat_{chat_id}"
+
+
+def grupo_usuario(usuario_id):
+    return f"usuario_{usuario_id}"
+
+
+def _enviar(grupo, evento):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(grupo, evento)
+
+
+def _enviar_en_hilo(grupo, evento):
+    # El channel layer de base de datos usa una conexión propia del hilo
+    close_old_connections()
+    try:
+        _enviar(grupo, evento)
+    except Exception:
+        logger.exception("Error enviando %s al grupo %s", evento.get("type"), grupo)
+    finally:
+        close_old_connections()
+
+
+def enviar_a_grupo(grupo, evento):
+    """ Envía al channel layer cuando la transacción actual se confirme. """
+    def _despachar():
+        if getattr(settings, "TIEMPO_REAL_EN_SEGUNDO_PLANO", True):
+            _get_executor().submit(_enviar_en_hilo, grupo, evento)
+        else:
+            _enviar(grupo, evento)
+
+    transaction.on_commit(_despachar)
+
+
+def enviar_a_usuario(usuario_id, evento):
+    enviar_a_grupo(grupo_usuario(usuario_id), evento)
@@ -2,22 +2,27 @@ from django import views
 from django.urls import path
 from .views import (
     # Publicaciones
+    BuscarPublicacionesView, BuscarTextoPublicacionesView, PublicacionesRecomendadasView,
     CalificacionesRecibidasPorPerfilView, CalificacionesRecibidasPorUsuarioView, PublicacionListCreateView, PublicacionDetailView,
     PublicacionUpdateView, PublicacionDeleteView, MisPublicacionesView,
     # Chats y mensajes
     ChatListCreateView, ChatDetailView, CompletarIntercambioView, MensajeListCreateView, MisChatsView, IniciarChatView,
+    MensajesChatView, BandejaChatsView, MarcarChatLeidoView, MensajeLoteView,
     # Calificaciones
     CalificacionChatCreateView, CalificacionesRecibidasView,
     # Notificaciones
-    NotificacionListView, MarcarNotificacionLeidaView, MarcarTodasNotificacionesLeidasView,
+    NotificacionListView, MarcarNotificacionLeidaView, MarcarTodasNotificacionesLeidasView, ContadoresView,
     # Perfil
     PerfilDetailView, CrearPerfilView, EliminarMiCuenta,
     # Reportes
-    CrearReporteView, ListarReportesView, ModerarReporteView, PerfilPublicoPorUsuarioView,
+    CrearReporteView, ListarReportesView, ModerarReporteView, MetricasCacheView, PerfilPublicoPorUsuarioView,
+    # Sincronización
+    SincronizacionView,
     # Consentimiento
     verificar_consentimiento ,registrar_consentimiento
     
 )
+from .views_async import BandejaChatsAsyncView, FeedAsyncView, MensajesChatAsyncView, NotificacionListAsyncView
 
 urlpatterns = [
     
@@ -32,6 +37,9 @@ urlpatterns = [
     # Publicaciones
     path('publicaciones/', PublicacionListCreateView.as_view(), name='publicaciones-list-create'),
     path('publicaciones/mias/', MisPublicacionesView.as_view(), name='mis-publicaciones'),
+    path('publicaciones/buscar/', BuscarPublicacionesView.as_view(), name='publicaciones-buscar'),
+    path('publicaciones/buscar/texto/', BuscarTextoPublicacionesView.as_view(), name='publicaciones-buscar-texto'),
+    path('publicaciones/recomendadas/', PublicacionesRecomendadasView.as_view(), name='publicaciones-recomendadas'),
     path('publicaciones/<int:pk>/', PublicacionDetailView.as_view(), name='publicaciones-detail'),
     path('publicaciones/<int:pk>/editar/', PublicacionUpdateView.as_view(), name='publicaciones-update'),
     path('publicaciones/<int:pk>/eliminar/', PublicacionDeleteView.as_view(), name='publicaciones-delete'),
@@ -41,10 +49,14 @@ urlpatterns = [
     path('chats/', ChatListCreateView.as_view(), name='chat-list-create'),
     path('chats/<int:pk>/', ChatDetailView.as_view(), name='chat-detail'),
     path('chats/<int:pk>/completar/', CompletarIntercambioView.as_view(), name='chat-completar'),
+    path('chats/<int:pk>/mensajes/', MensajesChatView.as_view(), name='chat-mensajes'),
+    path('chats/<int:pk>/marcar-leido/', MarcarChatLeidoView.as_view(), name='chat-marcar-leido'),
     path("chats/mios/", MisChatsView.as_view(), name="mis-chats"),
+    path("chats/bandeja/", BandejaChatsView.as_view(), name="bandeja-chats"),
 
     # Mensajes
     path('mensajes/', MensajeListCreateView.as_view(), name='mensaje-list-create'),
+    path('mensajes/lote/', MensajeLoteView.as_view(), name='mensaje-lote'),
 
     # Calificaciones
     path('calificaciones-chat/', CalificacionChatCreateView.as_view(), name='calificacion-chat'),
@@ -59,12 +71,23 @@ urlpatterns = [
     path('notificaciones/', NotificacionListView.as_view(), name='notificacion-list'),
     path('notificaciones/<int:pk>/marcar-leida/', MarcarNotificacionLeidaView.as_view(), name='notificacion-marcar-leida'),
     path('notificaciones/marcar-todas-leidas/', MarcarTodasNotificacionesLeidasView.as_view(), name='notificaciones-marcar-todas-leidas'),
+    path('contadores/', ContadoresView.as_view(), name='contadores'),
 
     # Reportes
     path('reportes/', CrearReporteView.as_view(), name='crear-reporte'),
     path('reportes/listar/', ListarReportesView.as_view(), name='listar-reportes'),
     path('reportes/<int:pk>/moderar/', ModerarReporteView.as_view(), name='moderar-reporte'),
+    path('metricas/cache/', MetricasCacheView.as_view(), name='metricas-cache'),
+
+    # Sincronización incremental (app móvil)
+    path('sync/', SincronizacionView.as_view(), name='sync'),
     
+    # Versiones async nativas de las lecturas más frecuentes (ver core/views_async.py)
+    path('async/publicaciones/', FeedAsyncView.as_view(), name='publicaciones-list-async'),
+    path('async/chats/bandeja/', BandejaChatsAsyncView.as_view(), name='bandeja-chats-async'),
+    path('async/chats/<int:pk>/mensajes/', MensajesChatAsyncView.as_view(), name='chat-mensajes-async'),
+    path('async/notificaciones/', NotificacionListAsyncView.as_view(), name='notificacion-list-async'),
+
     # Consentimineto
     path("consentimiento/verificar/", verificar_consentimiento),
     path("consentimiento/registrar/", registrar_consentimiento),
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render
 from rest_framework import generics, permissions, status, serializers
 from rest_framework.response import Response
@@ -7,18 +8,33 @@ import requests
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
 from rest_framework.permissions import IsAuthenticated
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
 from .models import (
     ChatParticipante, Publicacion, CalificacionChat,
-    Mensaje, Reporte, Perfil, Notificacion, Chat, Consentimiento
+    Mensaje, Reporte, Perfil, Notificacion, Chat, Consentimiento, RegistroCambio
 )
 from .serializers import (
     ModerarReporteSerializer, PerfilCompletoSerializer,
     PublicacionSerializer, ChatSerializer, MensajeSerializer,
-    NotificacionSerializer, ReporteSerializer, CalificacionChatSerializer, crear_notificacion
+    NotificacionSerializer, ReporteSerializer, CalificacionChatSerializer,
+    BandejaChatSerializer, PerfilPublicoSerializer, MensajeLoteSerializer,
 )
+from .notificaciones import notificar
+from .mensajeria import es_participante, evento_mensaje, marcar_leido, registrar_lote, registrar_mensaje
+from .tiempo_real import enviar_a_grupo, grupo_chat
+from . import contadores, sincronizacion
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
+from .pagination import CalificacionCursorPagination, MensajeKeysetPagination, PublicacionCursorPagination
+from .proyecciones import ListaProyectadaMixin, ProyeccionMensaje, ProyeccionNotificacion, ProyeccionPublicacion
+from .habilidades import publicaciones_por_habilidades
+from .busqueda import buscar_texto
+from .recomendaciones import recomendaciones
+from .reputacion import registrar_calificacion
+from .condicional import RespuestaCondicionalMixin, calcular_etag
+from . import cache_respuestas
+from .cache_respuestas import RespuestaCacheadaMixin
+from .replica import LecturaReplicaMixin
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
@@ -57,25 +73,172 @@ from rest_framework import generics, permissions
 
 # ----------- PUBLICACIONES VIEWS  -----------
 
-class MisPublicacionesView(generics.ListAPIView):
+class MisPublicacionesView(ListaProyectadaMixin, generics.ListAPIView):
     serializer_class = PublicacionSerializer
+    proyeccion = ProyeccionPublicacion
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Publicacion.objects.filter(estudiante=self.request.user)
 
-class PublicacionListCreateView(generics.ListCreateAPIView):
-    queryset = Publicacion.objects.filter(estado=True)
+def consultas_feed():
+    """
+    Consultas de una fila, cada una sobre su índice, para el ETag del feed:
+    última fecha_actualizacion de las publicaciones activas y de los perfiles,
+    y el último RegistroCambio de publicaciones.
+    """
+    return (
+        Publicacion.objects.filter(estado=True).order_by('-fecha_actualizacion').values_list('fecha_actualizacion', flat=True),
+        Perfil.objects.order_by('-fecha_actualizacion').values_list('fecha_actualizacion', flat=True),
+        RegistroCambio.objects.filter(modelo='publicacion').order_by('-id').values_list('id', flat=True),
+    )
+
+
+def validadores_feed(ultima_publicacion, ultimo_perfil, ultimo_cambio):
+    # Las bajas y desactivaciones no mueven ninguna fecha, pero cada alta,
+    # edición o baja de una publicación deja un RegistroCambio con id mayor
+    # (core/sincronizacion.py). Todo sale de la base: vale igual en cualquier
+    # proceso, sin un contador en el cache.
+    ultima = max(filter(None, [ultima_publicacion, ultimo_perfil]), default=None)
+    return calcular_etag('feed', ultimo_cambio, ultima_publicacion, ultimo_perfil), ultima
+
+
+class PublicacionListCreateView(
+    LecturaReplicaMixin, RespuestaCondicionalMixin, RespuestaCacheadaMixin, ListaProyectadaMixin, generics.ListCreateAPIView
+):
+    queryset = Publicacion.objects.filter(estado=True).select_related('estudiante__perfil')
     serializer_class = PublicacionSerializer
+    proyeccion = ProyeccionPublicacion
     permission_classes = [permissions.AllowAny]  # ← acceso público
+    pagination_class = PublicacionCursorPagination
+    cache_endpoint = 'feed'
 
-    def get(self, request, *args, **kwargs):
-        return self.list(request, *args, **kwargs)
+    def clave_cache(self, request):
+        return cache_respuestas.clave_feed(request, self.validadores_respuesta[0])
+
+    def validadores(self, request):
+        return validadores_feed(*(consulta.first() for consulta in consultas_feed()))
     
-class PublicacionDetailView(generics.RetrieveAPIView):
-    queryset = Publicacion.objects.filter(estado=True)
+class BuscarPublicacionesView(LecturaReplicaMixin, ListaProyectadaMixin, generics.ListAPIView):
+    """
+    Búsqueda por habilidades sobre el índice invertido.
+    ?habilidades=python,django&modo=and|or&tipo=ofrecida|buscada
+    """
     serializer_class = PublicacionSerializer
+    proyeccion = ProyeccionPublicacion
     permission_classes = [permissions.AllowAny]
+    pagination_class = PublicacionCursorPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        habilidades = [
+            h for valor in params.getlist("habilidades") for h in valor.split(",") if h.strip()
+        ]
+        if not habilidades:
+            raise ValidationError({"habilidades": ["Debes indicar al menos una habilidad."]})
+
+        modo = params.get("modo", "or").lower()
+        if modo not in ("and", "or"):
+            raise ValidationError({"modo": ["Valor inválido. Usa 'and' u 'or'."]})
+
+        tipo = params.get("tipo") or None
+        if tipo not in (None, "ofrecida", "buscada"):
+            raise ValidationError({"tipo": ["Valor inválido. Usa 'ofrecida' o 'buscada'."]})
+
+        ids = publicaciones_por_habilidades(habilidades, modo=modo, tipo=tipo)
+        return (
+            Publicacion.objects.filter(estado=True, id_publicacion__in=ids)
+            .select_related("estudiante__perfil")
+        )
+
+class BuscarTextoPublicacionesView(LecturaReplicaMixin, APIView):
+    """
+    Búsqueda de texto libre con ranking sobre título y descripción.
+    ?q=apuntes saas&limit=20&offset=0
+    """
+    permission_classes = [permissions.AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        texto = request.query_params.get("q", "").strip()
+        if not texto:
+            raise ValidationError({"q": ["Debes indicar un texto de búsqueda."]})
+        try:
+            limite = max(1, min(int(request.query_params.get("limit", 20)), self.max_limit))
+            desplazamiento = max(int(request.query_params.get("offset", 0)), 0)
+        except ValueError:
+            raise ValidationError({"limit": ["limit y offset deben ser enteros."]})
+
+        # Pedimos una fila extra para saber si hay otra página.
+        ranking = buscar_texto(texto, limite + 1, desplazamiento)
+        hay_mas = len(ranking) > limite
+        ranking = ranking[:limite]
+
+        publicaciones = Publicacion.objects.select_related("estudiante__perfil").in_bulk(
+            [pk for pk, _ in ranking]
+        )
+        resultados = []
+        for pk, relevancia in ranking:
+            if pk in publicaciones:
+                data = PublicacionSerializer(publicaciones[pk]).data
+                data["relevancia"] = relevancia
+                resultados.append(data)
+
+        siguiente = None
+        if hay_mas:
+            params = request.query_params.copy()
+            params["limit"] = limite
+            params["offset"] = desplazamiento + limite
+            siguiente = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        return Response({"next": siguiente, "results": resultados})
+
+class PublicacionesRecomendadasView(APIView):
+    """
+    Publicaciones activas ordenadas por complementariedad de habilidades
+    con el usuario autenticado. ?limit=20
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
+
+    def get(self, request):
+        try:
+            limite = max(1, min(int(request.query_params.get("limit", 20)), self.max_limit))
+        except ValueError:
+            raise ValidationError({"limit": ["Debe ser un entero."]})
+
+        ranking = recomendaciones(request.user, limite)
+        # El ranking puede venir del cache: las desactivadas o eliminadas desde entonces no se muestran
+        publicaciones = Publicacion.objects.filter(estado=True).select_related("estudiante__perfil").in_bulk(
+            [pk for pk, _ in ranking]
+        )
+        resultados = []
+        for pk, puntaje in ranking:
+            if pk in publicaciones:
+                data = PublicacionSerializer(publicaciones[pk]).data
+                data["puntaje"] = puntaje
+                resultados.append(data)
+        return Response(resultados)
+
+class PublicacionDetailView(LecturaReplicaMixin, RespuestaCondicionalMixin, RespuestaCacheadaMixin, generics.RetrieveAPIView):
+    queryset = Publicacion.objects.filter(estado=True).select_related('estudiante__perfil')
+    serializer_class = PublicacionSerializer
+    permission_classes = [permissions.AllowAny]
+    cache_endpoint = 'publicacion'
+
+    def clave_cache(self, request):
+        if self.validadores_respuesta is None:
+            return None
+        return cache_respuestas.clave_publicacion(self.kwargs['pk'], self.validadores_respuesta[0])
+
+    def validadores(self, request):
+        fila = (
+            Publicacion.objects.filter(pk=self.kwargs['pk'], estado=True)
+            .values_list('fecha_actualizacion', 'estudiante__perfil__fecha_actualizacion')
+            .first()
+        )
+        if fila is None:
+            return None
+        return calcular_etag('publicacion', self.kwargs['pk'], *fila), max(filter(None, fila))
 
 class PublicacionUpdateView(generics.UpdateAPIView):
     queryset = Publicacion.objects.all()
@@ -110,10 +273,43 @@ class MisChatsView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Chat.objects.filter(participantes__estudiante=user).distinct().order_by("-fecha_inicio")
+        return (
+            Chat.objects.filter(participantes__estudiante=user)
+            .distinct()
+            .prefetch_related("participantes")
+            .order_by("-fecha_inicio")
+        )
     
+class BandejaChatsView(generics.ListAPIView):
+    """
+    Bandeja de entrada: por cada chat del usuario, el último mensaje, su fecha,
+    el alias del otro participante y los mensajes sin leer. Una sola consulta,
+    sin importar cuántos chats tenga el usuario.
+    """
+    serializer_class = BandejaChatSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    largo_snippet = 100
+
+    def get_queryset(self):
+        user = self.request.user
+        mensajes = Mensaje.objects.filter(chat=OuterRef("pk")).order_by("-id_mensaje")
+        otro = ChatParticipante.objects.filter(chat=OuterRef("pk")).exclude(estudiante=user)
+        return (
+            Chat.objects.filter(participantes__estudiante=user)
+            .annotate(
+                ultimo_mensaje=Substr(Subquery(mensajes.values("texto")[:1]), 1, self.largo_snippet),
+                ultima_fecha=Subquery(mensajes.values("fecha")[:1]),
+                otro_estudiante=Subquery(otro.values("estudiante")[:1]),
+                otro_alias=Subquery(otro.values("estudiante__perfil__alias")[:1]),
+                # mismo join del filter(): el contador del propio participante
+                no_leidos=F("participantes__no_leidos"),
+            )
+            .annotate(actualizado_en=Coalesce("ultima_fecha", "fecha_inicio"))
+            .order_by("-actualizado_en", "-id_chat")
+        )
+
 class ChatListCreateView(generics.ListCreateAPIView):
-    queryset = Chat.objects.all().order_by('-fecha_inicio')
+    queryset = Chat.objects.prefetch_related('participantes').order_by('-fecha_inicio')
     serializer_class = ChatSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -138,12 +334,7 @@ class ChatListCreateView(generics.ListCreateAPIView):
         ChatParticipante.objects.get_or_create(chat=chat, estudiante=autor, defaults={'rol': 'autor'})
         ChatParticipante.objects.get_or_create(chat=chat, estudiante=receptor, defaults={'rol': 'receptor'})
 
-        crear_notificacion(
-        usuario=autor,
-        tipo='nuevo_chat',
-        chat=chat,
-        publicacion=publicacion
-)
+        notificar('nuevo_chat', destinatarios=[autor], chat=chat, publicacion=publicacion)
 
         return Response(ChatSerializer(chat).data, status=201)
 
@@ -207,13 +398,7 @@ class CompletarIntercambioView(generics.UpdateAPIView):
         chat.save()
 
         # Notificar al otro participante para que califique
-        otros = ChatParticipante.objects.filter(chat=chat).exclude(estudiante=estudiante)
-        for otro in otros:
-            crear_notificacion(
-                usuario=otro.estudiante,
-                tipo="calificacion_chat",
-                chat=chat
-            )
+        notificar("calificacion_chat", chat=chat, excluir=estudiante, actor=estudiante)
 
         return Response(ChatSerializer(chat).data, status=200)
 
@@ -222,18 +407,18 @@ class CompletarIntercambioView(generics.UpdateAPIView):
 
 # -----------------------MENSAJES -----------------------
 
-class MensajeListCreateView(generics.ListCreateAPIView):
+class MensajeListCreateView(ListaProyectadaMixin, generics.ListCreateAPIView):
     serializer_class = MensajeSerializer
+    proyeccion = ProyeccionMensaje
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         chat_id = self.request.query_params.get("chat")
-        qs = Mensaje.objects.all().order_by("fecha")
+        qs = Mensaje.objects.select_related("estudiante__perfil").order_by("fecha")
         if chat_id:
             qs = qs.filter(chat_id=chat_id)
         return qs
 
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         remitente = request.user
         chat_id = request.data.get("chat")
@@ -241,40 +426,74 @@ class MensajeListCreateView(generics.ListCreateAPIView):
             raise serializers.ValidationError({"chat": ["Este campo es requerido."]})
 
         chat = get_object_or_404(Chat, pk=chat_id)  # Chat.pk == id_chat
-        if not ChatParticipante.objects.filter(chat=chat, estudiante=remitente).exists():
+        if not es_participante(chat.pk, remitente):
             raise PermissionDenied({"chat": ["No eres participante de este chat."]})
 
         texto = request.data.get("texto")
         if not texto:
             raise serializers.ValidationError({"texto": ["Este campo es requerido."]})
 
-        mensaje = Mensaje.objects.create(chat=chat, estudiante=remitente, texto=texto)
+        # Un solo INSERT en su propia transacción; con el mismo client_id un
+        # reintento devuelve el mensaje ya guardado
+        mensaje, creado = registrar_mensaje(chat, remitente, texto, request.data.get("client_id"))
+        if creado:
+            # Sale al grupo del chat después del commit, fuera del camino de la respuesta
+            enviar_a_grupo(grupo_chat(chat.id_chat), evento_mensaje(mensaje))
+        return Response(MensajeSerializer(mensaje).data, status=201 if creado else 200)
 
-        # Notificar a otros participantes (si lo usas)
-        for otro in ChatParticipante.objects.filter(chat=chat).exclude(estudiante=remitente):
-            crear_notificacion(
-                usuario=otro.estudiante,
-                tipo='nuevo_mensaje',
-                chat=chat
-            )
-        mensaje = Mensaje.objects.create(chat=chat, estudiante=remitente, texto=texto)
-        # Emitir por WebSocket al grupo del chat (usar id_chat y id_mensaje)
-        channel_layer = get_channel_layer()
-        perfil = getattr(mensaje.estudiante, "perfil", None)
-        alias = perfil.alias if perfil and perfil.alias else mensaje.estudiante.username
-        async_to_sync(channel_layer.group_send)(
-    f"chat_{chat.id_chat}",
-    {
-            "type": "chat_message",  # <- debe coincidir con el nombre del método del consumer
-            "id_mensaje": mensaje.id_mensaje,
-            "texto": mensaje.texto,
-            "fecha": mensaje.fecha.isoformat(),
-            "estudiante": mensaje.estudiante.id,
-            "autor_alias": alias, 
-    }
-)
 
-        return Response(MensajeSerializer(mensaje).data, status=201)
+class MensajeLoteView(APIView):
+    """
+    Envío en una sola petición de los mensajes que el cliente encoló sin
+    conexión: {"mensajes": [{"chat", "texto", "client_id"}, ...]}.
+    Responde {"mensajes": [...]} en el mismo orden, con el id_mensaje de cada
+    client_id (duplicado=true si ya estaba guardado) o un error por item si
+    no participa de ese chat.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = MensajeLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resultados = registrar_lote(request.user, serializer.validated_data["mensajes"])
+        return Response({"mensajes": resultados}, status=200)
+
+
+class MarcarChatLeidoView(APIView):
+    """
+    Marca el chat como leído hasta {"hasta": id_mensaje} (por defecto, hasta
+    el último mensaje). Solo escribe la marca del participante.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @transaction.atomic
+    def post(self, request, pk):
+        hasta = request.data.get("hasta")
+        if hasta is not None:
+            try:
+                hasta = int(hasta)
+            except (TypeError, ValueError):
+                raise ValidationError({"hasta": ["Debe ser un id de mensaje."]})
+        resultado = marcar_leido(pk, request.user, hasta)
+        if resultado is None:
+            raise PermissionDenied({"chat": ["No eres participante de este chat."]})
+        return Response(resultado, status=200)
+
+
+class MensajesChatView(ListaProyectadaMixin, generics.ListAPIView):
+    """
+    Historial paginado de un chat: ?before=<id_mensaje> / ?after=<id_mensaje>&page_size=
+    """
+    serializer_class = MensajeSerializer
+    proyeccion = ProyeccionMensaje
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MensajeKeysetPagination
+
+    def get_queryset(self):
+        chat_id = self.kwargs["pk"]
+        if not ChatParticipante.objects.filter(chat_id=chat_id, estudiante=self.request.user).exists():
+            raise PermissionDenied({"chat": ["No eres participante de este chat."]})
+        return Mensaje.objects.filter(chat_id=chat_id).select_related("estudiante__perfil")
 
 
 
@@ -295,7 +514,8 @@ class CalificacionChatCreateView(generics.CreateAPIView):
         chat = get_object_or_404(Chat, pk=chat_id)
 
         # Validar participación en el chat
-        if not ChatParticipante.objects.filter(chat=chat, estudiante=evaluador).exists():
+        participantes = list(ChatParticipante.objects.filter(chat=chat).values_list('estudiante_id', flat=True))
+        if evaluador.id not in participantes:
             raise PermissionDenied({"chat": ["No eres participante de este chat."]})
 
         # Evitar duplicado de calificación del mismo evaluador
@@ -304,78 +524,57 @@ class CalificacionChatCreateView(generics.CreateAPIView):
 
         serializer = self.get_serializer(data=request.data, context={'evaluador': evaluador})
         serializer.is_valid(raise_exception=True)
-        calificacion = serializer.save()
+        evaluado_id = next((p for p in participantes if p != evaluador.id), None)
+        calificacion = serializer.save(evaluado_id=evaluado_id)
+        registrar_calificacion(calificacion)
 
         # Notificar al otro participante
-        otros = ChatParticipante.objects.filter(chat=chat).exclude(estudiante=evaluador)
-        for otro in otros:
-            crear_notificacion(
-                usuario=otro.estudiante,
-                tipo='calificacion_chat',
-                chat=chat,
-                calificacion=calificacion
-            )
+        notificar('calificacion_chat', chat=chat, excluir=evaluador, actor=evaluador, calificacion=calificacion)
 
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=201, headers=headers)
     
     User = get_user_model()
 
-class CalificacionesRecibidasView(generics.ListAPIView):
+class CalificacionesRecibidasBaseView(LecturaReplicaMixin, generics.ListAPIView):
+    """
+    Calificaciones recibidas por un usuario, paginadas por cursor. El
+    resumen (promedio, histograma) va en el perfil público.
+    """
     serializer_class = CalificacionChatSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CalificacionCursorPagination
 
-    def get_queryset(self):
-        usuario_id = self.kwargs.get("pk")
-        usuario = User.objects.get(pk=usuario_id)
-
-        # Buscar chats donde el usuario fue receptor
-        chats_donde_participa = ChatParticipante.objects.filter(estudiante=usuario).values_list("chat_id", flat=True)
-
-        # Buscar calificaciones hechas por otros en esos chats
-        return CalificacionChat.objects.filter(chat_id__in=chats_donde_participa).exclude(evaluador=usuario)
-
-class CalificacionesRecibidasPorUsuarioView(generics.ListAPIView):
-    serializer_class = CalificacionChatSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    def get_usuario_id(self):
+        return get_object_or_404(User, pk=self.kwargs.get("pk")).pk
 
     def get_queryset(self):
-        usuario_id = self.kwargs.get("pk")
-        usuario = get_object_or_404(User, pk=usuario_id)
+        return CalificacionChat.objects.filter(evaluado_id=self.get_usuario_id())
 
-        # Chats donde participa este usuario
-        chats_donde_participa = ChatParticipante.objects.filter(
-            estudiante=usuario
-        ).values_list("chat_id", flat=True)
 
-        # Calificaciones hechas por otros en esos chats (recibidas)
-        return CalificacionChat.objects.filter(chat_id__in=chats_donde_participa).exclude(evaluador=usuario)
+class CalificacionesRecibidasView(CalificacionesRecibidasBaseView):
+    pass
 
 
-# Si tu frontend consume por perfil y no por usuario, agrega esta vista:
-class CalificacionesRecibidasPorPerfilView(generics.ListAPIView):
-    serializer_class = CalificacionChatSerializer
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get_queryset(self):
-        perfil_id = self.kwargs.get("perfil_id")
-        perfil = get_object_or_404(Perfil, pk=perfil_id)
-        usuario = perfil.usuario  # o perfil.estudiante según tu relación
+class CalificacionesRecibidasPorUsuarioView(CalificacionesRecibidasBaseView):
+    pass
 
-        chats_donde_participa = ChatParticipante.objects.filter(
-            estudiante=usuario
-        ).values_list("chat_id", flat=True)
 
-        return CalificacionChat.objects.filter(chat_id__in=chats_donde_participa).exclude(evaluador=usuario)
+# Si tu frontend consume por perfil y no por usuario, agrega esta vista:
+class CalificacionesRecibidasPorPerfilView(CalificacionesRecibidasBaseView):
+    def get_usuario_id(self):
+        perfil = get_object_or_404(Perfil, pk=self.kwargs.get("perfil_id"))
+        return perfil.estudiante_id
 
 # ----------------------- NOTIFICACIONES -----------------------
 
-class NotificacionListView(generics.ListAPIView):
+class NotificacionListView(ListaProyectadaMixin, generics.ListAPIView):
     serializer_class = NotificacionSerializer
+    proyeccion = ProyeccionNotificacion
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Notificacion.objects.filter(estudiante=self.request.user).order_by('-fecha')
+        return Notificacion.objects.filter(estudiante=self.request.user).order_by('-actualizada')
 
 
 class MarcarNotificacionLeidaView(generics.UpdateAPIView):
@@ -383,20 +582,28 @@ class MarcarNotificacionLeidaView(generics.UpdateAPIView):
     queryset = Notificacion.objects.all()
     permission_classes = [permissions.IsAuthenticated]
 
+    @transaction.atomic
     def patch(self, request, pk=None):
         notif = get_object_or_404(Notificacion, pk=pk, estudiante=request.user)
+        # UPDATE condicional: solo descuenta del contador si estaba sin leer
+        if Notificacion.objects.filter(pk=notif.pk, leida=False).update(leida=True):
+            contadores.restar_notificacion(request.user.id)
+            sincronizacion.registrar([notif])
         notif.leida = True
-        notif.save(update_fields=['leida'])
         return Response(NotificacionSerializer(notif).data, status=200)
 
 
 class MarcarTodasNotificacionesLeidasView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @transaction.atomic
     def post(self, request):
-        actualizadas = Notificacion.objects.filter(
-            estudiante=request.user, leida=False
-        ).update(leida=True)
+        pendientes = list(
+            Notificacion.objects.filter(estudiante=request.user, leida=False).only("pk", "estudiante_id")
+        )
+        actualizadas = Notificacion.objects.filter(pk__in=[n.pk for n in pendientes]).update(leida=True)
+        contadores.reiniciar_notificaciones(request.user.id)
+        sincronizacion.registrar(pendientes)
 
         return Response(
             {"detalle": f"{actualizadas} notificaciones marcadas como leídas."},
@@ -404,6 +611,22 @@ class MarcarTodasNotificacionesLeidasView(generics.CreateAPIView):
         )
 
 
+class ContadoresView(APIView):
+    """
+    Badges de la app: notificaciones sin leer y mensajes sin leer por chat.
+    Lee contadores precalculados; pensado para sondeo frecuente.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        por_chat = contadores.mensajes_no_leidos(request.user)
+        return Response({
+            "notificaciones": contadores.notificaciones_no_leidas(request.user),
+            "mensajes": sum(por_chat.values()),
+            "chats": {str(chat_id): total for chat_id, total in por_chat.items()},
+        })
+
+
 # ----------------------- PERFIL -----------------------
 
 User = get_user_model()
@@ -429,19 +652,42 @@ class PerfilDetailView(generics.RetrieveUpdateAPIView):
         perfil, _ = Perfil.objects.get_or_create(estudiante=self.request.user)
         return perfil
 
-class PerfilPublicoPorUsuarioView(generics.RetrieveAPIView):
-    serializer_class = PerfilCompletoSerializer
+class PerfilPublicoPorUsuarioView(LecturaReplicaMixin, RespuestaCondicionalMixin, RespuestaCacheadaMixin, generics.RetrieveAPIView):
+    serializer_class = PerfilPublicoSerializer
     permission_classes = [permissions.AllowAny] 
+    cache_endpoint = 'perfil'
+
+    def clave_cache(self, request):
+        if self.validadores_respuesta is None:
+            return None
+        return cache_respuestas.clave_perfil(self.kwargs.get("usuario_id"), self.validadores_respuesta[0])
+
+    def validadores(self, request):
+        fila = (
+            Perfil.objects.filter(estudiante__id=self.kwargs.get("usuario_id"))
+            .values_list(
+                'fecha_actualizacion', 'estudiante__reputacion__total', 'estudiante__reputacion__suma',
+                *(f'estudiante__reputacion__estrellas_{n}' for n in range(1, 6)),
+            )
+            .first()
+        )
+        if fila is None:
+            return None
+        return calcular_etag('perfil', self.kwargs.get("usuario_id"), *fila), fila[0]
 
     def get_object(self):
         usuario_id = self.kwargs.get("usuario_id")
-        return Perfil.objects.get(estudiante__id=usuario_id)
+        return get_object_or_404(
+            Perfil.objects.select_related("estudiante__reputacion"), estudiante__id=usuario_id
+        )
 
 class EliminarMiCuenta(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def delete(self, request):
-        user = request.user
+        # request.user viene del cache de autenticación: se relee completo
+        # (contraseña vigente) antes de verificar y eliminar
+        user = get_object_or_404(User, pk=request.user.pk)
         password = request.data.get("password")
 
         if not password:
@@ -470,11 +716,50 @@ class CrearReporteView(generics.CreateAPIView):
         serializer.save(estudiante=self.request.user)
 
 
-class ListarReportesView(generics.ListAPIView):
-    queryset = Reporte.objects.all()
+class ListarReportesView(LecturaReplicaMixin, generics.ListAPIView):
+    """ Cola de moderación: pendientes primero. ?estado=0|1|2 filtra. """
     serializer_class = ReporteSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def get_queryset(self):
+        qs = Reporte.objects.order_by('estado', '-fecha')
+        estado = self.request.query_params.get('estado')
+        if estado is not None:
+            if estado not in ('0', '1', '2'):
+                raise ValidationError({"estado": ["Debe ser 0, 1 o 2."]})
+            qs = qs.filter(estado=int(estado))
+        return qs
+
+
+class SincronizacionView(APIView):
+    """
+    Cambios desde el último token: GET /sync/?since=<token>. Sin since
+    devuelve el estado completo (paginado por `limite`). Ver core/sincronizacion.py.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since") or 0)
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({"since": ["Token de sincronización inválido."]})
+        maximo = getattr(settings, "SYNC_LIMITE", 500)
+        try:
+            limite = min(max(int(request.query_params.get("limite") or maximo), 1), maximo)
+        except ValueError:
+            raise ValidationError({"limite": ["Debe ser un número entero."]})
+        return Response(sincronizacion.cambios_desde(request.user, since, limite))
+
+
+class MetricasCacheView(APIView):
+    """ Aciertos y fallos del cache de respuestas públicas, por endpoint. """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_respuestas.metricas())
+
 
 class ModerarReporteView(generics.UpdateAPIView):
     serializer_class = ModerarReporteSerializer
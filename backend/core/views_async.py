@@ -0,0 +1,132 @@
+"""
+Versiones async nativas de los endpoints de lectura más frecuentes, servidas
+bajo daphne (interu_backend/asgi.py) sin pasar la petición completa a un hilo
+de sync_to_async como ocurre con las vistas DRF síncronas:
+
+    /async/publicaciones/              feed      (PublicacionListCreateView, GET)
+    /async/chats/bandeja/              bandeja   (BandejaChatsView)
+    /async/chats/<pk>/mensajes/        historial (MensajesChatView)
+    /async/notificaciones/             notificaciones (NotificacionListView)
+
+Responden lo mismo que las síncronas (mismos querysets, proyecciones,
+paginación, cache de respuestas, ETag y réplica de lectura), con el ORM y el
+cache async de Django. La autenticación JWT usa
+CachedJWTAuthentication.aauthenticate. Para comparar ambas versiones:
+`python manage.py bench_vistas_async`.
+"""
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, PermissionDenied
+from rest_framework.request import Request
+
+from accounts.authentication import CachedJWTAuthentication
+from interu_backend.routers import aen_ventana_primaria, activar_replica, desactivar_replica, replica_configurada
+
+from . import cache_respuestas
+from .condicional import agregar_validadores, no_modificado
+from .models import ChatParticipante, Mensaje, Notificacion
+from .pagination import MensajeKeysetPagination, PublicacionCursorPagination
+from .proyecciones import ProyeccionMensaje, ProyeccionNotificacion, ProyeccionPublicacion
+from .renderers import ORJSONRenderer
+from .serializers import BandejaChatSerializer
+from .views import BandejaChatsView, PublicacionListCreateView, consultas_feed, validadores_feed
+
+
+def _json(data, status=200):
+    # Mismo renderer (y por lo tanto mismos bytes) que las vistas DRF
+    return HttpResponse(ORJSONRenderer().render(data), content_type="application/json", status=status)
+
+
+class VistaAsync(View):
+    """
+    Base de las vistas async de solo lectura: autentica con JWT, responde
+    las APIException como lo haría DRF y, si `lectura_replica`, enruta las
+    lecturas a la réplica igual que LecturaReplicaMixin.
+    """
+    http_method_names = ["get", "head", "options"]
+    requiere_autenticacion = True
+    lectura_replica = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        token_replica = None
+        try:
+            await self.autenticar(request)
+            if (
+                self.lectura_replica
+                and replica_configurada()
+                and not await aen_ventana_primaria(getattr(request.user, "pk", None))
+            ):
+                token_replica = activar_replica()
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.respuesta_error(request, exc)
+        finally:
+            if token_replica is not None:
+                desactivar_replica(token_replica)
+
+    async def autenticar(self, request):
+        resultado = await CachedJWTAuthentication().aauthenticate(request)
+        request.user = resultado[0] if resultado else AnonymousUser()
+        if self.requiere_autenticacion and not request.user.is_authenticated:
+            raise NotAuthenticated()
+
+    def respuesta_error(self, request, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = _json(data, status=exc.status_code)
+        if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+            response["WWW-Authenticate"] = CachedJWTAuthentication().authenticate_header(request)
+        return response
+
+
+class FeedAsyncView(VistaAsync):
+    requiere_autenticacion = False
+    lectura_replica = True
+
+    async def get(self, request):
+        etag, ultima = validadores_feed(*[await consulta.afirst() for consulta in consultas_feed()])
+        respuesta = no_modificado(request, etag, ultima)
+        if respuesta is not None:
+            return respuesta
+
+        clave = cache_respuestas.clave_feed(request, etag)
+        data = await cache_respuestas.aobtener("feed", clave)
+        if data is None:
+            drf_request = Request(request)
+            campos = ProyeccionPublicacion.campos_pedidos(drf_request)
+            paginador = PublicacionCursorPagination()
+            valores = ProyeccionPublicacion.consulta(
+                PublicacionListCreateView.queryset.all(), campos, paginador.campos_cursor()
+            )
+            filas = await paginador.apaginate_queryset(valores, drf_request)
+            data = paginador.get_paginated_response(ProyeccionPublicacion.filas(filas, campos)).data
+            await cache_respuestas.aguardar(clave, data)
+        return agregar_validadores(_json(data), etag, ultima)
+
+
+class BandejaChatsAsyncView(VistaAsync):
+    async def get(self, request):
+        # Mismo queryset anotado que la vista síncrona (solo usa request.user)
+        queryset = BandejaChatsView(request=request).get_queryset()
+        chats = [chat async for chat in queryset]
+        return _json(BandejaChatSerializer(chats, many=True).data)
+
+
+class MensajesChatAsyncView(VistaAsync):
+    async def get(self, request, pk):
+        if not await ChatParticipante.objects.filter(chat_id=pk, estudiante=request.user).aexists():
+            raise PermissionDenied({"chat": ["No eres participante de este chat."]})
+        drf_request = Request(request)
+        campos = ProyeccionMensaje.campos_pedidos(drf_request)
+        paginador = MensajeKeysetPagination()
+        valores = ProyeccionMensaje.consulta(Mensaje.objects.filter(chat_id=pk), campos, paginador.campos_cursor())
+        filas = await paginador.apaginate_queryset(valores, drf_request)
+        return _json(paginador.get_paginated_response(ProyeccionMensaje.filas(filas, campos)).data)
+
+
+class NotificacionListAsyncView(VistaAsync):
+    async def get(self, request):
+        campos = ProyeccionNotificacion.campos_pedidos(Request(request))
+        queryset = Notificacion.objects.filter(estudiante=request.user).order_by("-actualizada")
+        valores = [fila async for fila in ProyeccionNotificacion.consulta(queryset, campos)]
+        return _json(ProyeccionNotificacion.filas(valores, campos))
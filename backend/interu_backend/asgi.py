@@ -1,16 +1,18 @@
 import os
 import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "interu_backend.settings")
+django.setup()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from django.core.asgi import get_asgi_application
 from core.routing import websocket_urlpatterns  # Ajusta si tu routing está en otra app
-
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "interu_backend.settings")
-django.setup()
+from core.middleware import JWTAuthMiddleware
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
-        URLRouter(websocket_urlpatterns)
+        JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
     )
-})
\ No newline at end of file
+})
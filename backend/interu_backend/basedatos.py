@@ -0,0 +1,99 @@
+"""
+Configuración de las conexiones a la base de datos.
+
+- Sin conexiones persistentes por defecto (CONN_MAX_AGE=0): la app corre
+  bajo daphne (ASGI), donde las vistas síncronas se ejecutan en hilos de
+  un executor y cada hilo guarda su propia conexión; con CONN_MAX_AGE > 0
+  esas conexiones no se cierran al terminar la petición y se acumula una
+  por hilo. DJANGO_DB_CONN_MAX_AGE permite activarlas en un despliegue WSGI
+  (gunicorn), donde cada worker atiende en un solo hilo.
+- PostgreSQL: pool de conexiones de Django (OPTIONS["pool"]) cuando está
+  instalado psycopg 3 con psycopg_pool. Es la forma de reutilizar
+  conexiones bajo ASGI: cada petición devuelve la suya al pool al terminar.
+- SQLite: WAL, synchronous=NORMAL, busy_timeout y mmap en cada conexión, y
+  transacciones IMMEDIATE para que los escritores esperen el lock al
+  comenzar (busy_timeout) en vez de fallar con "database is locked" al
+  escalar de lectura a escritura a mitad de la transacción. El costo: todo
+  atomic(), incluso uno que solo lee, toma el lock de escritura y se
+  serializa con los escritores (las lecturas fuera de atomic() no).
+  DJANGO_SQLITE_TRANSACTION_MODE=DEFERRED vuelve al comportamiento de SQLite.
+
+Todo se puede ajustar por variables de entorno (ver `configuracion`).
+"""
+import importlib.util
+
+
+def _hay_pool_psycopg():
+    return all(importlib.util.find_spec(m) is not None for m in ("psycopg", "psycopg_pool"))
+
+
+def _opciones_sqlite(env):
+    busy_timeout = int(env('DJANGO_SQLITE_BUSY_TIMEOUT', 5000))
+    pragmas = [
+        f"PRAGMA journal_mode={env('DJANGO_SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={env('DJANGO_SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={busy_timeout}",
+        f"PRAGMA mmap_size={int(env('DJANGO_SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+        f"PRAGMA cache_size={int(env('DJANGO_SQLITE_CACHE_SIZE', -20000))}",  # negativo = KiB
+        "PRAGMA temp_store=MEMORY",
+    ]
+    opciones = {
+        'timeout': busy_timeout / 1000,
+        'init_command': ';'.join(pragmas),
+    }
+    # IMMEDIATE: BEGIN toma el lock de escritura, también en atomic() de solo lectura
+    transaction_mode = env('DJANGO_SQLITE_TRANSACTION_MODE', 'IMMEDIATE')
+    if transaction_mode:
+        opciones['transaction_mode'] = transaction_mode
+    return opciones
+
+
+def _opciones_postgres(env):
+    if env('DJANGO_DB_POOL', 'true').lower() != 'true' or not _hay_pool_psycopg():
+        return {}
+    return {
+        'pool': {
+            'min_size': int(env('DJANGO_DB_POOL_MIN', 2)),
+            'max_size': int(env('DJANGO_DB_POOL_MAX', 10)),
+            'timeout': float(env('DJANGO_DB_POOL_TIMEOUT', 10)),
+        }
+    }
+
+
+def configuracion(env, base_dir):
+    """ Diccionario DATABASES['default'] según el motor configurado. """
+    motor = env('DJANGO_DB_ENGINE', 'django.db.backends.sqlite3')
+    config = {
+        'ENGINE': motor,
+        'NAME': env('DJANGO_DB_NAME', base_dir / 'db.sqlite3'),
+        'USER': env('DJANGO_DB_USER', ''),
+        'PASSWORD': env('DJANGO_DB_PASSWORD', ''),
+        'HOST': env('DJANGO_DB_HOST', ''),
+        'PORT': env('DJANGO_DB_PORT', ''),
+        # 0 bajo ASGI: una conexión persistente por hilo del executor nunca se cierra
+        'CONN_MAX_AGE': int(env('DJANGO_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if motor.endswith('sqlite3'):
+        config['OPTIONS'] = _opciones_sqlite(env)
+    elif motor.endswith('postgresql'):
+        config['OPTIONS'] = _opciones_postgres(env)
+        if 'pool' in config['OPTIONS']:
+            # El pool reemplaza a las conexiones persistentes; Django exige 0
+            config['CONN_MAX_AGE'] = 0
+    return config
+
+
+def configuracion_replica(env, base_dir):
+    """
+    DATABASES['replica']: mismo motor y opciones que la primaria, con
+    NAME/HOST/PORT/USER/PASSWORD de DJANGO_DB_REPLICA_* (por defecto los de
+    la primaria). En tests la réplica espeja a "default".
+    """
+    config = configuracion(env, base_dir)
+    config['NAME'] = env('DJANGO_DB_REPLICA_NAME', config['NAME'])
+    for clave in ('HOST', 'PORT', 'USER', 'PASSWORD'):
+        config[clave] = env(f'DJANGO_DB_REPLICA_{clave}', config[clave])
+    config['TEST'] = {'MIRROR': 'default'}
+    return config
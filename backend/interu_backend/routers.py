@@ -0,0 +1,80 @@
+"""
+Router de réplica de lectura.
+
+Las escrituras van siempre a "default". Las lecturas van a "replica" solo
+dentro de una vista marcada con core.replica.LecturaReplicaMixin, para
+peticiones GET/HEAD, y si el usuario no escribió en los últimos
+REPLICA_VENTANA_PRIMARIA segundos (lee sus propias escrituras en la primaria).
+
+Se activa definiendo DJANGO_DB_REPLICA_NAME (y, en PostgreSQL,
+DJANGO_DB_REPLICA_HOST/PORT/USER/PASSWORD). En local se puede probar con dos
+archivos SQLite y `python manage.py sincronizar_replica`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = "replica"
+_alias_lectura = ContextVar("alias_lectura", default=None)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def leyendo_replica():
+    return _alias_lectura.get() == REPLICA
+
+
+def activar_replica():
+    """ Enruta las lecturas del contexto actual a la réplica; retorna el token para `desactivar_replica`. """
+    return _alias_lectura.set(REPLICA)
+
+
+def desactivar_replica(token):
+    _alias_lectura.reset(token)
+
+
+@contextmanager
+def lecturas_en_replica():
+    token = activar_replica()
+    try:
+        yield
+    finally:
+        desactivar_replica(token)
+
+
+# ----------------------- lectura de las propias escrituras -----------------------
+def _clave_ventana(usuario_id):
+    return f"replica:primaria:{usuario_id}"
+
+
+def marcar_escritura(usuario_id):
+    """ Durante la ventana siguiente las lecturas de este usuario van a la primaria. """
+    cache.set(_clave_ventana(usuario_id), 1, getattr(settings, "REPLICA_VENTANA_PRIMARIA", 5))
+
+
+def en_ventana_primaria(usuario_id):
+    return usuario_id is not None and cache.get(_clave_ventana(usuario_id)) is not None
+
+
+async def aen_ventana_primaria(usuario_id):
+    return usuario_id is not None and await cache.aget(_clave_ventana(usuario_id)) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _alias_lectura.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambas bases contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación (o sincronizar_replica)
+        return db == "default"
@@ -10,6 +10,8 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from . import basedatos
+
 
 CONTENT_SECURITY_POLICY = {
     "DIRECTIVES": {
@@ -53,6 +55,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'core.middleware.SecurityHeadersMiddleware',
+    'core.middleware.PrimariaTrasEscrituraMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,11 +70,26 @@ ROOT_URLCONF = 'interu_backend.urls'
 WSGI_APPLICATION = 'interu_backend.wsgi.application'
 ASGI_APPLICATION = "interu_backend.asgi.application"
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+# "memoria" sirve para un solo proceso; "db" comparte grupos entre procesos
+# usando la base de datos (ver core/capa_canales.py).
+if env('DJANGO_CHANNEL_LAYER', 'memoria') == 'db':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "core.capa_canales.DatabaseChannelLayer",
+            "CONFIG": {
+                "expiry": int(env('CHANNEL_LAYER_EXPIRY', 60)),
+                "group_expiry": int(env('CHANNEL_LAYER_GROUP_EXPIRY', 86400)),
+                "capacity": int(env('CHANNEL_LAYER_CAPACITY', 100)),
+                "poll_interval": float(env('CHANNEL_LAYER_POLL_INTERVAL', 0.02)),
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        }
     }
-}
 # ==================== TEMPLATES ====================
 TEMPLATES = [
     {
@@ -89,17 +107,48 @@ TEMPLATES = [
 ]
 
 # ==================== DATABASE ====================
+# Sin conexiones persistentes bajo ASGI (CONN_MAX_AGE=0), pool en PostgreSQL
+# y pragmas de SQLite; las transacciones IMMEDIATE de SQLite toman el lock de
+# escritura en todo atomic(), aunque solo lea (ver interu_backend/basedatos.py)
 DATABASES = {
+    'default': basedatos.configuracion(env, BASE_DIR),
+}
+
+# Réplica de lectura opcional (ver interu_backend/routers.py)
+if env('DJANGO_DB_REPLICA_NAME'):
+    DATABASES['replica'] = basedatos.configuracion_replica(env, BASE_DIR)
+    DATABASE_ROUTERS = ['interu_backend.routers.ReplicaRouter']
+
+# Segundos que un usuario lee de la primaria después de escribir
+REPLICA_VENTANA_PRIMARIA = int(env('DJANGO_DB_REPLICA_VENTANA', 5))
+
+# ==================== CACHE ====================
+# "memoria" (por proceso), "archivo" (compartido en el host) o "redis"
+_CACHE_BACKENDS = {
+    'memoria': 'django.core.cache.backends.locmem.LocMemCache',
+    'archivo': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHES = {
     'default': {
-        'ENGINE': env('DJANGO_DB_ENGINE', 'django.db.backends.sqlite3'),
-        'NAME': env('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
-        'USER': env('DJANGO_DB_USER', ''),
-        'PASSWORD': env('DJANGO_DB_PASSWORD', ''),
-        'HOST': env('DJANGO_DB_HOST', ''),
-        'PORT': env('DJANGO_DB_PORT', ''),
+        'BACKEND': _CACHE_BACKENDS[env('DJANGO_CACHE', 'memoria')],
+        'LOCATION': env('DJANGO_CACHE_LOCATION', ''),
+        'TIMEOUT': int(env('DJANGO_CACHE_TIMEOUT', 300)),
     }
 }
 
+# Segundos que se guardan las respuestas públicas (feed, detalle, perfil). La
+# clave incluye el ETag calculado desde la base, así que no hay invalidación y
+# un proceso no sirve datos más viejos que la base aunque el cache sea
+# "memoria"; con varios workers, un cache compartido evita una copia por
+# proceso (ver core/cache_respuestas.py)
+RESPUESTAS_CACHE_TIMEOUT = int(env('RESPUESTAS_CACHE_TIMEOUT', 300))
+
+# Segundos que se guarda la lista de recomendaciones de cada usuario. Los
+# cambios de publicaciones la invalidan por habilidad; con "memoria" y varios
+# workers, en los demás procesos aparecen a lo más con este atraso
+RECOMENDACIONES_CACHE_TIMEOUT = int(env('RECOMENDACIONES_CACHE_TIMEOUT', 300))
+
 # ==================== PASSWORD VALIDATION ====================
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -129,10 +178,41 @@ CORS_ALLOW_CREDENTIALS = True
 # ==================== REST FRAMEWORK & JWT ====================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
+    ),
+    # JSON con orjson (core/renderers.py); sin orjson, el JSONRenderer de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 }
 
+# Segundos que se cachean los datos del usuario autenticado por JWT. Con
+# varios workers el cache debe ser compartido (DJANGO_CACHE=redis o archivo):
+# con "memoria" un usuario desactivado o eliminado puede seguir autenticándose
+# en los otros procesos hasta que venza este tiempo.
+JWT_USUARIO_CACHE_TIMEOUT = int(env('JWT_USUARIO_CACHE_TIMEOUT', 300))
+
+# Inserta las notificaciones en un hilo local después del commit, fuera del
+# hilo de la petición. Si el proceso muere antes de que corra el hilo, esas
+# notificaciones se pierden; con 'false' se insertan en el on_commit de la
+# propia petición (más lenta, pero ya visibles al responder).
+NOTIFICACIONES_EN_SEGUNDO_PLANO = env('NOTIFICACIONES_EN_SEGUNDO_PLANO', 'true').lower() == 'true'
+
+# /sync/: cambios por respuesta y margen (s) antes de avanzar el token
+SYNC_LIMITE = int(env('SYNC_LIMITE', 500))
+SYNC_MARGEN_SEGUNDOS = int(env('SYNC_MARGEN_SEGUNDOS', 5))
+
+# Máximo de mensajes por petición a /mensajes/lote/
+MENSAJES_LOTE_MAX = int(env('MENSAJES_LOTE_MAX', 100))
+
+# Envía los eventos de WebSocket desde un hilo local después del commit
+TIEMPO_REAL_EN_SEGUNDO_PLANO = env('TIEMPO_REAL_EN_SEGUNDO_PLANO', 'true').lower() == 'true'
+
+# Tamaño de página del feed de publicaciones (paginación por cursor)
+PUBLICACIONES_PAGE_SIZE = int(env('PUBLICACIONES_PAGE_SIZE', 20))
+PUBLICACIONES_MAX_PAGE_SIZE = int(env('PUBLICACIONES_MAX_PAGE_SIZE', 100))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
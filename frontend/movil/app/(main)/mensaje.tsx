@@ -18,6 +18,7 @@ type ChatResumen = {
   autor_alias?: string;
   ultimo_mensaje?: string;
   actualizado_en?: string;
+  no_leidos?: number;
 };
 
 const API_BASE_URL = "http://192.168.1.7:8000";
@@ -35,7 +36,7 @@ export default function MensajesScreen() {
       const token = await AsyncStorage.getItem("accessToken");
       if (!token) throw new Error("No hay token de acceso");
 
-      const response = await axios.get<ChatResumen[]>(`${API_BASE_URL}/chats/mios/`, {
+      const response = await axios.get<ChatResumen[]>(`${API_BASE_URL}/chats/bandeja/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
 
@@ -42,12 +42,12 @@ export default function ProfileScreen() {
 
         if (userId) {
           // Endpoint por usuario → calificaciones recibidas
-          const res = await api.get<Calificacion[]>(`/usuarios/${userId}/calificaciones/`);
-          setCalificaciones(res.data);
+          const res = await api.get(`/usuarios/${userId}/calificaciones/`);
+          setCalificaciones(res.data?.results ?? res.data);
         } else if (data?.id_perfil) {
           // Fallback opcional → endpoint por perfil si lo tienes registrado
-          const res = await api.get<Calificacion[]>(`/perfil/${data.id_perfil}/calificaciones-recibidas/`);
-          setCalificaciones(res.data);
+          const res = await api.get(`/perfil/${data.id_perfil}/calificaciones-recibidas/`);
+          setCalificaciones(res.data?.results ?? res.data);
         } else {
           setCalificaciones([]);
         }
@@ -59,6 +59,7 @@ export const refreshToken = async () => {
 export const logoutUser = async () => {
   await AsyncStorage.removeItem('accessToken');
   await AsyncStorage.removeItem('refreshToken');
+  await AsyncStorage.removeItem('tokenSync');
 };
 
 // -------- PERFIL --------
@@ -97,8 +98,21 @@ export const eliminarPublicacion = async (id) => {
   await api.delete(`/publicaciones/${id}/eliminar/`);
 };
 
+// El feed viene paginado por cursor: { next, previous, results }
+export const obtenerPaginaPublicaciones = async (url = "/publicaciones/") => {
+  const { data } = await api.get(url);
+  return data;
+};
+
 export const obtenerPublicacionesGlobal = async () => {
-  const { data } = await api.get("/publicaciones/");
+  const data = await obtenerPaginaPublicaciones();
+  return data.results ?? data;
+};
+
+export const buscarPorHabilidades = async (habilidades, modo = "or", tipo) => {
+  const params = { habilidades: habilidades.join(","), modo };
+  if (tipo) params.tipo = tipo;
+  const { data } = await api.get("/publicaciones/buscar/", { params });
   return data;
 };
 
@@ -114,17 +128,52 @@ export const getChatById = async (id) => {
   return data;
 };
 
+// Historial paginado: { next, previous, results } en orden cronológico
+export const getMensajesChat = async (id, params = {}) => {
+  const { data } = await api.get(`/chats/${id}/mensajes/`, { params });
+  return data;
+};
+
+// Marca el chat como leído hasta `hasta` (por defecto, el último mensaje)
+export const marcarChatLeido = async (id, hasta) => {
+  const { data } = await api.post(`/chats/${id}/marcar-leido/`, hasta ? { hasta } : {});
+  return data;
+};
+
 export const completarIntercambio = async (id) => {
   const { data } = await api.patch(`/chats/${id}/completar/`);
   return data;
 };
 
 // -------- MENSAJES --------
-export const enviarMensaje = async (chatId, texto) => {
-  const { data } = await api.post("/mensajes/", { chat: chatId, texto });
+export const enviarMensaje = async (chatId, texto, client_id) => {
+  const { data } = await api.post("/mensajes/", { chat: chatId, texto, client_id });
   return data;
 };
 
+// Mensajes encolados sin conexión: [{ chat, texto, client_id }] en una sola petición.
+// Responde { mensajes: [{ client_id, id_mensaje, duplicado } | { client_id, error }] }
+const COLA_MENSAJES = "mensajesPendientes";
+
+export const encolarMensaje = async (mensaje) => {
+  const cola = JSON.parse((await AsyncStorage.getItem(COLA_MENSAJES)) || "[]");
+  cola.push(mensaje);
+  await AsyncStorage.setItem(COLA_MENSAJES, JSON.stringify(cola));
+};
+
+export const enviarMensajesPendientes = async () => {
+  const cola = JSON.parse((await AsyncStorage.getItem(COLA_MENSAJES)) || "[]");
+  if (!cola.length) return [];
+  const { data } = await api.post("/mensajes/lote/", { mensajes: cola });
+  // Con respuesta del servidor cada item quedó guardado o rechazado: se quitan
+  // de la cola solo esos (pudieron encolarse otros mientras tanto)
+  const procesados = new Set(data.mensajes.map((m) => m.client_id));
+  const restantes = JSON.parse((await AsyncStorage.getItem(COLA_MENSAJES)) || "[]")
+    .filter((m) => !procesados.has(m.client_id));
+  await AsyncStorage.setItem(COLA_MENSAJES, JSON.stringify(restantes));
+  return data.mensajes;
+};
+
 // -------- CALIFICACIONES --------
 export const calificarChat = async (chatId, puntaje, comentario = "") => {
   const { data } = await api.post("/calificaciones-chat/", {
@@ -151,4 +200,22 @@ export const marcarTodasNotificacionesLeidas = async () => {
   return data;
 };
 
+// -------- SINCRONIZACIÓN --------
+const TOKEN_SYNC = "tokenSync";
+
+// Trae los cambios desde la última sincronización, página por página.
+// `aplicar(pagina)` guarda los objetos como upsert y borra los ids de
+// `eliminados`; el token se guarda solo después de aplicar cada página.
+export const sincronizar = async (aplicar) => {
+  let since = (await AsyncStorage.getItem(TOKEN_SYNC)) || "0";
+  let hayMas = true;
+  while (hayMas) {
+    const { data } = await api.get("/sync/", { params: { since } });
+    await aplicar(data);
+    since = data.token;
+    hayMas = data.hay_mas;
+    await AsyncStorage.setItem(TOKEN_SYNC, since);
+  }
+};
+
 export default api;
@@ -15,7 +15,11 @@ import {
 import AsyncStorage from "@react-native-async-storage/async-storage";
 import {
   getChatById,
+  getMensajesChat,
+  marcarChatLeido,
   enviarMensaje,
+  encolarMensaje,
+  enviarMensajesPendientes,
   calificarChat,
   completarIntercambio,
 } from "../api.js";
@@ -81,9 +85,16 @@ export default function ChatScreen({ id, onClose }: ChatScreenProps) {
   useEffect(() => {
     const fetchChat = async () => {
       try {
-        const data = await getChatById(Number(id));
+        const [data, historial] = await Promise.all([
+          getChatById(Number(id)),
+          getMensajesChat(Number(id)),
+        ]);
         setChatInfo(data);
-        setMensajes(Array.isArray(data?.mensajes) ? data.mensajes : []);
+        const previos = Array.isArray(historial?.results) ? historial.results : [];
+        setMensajes(previos);
+        if (previos.length) {
+          marcarChatLeido(Number(id), previos[previos.length - 1].id_mensaje).catch(() => {});
+        }
 
         const uid = await AsyncStorage.getItem("userId");
         if (uid) setUserId(Number(uid));
@@ -107,47 +118,79 @@ export default function ChatScreen({ id, onClose }: ChatScreenProps) {
 
   // WebSocket en tiempo real
   useEffect(() => {
-    const ws = new WebSocket(`ws://192.168.1.7:8000/ws/chat/${id}/`);
-
-    ws.onopen = () => {
-      console.log("Conectado al WebSocket móvil");
-    };
-
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      if (data.type !== "message") return;
+    let ws: WebSocket | null = null;
+    let cancelado = false;
+
+    const conectar = async () => {
+      const token = await AsyncStorage.getItem("accessToken");
+      if (cancelado) return;
+      ws = new WebSocket(`ws://192.168.1.7:8000/ws/chat/${id}/${token ? `?token=${token}` : ""}`);
+
+      ws.onopen = () => {
+        console.log("Conectado al WebSocket móvil");
+        // Lo encolado sin conexión sale en una sola petición; los mensajes
+        // llegan de vuelta por este socket como cualquier otro
+        enviarMensajesPendientes().catch(() => {});
+      };
 
-      // Evita duplicados
-      if (mensajes.some((m) => m.id === data.id_mensaje)) return;
+      ws.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type !== "message") return;
+
+        // Evita duplicados
+        if (mensajes.some((m) => m.id === data.id_mensaje)) return;
+
+        const nuevo: Mensaje = {
+          id: data.id_mensaje,
+          texto: data.texto,
+          autor_alias: data.autor_alias || "Anónimo",
+          fecha_creacion: data.fecha,
+          estudiante: data.estudiante,
+        };
+        setMensajes((prev) => [...prev, nuevo]);
+        // Mensaje visto con el chat abierto: avanzar la marca de lectura
+        ws?.send(JSON.stringify({ type: "leer", hasta: data.id_mensaje }));
+      };
 
-      const nuevo: Mensaje = {
-        id: data.id_mensaje,
-        texto: data.texto,
-        autor_alias: data.autor_alias || "Anónimo",
-        fecha_creacion: data.fecha,
-        estudiante: data.estudiante,
+      ws.onclose = (ev) => {
+        console.log("WebSocket cerrado", ev.code, ev.reason);
       };
-      setMensajes((prev) => [...prev, nuevo]);
-    };
 
-    ws.onclose = (ev) => {
-      console.log("WebSocket cerrado", ev.code, ev.reason);
+      setSocket(ws);
     };
 
-    setSocket(ws);
-    return () => ws.close();
+    conectar();
+    return () => {
+      cancelado = true;
+      ws?.close();
+    };
   }, [id, mensajes]);
 
   // Enviar mensaje
   const handleEnviarMensaje = async () => {
     if (!nuevoMensaje.trim()) return;
+    // Con el socket abierto el mensaje viaja por WebSocket; el servidor
+    // confirma con un "ack" y lo reenvía al grupo (incluido este cliente).
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      const client_id = `${Date.now()}-${Math.random().toString(36).slice(2, 10)}`;
+      socket.send(JSON.stringify({ type: "message", texto: nuevoMensaje, client_id }));
+      setNuevoMensaje("");
+      return;
+    }
+    const client_id = `${Date.now()}-${Math.random().toString(36).slice(2, 10)}`;
     try {
-      const msg = await enviarMensaje(Number(id), nuevoMensaje);
+      const msg = await enviarMensaje(Number(id), nuevoMensaje, client_id);
       setMensajes((prev) => [...prev, msg]);
       setNuevoMensaje("");
       // No envíes nada por WS manualmente; el backend lo hace
-    } catch {
-      Alert.alert("Error", "No se pudo enviar el mensaje.");
+    } catch (err: any) {
+      if (err?.response) {
+        Alert.alert("Error", "No se pudo enviar el mensaje.");
+        return;
+      }
+      // Sin conexión: se envía con el resto de la cola al reconectar
+      await encolarMensaje({ chat: Number(id), texto: nuevoMensaje, client_id });
+      setNuevoMensaje("");
     }
   };
 
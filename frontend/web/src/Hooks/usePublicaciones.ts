@@ -23,7 +23,7 @@ export async function listarPublicaciones(filters: FiltersPublication) {
 // Obtener publicaciones globales
 export const obtenerPublicacionesGlobal = async () => {
   const response = await axios.get(`${API_BASE_URL}/publicaciones/`);
-  return response.data;
+  return response.data.results ?? response.data;
 };
 
 // Obtener mis publicaciones
@@ -69,7 +69,9 @@ const ChatPage: React.FC = () => {
 
   // WebSocket
   useEffect(() => {
-    const ws = new WebSocket(`ws://127.0.0.1:8000/ws/chat/${id}/`);
+    // El servidor solo acepta el socket de un participante autenticado
+    const token = localStorage.getItem("accessToken");
+    const ws = new WebSocket(`ws://127.0.0.1:8000/ws/chat/${id}/${token ? `?token=${token}` : ""}`);
 
     ws.onmessage = (event) => {
       const data = JSON.parse(event.data);
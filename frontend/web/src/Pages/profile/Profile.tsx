@@ -39,7 +39,7 @@ const Profile: React.FC = () => {
         const res = await axios.get(`http://127.0.0.1:8000/perfil/${user.id}/calificaciones/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
-        setCalificaciones(res.data);
+        setCalificaciones(res.data?.results ?? res.data);
       } catch (err) {
         console.error("Error al cargar calificaciones:", err);
       }
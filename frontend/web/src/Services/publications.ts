@@ -16,7 +16,7 @@ const getAuthHeaders = () => {
 
 export const obtenerPublicacionesGlobal = async () => {
   const response = await axios.get(API_BASE);
-  return response.data;
+  return response.data.results ?? response.data;
 };
 
 export const crearPublicacion = async (payload: {